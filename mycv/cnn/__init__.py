@@ -1,6 +1,7 @@
-from .utils import INITIALIZERS, initialize
+from .utils import INITIALIZERS, fuse_conv_bn, initialize
 from .builder import MODELS
 from .bricks import build_conv_layer, build_norm_layer, build_plugin_layer, ConvModule
 
 __all__ = ['INITIALIZERS', 'initialize', 'MODELS', 'build_conv_layer',
-           'build_norm_layer', 'ConvModule', 'build_plugin_layer']
\ No newline at end of file
+           'build_norm_layer', 'ConvModule', 'build_plugin_layer',
+           'fuse_conv_bn']
\ No newline at end of file
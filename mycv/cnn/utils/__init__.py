@@ -1,3 +1,4 @@
+from .fuse_conv_bn import fuse_conv_bn
 from .weight_init import (INITIALIZERS, ConstantInit, KaimingInit,
                           NormalInit, XavierInit, bias_init_with_prob,
                           constant_init, initialize, kaiming_init, normal_init,
@@ -6,4 +7,5 @@ from .weight_init import (INITIALIZERS, ConstantInit, KaimingInit,
 
 __all__ = ['initialize', 'INITIALIZERS', 'constant_init', 'kaiming_init',
            'ConstantInit', 'KaimingInit', 'NormalInit', 'XavierInit',
-           'bias_init_with_prob', 'normal_init', 'xavier_init', 'PretrainedInit']
+           'bias_init_with_prob', 'normal_init', 'xavier_init', 'PretrainedInit',
+           'fuse_conv_bn']
@@ -0,0 +1,86 @@
+import torch
+import torch.nn as nn
+
+from mycv.utils import _BatchNorm
+
+
+def _is_conv(module):
+    """Whether a module is a 2d convolution whose output can absorb a BN.
+
+    Besides ``nn.Conv2d``, this covers ``ModulatedDeformConv2d``, which does
+    not inherit from it.
+    """
+    # imported here as mycv.ops depends on mycv.cnn
+    from mycv.ops import ModulatedDeformConv2d
+    return isinstance(module, (nn.Conv2d, ModulatedDeformConv2d))
+
+
+def _norm_follows_conv(module):
+    """Whether the BN of a module is applied right after its conv.
+
+    The children of a module are assumed to be applied in the order they
+    are registered, except for ``ConvModule`` whose ``order`` is checked,
+    e.g. its BN must not be fused for ``('norm', 'conv', 'act')``.
+    """
+    # imported here as mycv.cnn.bricks depends on mycv.cnn.utils
+    from mycv.cnn.bricks import ConvModule
+    if not isinstance(module, ConvModule):
+        return True
+    return module.order.index('norm') == module.order.index('conv') + 1
+
+
+def _fuse_conv_bn(conv: nn.Module, bn: nn.Module) -> nn.Module:
+    """Fuse conv and bn into one module.
+
+    Args:
+        conv (nn.Module): Conv to be fused.
+        bn (nn.Module): BN to be fused.
+
+    Returns:
+        nn.Module: Fused module.
+    """
+    conv_w = conv.weight
+    conv_b = conv.bias if conv.bias is not None else torch.zeros_like(
+        bn.running_mean)
+
+    factor = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    conv.weight = nn.Parameter(conv_w *
+                               factor.reshape([conv.out_channels, 1, 1, 1]))
+    conv.bias = nn.Parameter((conv_b - bn.running_mean) * factor + bn.bias)
+    return conv
+
+
+def fuse_conv_bn(module: nn.Module) -> nn.Module:
+    """Recursively fuse conv and bn in a module.
+
+    During inference, the functionary of batch norm layers is turned off
+    but only the mean and var alone channels are used, which exposes the
+    chance to fuse it with the preceding conv layers to save computations and
+    simplify network structures.
+
+    Args:
+        module (nn.Module): Module to be fused.
+
+    Returns:
+        nn.Module: Fused module.
+    """
+    last_conv = None
+    last_conv_name = None
+    fuse_norm = _norm_follows_conv(module)
+
+    for name, child in module.named_children():
+        if isinstance(child, (_BatchNorm, nn.SyncBatchNorm)):
+            # only fuse BN that is after Conv
+            if last_conv is None or not fuse_norm:
+                continue
+            fused_conv = _fuse_conv_bn(last_conv, child)
+            module._modules[last_conv_name] = fused_conv
+            # To reduce changes, set BN as Identity instead of deleting it.
+            module._modules[name] = nn.Identity()
+            last_conv = None
+        elif _is_conv(child):
+            last_conv = child
+            last_conv_name = name
+        else:
+            fuse_conv_bn(child)
+    return module
@@ -1,9 +1,11 @@
 from .info import get_compiler_version, get_compiling_cuda_version
 from .modulated_deform_conv import (ModulatedDeformConv2d,
                                     ModulatedDeformConv2dPack,
-                                    modulated_deform_conv2d)
-from .roi_align import roi_align
+                                    modulated_deform_conv2d,
+                                    modulated_deform_conv2d_pytorch)
+from .roi_align import roi_align, roi_align_pytorch
 
 __all__ = ['get_compiler_version', 'get_compiling_cuda_version', 'roi_align',
            'ModulatedDeformConv2dPack', 'ModulatedDeformConv2d',
-           'modulated_deform_conv2d']
+           'modulated_deform_conv2d', 'modulated_deform_conv2d_pytorch',
+           'roi_align_pytorch']
@@ -18,11 +18,21 @@ if torch.__version__ == 'parrots':
         return parrots.version.cuda
 else:
     from ..utils import ext_loader
-    ext_module = ext_loader.load_ext(
-        '_ext', ['get_compiler_version', 'get_compiling_cuda_version'])
 
-    def get_compiler_version():
-        return ext_module.get_compiler_version()
+    if ext_loader.check_ops_exist():
+        ext_module = ext_loader.load_ext(
+            '_ext', ['get_compiler_version', 'get_compiling_cuda_version'])
 
-    def get_compiling_cuda_version():
-        return ext_module.get_compiling_cuda_version()
\ No newline at end of file
+        def get_compiler_version():
+            return ext_module.get_compiler_version()
+
+        def get_compiling_cuda_version():
+            return ext_module.get_compiling_cuda_version()
+    else:
+        # the ops fall back to their pure PyTorch implementations
+
+        def get_compiler_version():
+            return 'not available'
+
+        def get_compiling_cuda_version():
+            return 'not available'
\ No newline at end of file
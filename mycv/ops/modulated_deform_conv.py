@@ -11,9 +11,18 @@ from mycv.utils import deprecated_api_warning
 from ..cnn.bricks import CONV_LAYERS
 from ..utils import ext_loader, print_log
 
-ext_module = ext_loader.load_ext(
-    '_ext',
-    ['modulated_deform_conv_forward', 'modulated_deform_conv_backward'])
+try:
+    from torchvision.ops import deform_conv2d as tv_deform_conv2d
+except ImportError:
+    tv_deform_conv2d = None
+
+if ext_loader.check_ops_exist():
+    ext_module = ext_loader.load_ext(
+        '_ext',
+        ['modulated_deform_conv_forward', 'modulated_deform_conv_backward'])
+else:
+    # fall back to modulated_deform_conv2d_pytorch
+    ext_module = None
 
 
 
@@ -220,7 +229,141 @@ class ModulatedDeformConv2dFunction(Function):
                 'x'.join(map(str, output_size)) + ')')
         return output_size
 
-modulated_deform_conv2d = ModulatedDeformConv2dFunction.apply
+
+def bilinear_sample(input: torch.Tensor, y: torch.Tensor,
+                    x: torch.Tensor) -> torch.Tensor:
+    """Sample feature maps at fractional positions by bilinear interpolation.
+
+    Pixels outside the feature maps are treated as zeros, as in the
+    ``deformable_im2col`` kernel of the extension.
+
+    Args:
+        input (Tensor): The feature maps of shape (N, C, H, W).
+        y (Tensor): The row coordinates of shape (N, P).
+        x (Tensor): The column coordinates of shape (N, P).
+
+    Returns:
+        Tensor: The sampled values of shape (N, C, P).
+    """
+    num_channels, height, width = input.shape[1:]
+    flat_input = input.flatten(2)
+    y_low = y.floor()
+    x_low = x.floor()
+    ly = y - y_low
+    lx = x - x_low
+
+    output = 0
+    for dy, weight_y in ((0, 1 - ly), (1, ly)):
+        for dx, weight_x in ((0, 1 - lx), (1, lx)):
+            py = y_low + dy
+            px = x_low + dx
+            valid = (py >= 0) & (py <= height - 1) & (px >= 0) & (
+                px <= width - 1)
+            inds = py.clamp(0, height - 1) * width + px.clamp(0, width - 1)
+            inds = inds.long()[:, None].expand(-1, num_channels, -1)
+            weight = (weight_y * weight_x * valid)[:, None]
+            output = output + flat_input.gather(2, inds) * weight
+    return output
+
+
+def modulated_deform_conv2d_pytorch(input: torch.Tensor,
+                                    offset: torch.Tensor,
+                                    mask: torch.Tensor,
+                                    weight: torch.Tensor,
+                                    bias: Optional[torch.Tensor] = None,
+                                    stride: int = 1,
+                                    padding: int = 0,
+                                    dilation: int = 1,
+                                    groups: int = 1,
+                                    deform_groups: int = 1,
+                                    use_torchvision: bool = True
+                                    ) -> torch.Tensor:
+    """Modulated deformable convolution in plain PyTorch.
+
+    It is used when ``mycv._ext`` is not compiled. The computation goes
+    through :func:`torchvision.ops.deform_conv2d` if torchvision is
+    installed and ``use_torchvision`` is True, and otherwise through an
+    im2col of bilinear samples followed by a batched matrix multiplication.
+    Both are differentiable by autograd and take the same arguments as
+    :func:`modulated_deform_conv2d`.
+    """
+    stride = _pair(stride)
+    padding = _pair(padding)
+    dilation = _pair(dilation)
+    input = input.type_as(offset)
+    weight = weight.type_as(input)
+    mask = mask.type_as(input)
+    if bias is not None:
+        bias = bias.type_as(input)
+
+    if use_torchvision and tv_deform_conv2d is not None:
+        return tv_deform_conv2d(
+            input,
+            offset,
+            weight,
+            bias,
+            stride=stride,
+            padding=padding,
+            dilation=dilation,
+            mask=mask)
+
+    batch, channels, height, width = input.shape
+    out_channels, _, kernel_h, kernel_w = weight.shape
+    out_h, out_w = offset.shape[2:]
+    num_kernel = kernel_h * kernel_w
+
+    # the sampling positions of the regular grid, of shape (K, H_out, W_out)
+    kernel_y, kernel_x = torch.meshgrid(
+        torch.arange(kernel_h, device=input.device) * dilation[0],
+        torch.arange(kernel_w, device=input.device) * dilation[1],
+        indexing='ij')
+    grid_y = torch.arange(
+        out_h, device=input.device) * stride[0] - padding[0]
+    grid_x = torch.arange(
+        out_w, device=input.device) * stride[1] - padding[1]
+    base_y = kernel_y.reshape(-1, 1, 1) + grid_y.view(1, -1, 1)
+    base_x = kernel_x.reshape(-1, 1, 1) + grid_x.view(1, 1, -1)
+
+    # the offsets are (y, x) pairs for each kernel position of each group
+    offset = offset.view(batch, deform_groups, num_kernel, 2, out_h, out_w)
+    y = (base_y + offset[:, :, :, 0]).flatten(2)
+    x = (base_x + offset[:, :, :, 1]).flatten(2)
+    columns = bilinear_sample(
+        input.reshape(batch * deform_groups, channels // deform_groups,
+                      height, width),
+        y.view(batch * deform_groups, -1), x.view(batch * deform_groups, -1))
+    columns = columns.view(batch, deform_groups, -1, num_kernel,
+                           out_h * out_w) * mask.view(
+                               batch, deform_groups, 1, num_kernel,
+                               out_h * out_w)
+
+    columns = columns.view(batch, groups, -1, out_h * out_w)
+    weight = weight.view(groups, out_channels // groups, -1)
+    output = torch.einsum('gok,ngkl->ngol', weight, columns)
+    output = output.reshape(batch, out_channels, out_h, out_w)
+    if bias is not None:
+        output = output + bias.view(1, -1, 1, 1)
+    return output
+
+
+def modulated_deform_conv2d(input: torch.Tensor,
+                            offset: torch.Tensor,
+                            mask: torch.Tensor,
+                            weight: torch.Tensor,
+                            bias: Optional[torch.Tensor] = None,
+                            stride: int = 1,
+                            padding: int = 0,
+                            dilation: int = 1,
+                            groups: int = 1,
+                            deform_groups: int = 1) -> torch.Tensor:
+    if ext_module is None and input.device.type != 'npu':
+        return modulated_deform_conv2d_pytorch(input, offset, mask, weight,
+                                               bias, stride, padding,
+                                               dilation, groups, deform_groups)
+    return ModulatedDeformConv2dFunction.apply(input, offset, mask, weight,
+                                               bias, stride, padding,
+                                               dilation, groups, deform_groups)
+
 
 class ModulatedDeformConv2d(nn.Module):
 
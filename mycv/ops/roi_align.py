@@ -6,8 +6,12 @@ from torch.nn.modules.utils import _pair
 from torch.autograd.function import once_differentiable
 from ..utils import deprecated_api_warning, ext_loader
 
-ext_module = ext_loader.load_ext('_ext',
-                                 ['roi_align_forward', 'roi_align_backward'])
+if ext_loader.check_ops_exist():
+    ext_module = ext_loader.load_ext(
+        '_ext', ['roi_align_forward', 'roi_align_backward'])
+else:
+    # fall back to roi_align_pytorch
+    ext_module = None
 
 
 class RoIAlignFunction(Function):
@@ -127,4 +131,130 @@ class RoIAlignFunction(Function):
         return grad_input, None, None, None, None, None, None
 
 
-roi_align = RoIAlignFunction.apply
+def _roi_bilinear_sample(input: torch.Tensor, batch_inds: torch.Tensor,
+                         y: torch.Tensor, x: torch.Tensor) -> torch.Tensor:
+    """Bilinear interpolation with the border handling of the ``roi_align``
+    kernel of the extension.
+
+    Args:
+        input (Tensor): The feature maps of shape (N, C, H, W).
+        batch_inds (Tensor): The image index of each RoI, of shape (R, ).
+        y (Tensor): The row coordinates of shape (R, P).
+        x (Tensor): The column coordinates of shape (R, P).
+
+    Returns:
+        Tensor: The sampled values of shape (R, P, C).
+    """
+    height, width = input.shape[2:]
+    # samples beyond one pixel outside the feature maps are zeros
+    inside = (y >= -1.0) & (y <= height) & (x >= -1.0) & (x <= width)
+    y = y.clamp(0, height - 1)
+    x = x.clamp(0, width - 1)
+    y_low = y.floor().clamp(max=height - 2).clamp(min=0)
+    x_low = x.floor().clamp(max=width - 2).clamp(min=0)
+    y_high = (y_low + 1).clamp(max=height - 1)
+    x_high = (x_low + 1).clamp(max=width - 1)
+    ly = y - y_low
+    lx = x - x_low
+
+    # (N, H * W, C) so that indexing gives (R, P, C)
+    flat_input = input.flatten(2).transpose(1, 2)
+    batch_inds = batch_inds[:, None]
+    output = 0
+    for py, weight_y in ((y_low, 1 - ly), (y_high, ly)):
+        for px, weight_x in ((x_low, 1 - lx), (x_high, lx)):
+            inds = (py * width + px).long()
+            weight = (weight_y * weight_x * inside)[..., None]
+            output = output + flat_input[batch_inds, inds] * weight
+    return output
+
+
+def roi_align_pytorch(input: torch.Tensor,
+                      rois: torch.Tensor,
+                      output_size: int,
+                      spatial_scale: float = 1.0,
+                      sampling_ratio: int = 0,
+                      pool_mode: str = 'avg',
+                      aligned: bool = True) -> torch.Tensor:
+    """RoIAlign in plain PyTorch.
+
+    It is used when ``mycv._ext`` is not compiled. All RoIs are sampled in one
+    batch: with an adaptive ``sampling_ratio`` of 0, every RoI is sampled on
+    the largest grid among them and the extra samples are masked out. It is
+    differentiable by autograd and takes the same arguments as
+    :func:`roi_align`.
+    """
+    out_h, out_w = _pair(output_size)
+    assert pool_mode in ('max', 'avg')
+    assert rois.size(1) == 5, 'RoI must be (idx, x1, y1, x2, y2)!'
+    num_rois = rois.size(0)
+    if num_rois == 0:
+        return input.new_zeros((0, input.size(1), out_h, out_w))
+
+    offset = 0.5 if aligned else 0.
+    start_x = rois[:, 1] * spatial_scale - offset
+    start_y = rois[:, 2] * spatial_scale - offset
+    roi_w = rois[:, 3] * spatial_scale - offset - start_x
+    roi_h = rois[:, 4] * spatial_scale - offset - start_y
+    if not aligned:
+        # force malformed RoIs to be 1x1
+        roi_w = roi_w.clamp(min=1.)
+        roi_h = roi_h.clamp(min=1.)
+    bin_w = roi_w / out_w
+    bin_h = roi_h / out_h
+
+    if sampling_ratio > 0:
+        grid_h = torch.full_like(roi_h, sampling_ratio)
+        grid_w = torch.full_like(roi_w, sampling_ratio)
+    else:
+        grid_h = torch.ceil(roi_h / out_h)
+        grid_w = torch.ceil(roi_w / out_w)
+    max_grid_h = max(int(grid_h.max()), 1)
+    max_grid_w = max(int(grid_w.max()), 1)
+
+    # sample (i + 0.5) / grid of each bin, of shape (R, out_h, max_grid_h)
+    sample_y = torch.arange(max_grid_h, device=input.device) + 0.5
+    sample_x = torch.arange(max_grid_w, device=input.device) + 0.5
+    bin_y = torch.arange(out_h, device=input.device)[:, None]
+    bin_x = torch.arange(out_w, device=input.device)[:, None]
+    valid_y = sample_y < grid_h[:, None]
+    valid_x = sample_x < grid_w[:, None]
+    # empty RoIs have no samples, so their grids only need to be nonzero
+    grid_h = grid_h.clamp(min=1)[:, None, None]
+    grid_w = grid_w.clamp(min=1)[:, None, None]
+    # keep the order of the operations of the kernel to round alike
+    bin_h = bin_h[:, None, None]
+    bin_w = bin_w[:, None, None]
+    y = start_y[:, None, None] + bin_y * bin_h + sample_y * bin_h / grid_h
+    x = start_x[:, None, None] + bin_x * bin_w + sample_x * bin_w / grid_w
+
+    y = y[:, :, :, None, None].expand(-1, -1, -1, out_w, max_grid_w)
+    x = x[:, None, None].expand(-1, out_h, max_grid_h, -1, -1)
+    values = _roi_bilinear_sample(input, rois[:, 0].long(),
+                                  y.reshape(num_rois, -1),
+                                  x.reshape(num_rois, -1))
+    values = values.view(num_rois, out_h, max_grid_h, out_w, max_grid_w, -1)
+    valid = (valid_y[:, None, :, None, None, None]
+             & valid_x[:, None, None, None, :, None])
+
+    if pool_mode == 'avg':
+        count = (grid_h * grid_w).view(-1, 1, 1, 1)
+        output = (values * valid).sum(dim=(2, 4)) / count
+    else:
+        output = values.masked_fill(~valid, float('-inf')).amax(dim=(2, 4))
+        output = output.masked_fill(output == float('-inf'), 0)
+    return output.permute(0, 3, 1, 2).contiguous()
+
+
+def roi_align(input: torch.Tensor,
+              rois: torch.Tensor,
+              output_size: int,
+              spatial_scale: float = 1.0,
+              sampling_ratio: int = 0,
+              pool_mode: str = 'avg',
+              aligned: bool = True) -> torch.Tensor:
+    if ext_module is None:
+        return roi_align_pytorch(input, rois, output_size, spatial_scale,
+                                 sampling_ratio, pool_mode, aligned)
+    return RoIAlignFunction.apply(input, rois, output_size, spatial_scale,
+                                  sampling_ratio, pool_mode, aligned)
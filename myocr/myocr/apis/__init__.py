@@ -1,3 +1,9 @@
+from .optimize import compare_detector_outputs, optimize_for_inference
+from .quantize import (load_quantized_detector, quantize_detector,
+                       save_quantized_checkpoint)
 from .train import init_random_seed
 
-__all__ = ['init_random_seed']
\ No newline at end of file
+__all__ = [
+    'init_random_seed', 'optimize_for_inference', 'compare_detector_outputs',
+    'quantize_detector', 'save_quantized_checkpoint', 'load_quantized_detector'
+]
@@ -0,0 +1,101 @@
+import copy
+
+import torch
+from mycv.cnn import fuse_conv_bn
+
+
+def _to_channels_last(module, inputs):
+    """Forward pre-hook converting the input image to channels last."""
+    return (inputs[0].contiguous(memory_format=torch.channels_last), ) + \
+        tuple(inputs[1:])
+
+
+def optimize_for_inference(model,
+                           fuse_bn=True,
+                           fuse_head=True,
+                           channels_last=True,
+                           example_img=None,
+                           rtol=1e-3,
+                           atol=1e-4):
+    """Build an inference-only copy of a text detector.
+
+    The optimizations are:
+
+    - ``fuse_bn``: fold every BN into the preceding convolution, including
+      the ``ConvModule`` of the neck, the ResNet stem and blocks, and the
+      deformable convolutions.
+    - ``fuse_head``: merge the classification and regression convolutions
+      of the head into one, see :meth:`FCEHead.fuse_out_convs`.
+    - ``channels_last``: convert the weights and the input images to
+      ``torch.channels_last``.
+
+    Args:
+        model (nn.Module): The detector. It is not modified.
+        fuse_bn (bool): Whether to fold BN into convolutions.
+        fuse_head (bool): Whether to merge the head convolutions.
+        channels_last (bool): Whether to use the channels last memory
+            format.
+        example_img (Tensor, optional): An image batch of shape
+            (N, 3, H, W). If given, the outputs of the optimized detector are
+            checked against those of the original one by
+            :func:`compare_detector_outputs`.
+        rtol (float): The relative tolerance of the check.
+        atol (float): The absolute tolerance of the check.
+
+    Returns:
+        nn.Module: The optimized detector in eval mode.
+    """
+    model.eval()
+    optimized = copy.deepcopy(model)
+
+    if fuse_bn:
+        optimized = fuse_conv_bn(optimized)
+    if fuse_head and hasattr(optimized.bbox_head, 'fuse_out_convs'):
+        optimized.bbox_head.fuse_out_convs()
+    if channels_last:
+        optimized = optimized.to(memory_format=torch.channels_last)
+        optimized.backbone.register_forward_pre_hook(_to_channels_last)
+
+    if example_img is not None:
+        max_diff, max_ref = compare_detector_outputs(model, optimized,
+                                                     example_img)
+        assert max_diff <= atol + rtol * max_ref, \
+            f'The optimized detector differs by {max_diff} from the ' \
+            f'original one, whose outputs are up to {max_ref}'
+
+    return optimized
+
+
+@torch.no_grad()
+def compare_detector_outputs(model, optimized, img):
+    """Compare the raw head outputs of two detectors.
+
+    Args:
+        model (nn.Module): The reference detector.
+        optimized (nn.Module): The detector to check.
+        img (Tensor): The input images of shape (N, 3, H, W).
+
+    The levels which both heads output as None are skipped.
+
+    Returns:
+        tuple(float, float): The maximum absolute difference between the
+        outputs, and the maximum absolute value of the reference outputs.
+    """
+    model.eval()
+    optimized.eval()
+    ref_outs = model.bbox_head(model.extract_feat(img))
+    outs = optimized.bbox_head(optimized.extract_feat(img))
+
+    assert len(ref_outs) == len(outs), \
+        f'The detectors output {len(ref_outs)} and {len(outs)} levels'
+    max_diff = max_ref = 0.
+    for i, (ref_level, level) in enumerate(zip(ref_outs, outs)):
+        # e.g. the levels skipped by the head
+        if ref_level is None and level is None:
+            continue
+        assert ref_level is not None and level is not None, \
+            f'Only one of the detectors outputs None at level {i}'
+        for ref_out, out in zip(ref_level, level):
+            max_diff = max(max_diff, (ref_out - out).abs().max().item())
+            max_ref = max(max_ref, ref_out.abs().max().item())
+    return max_diff, max_ref
@@ -0,0 +1,212 @@
+import copy
+import warnings
+
+import torch
+import torch.nn as nn
+
+# the modules which can be quantized, in the order of the forward pass
+QUANTIZABLE_MODULES = ('backbone', 'neck', 'bbox_head')
+
+
+def _get_quant_targets(model, modules):
+    """Find the submodules to be quantized one by one.
+
+    The backbone takes a single image tensor and is quantized as a whole. The
+    neck and the head take tuples of feature maps and are driven by Python
+    loops over the levels, so their ``nn.Conv2d`` layers are quantized
+    individually instead.
+
+    Returns:
+        list[str]: The dotted names of the submodules.
+    """
+    assert set(modules) <= set(QUANTIZABLE_MODULES), \
+        f'modules must be a subset of {QUANTIZABLE_MODULES}, got {modules}'
+
+    targets = []
+    for prefix in QUANTIZABLE_MODULES:
+        if prefix not in modules or getattr(model, prefix, None) is None:
+            continue
+        if prefix == 'backbone':
+            targets.append(prefix)
+            continue
+        for name, module in getattr(model, prefix).named_modules():
+            if isinstance(module, nn.Conv2d):
+                targets.append(f'{prefix}.{name}')
+    return targets
+
+
+def _set_submodule(model, name, module):
+    parent_name, _, attr = name.rpartition('.')
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, attr, module)
+
+
+@torch.no_grad()
+def _capture_inputs(model, targets, img):
+    """Run the detector once and record the input of every target."""
+    inputs = {}
+    handles = []
+    for name in targets:
+
+        def hook(module, args, name=name):
+            inputs.setdefault(name, args)
+
+        module = model.get_submodule(name)
+        handles.append(module.register_forward_pre_hook(hook))
+    model.bbox_head(model.extract_feat(img))
+    for handle in handles:
+        handle.remove()
+    return inputs
+
+
+def _prepare_detector(model, targets, example_img, backend):
+    """Insert the observers into a copy of the detector in place.
+
+    Returns:
+        list[str]: The targets run by the detector on ``example_img``, which
+        are those prepared for quantization.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.fx.custom_config import PrepareCustomConfig
+    from torch.ao.quantization.quantize_fx import prepare_fx
+
+    from mycv.ops import ModulatedDeformConv2d, ModulatedDeformConv2dPack
+
+    # there is no int8 kernel for deformable convolutions, so they are kept
+    # as float leaf modules between a dequantize and a quantize
+    dcn_types = [ModulatedDeformConv2d, ModulatedDeformConv2dPack]
+    qconfig_mapping = get_default_qconfig_mapping(backend)
+    for dcn_type in dcn_types:
+        qconfig_mapping.set_object_type(dcn_type, None)
+    prepare_custom_config = PrepareCustomConfig(
+    ).set_non_traceable_module_classes(dcn_types)
+
+    example_inputs = _capture_inputs(model, targets, example_img)
+    skipped = [name for name in targets if name not in example_inputs]
+    if skipped:
+        # e.g. the convs of the outputs skipped by FPN.test_out_levels, which
+        # can be neither traced nor calibrated and are kept in float
+        warnings.warn(
+            f'{", ".join(skipped)} not run by the detector, keeping them '
+            'in float', UserWarning)
+    targets = [name for name in targets if name in example_inputs]
+    for name in targets:
+        module = model.get_submodule(name)
+        if isinstance(module, nn.Conv2d):
+            # tracing a bare conv inlines it into a functional call, so wrap
+            # it to be converted to a quantized conv module
+            module = nn.Sequential(module)
+        prepared = prepare_fx(
+            module,
+            qconfig_mapping,
+            example_inputs[name],
+            prepare_custom_config=prepare_custom_config)
+        _set_submodule(model, name, prepared)
+    return targets
+
+
+def _convert_detector(model, targets):
+    from torch.ao.quantization.quantize_fx import convert_fx
+
+    for name in targets:
+        _set_submodule(model, name, convert_fx(model.get_submodule(name)))
+
+
+def quantize_detector(model,
+                      calib_imgs,
+                      backend='x86',
+                      modules=QUANTIZABLE_MODULES):
+    """Quantize a text detector to int8 for CPU inference.
+
+    This is post-training static quantization in FX graph mode: the weights
+    and the activations of the convolutions are converted to int8, and the
+    activation ranges are calibrated on ``calib_imgs``. Deformable
+    convolutions stay in float, and so do the convolutions which are not run
+    at inference, e.g. those of the outputs skipped by
+    ``FPN.test_out_levels``.
+
+    Args:
+        model (nn.Module): The float detector. It is not modified.
+        calib_imgs (list[Tensor]): The calibration image batches, each of
+            shape (N, 3, H, W), preprocessed as in the test pipeline.
+        backend (str): The quantized engine, ``'x86'``, ``'fbgemm'`` or
+            ``'qnnpack'``.
+        modules (tuple[str]): The parts of the detector to quantize, a subset
+            of ``('backbone', 'neck', 'bbox_head')``.
+
+    Returns:
+        nn.Module: The quantized detector in eval mode on CPU.
+    """
+    assert len(calib_imgs) > 0
+    torch.backends.quantized.engine = backend
+
+    model.eval()
+    quantized = copy.deepcopy(model).cpu()
+    targets = _get_quant_targets(quantized, modules)
+    targets = _prepare_detector(quantized, targets, calib_imgs[0], backend)
+
+    with torch.no_grad():
+        for img in calib_imgs:
+            quantized.bbox_head(quantized.extract_feat(img))
+
+    _convert_detector(quantized, targets)
+    quantized.quant_cfg = dict(backend=backend, modules=tuple(modules))
+    return quantized
+
+
+def save_quantized_checkpoint(model, filename, meta=None):
+    """Save a detector returned by :func:`quantize_detector`.
+
+    The int8 weights are packed by the quantized modules themselves, so the
+    checkpoint is built from :meth:`nn.Module.state_dict` rather than
+    :func:`mycv.runner.save_checkpoint`.
+
+    Args:
+        model (nn.Module): The quantized detector.
+        filename (str): The checkpoint file name.
+        meta (dict, optional): Extra information to save, e.g. the config.
+    """
+    assert hasattr(model, 'quant_cfg'), \
+        'The model is not returned by quantize_detector'
+    meta = {} if meta is None else dict(meta)
+    meta.update(quant_cfg=model.quant_cfg)
+    torch.save(dict(meta=meta, state_dict=model.state_dict()), filename)
+
+
+def load_quantized_detector(model, filename, example_img=None):
+    """Load a checkpoint saved by :func:`save_quantized_checkpoint`.
+
+    The float detector is quantized again with the same settings but without
+    calibration, and the int8 weights and activation ranges are then loaded
+    from the checkpoint.
+
+    Args:
+        model (nn.Module): The float detector built from the same config.
+        filename (str): The checkpoint file name.
+        example_img (Tensor, optional): An image batch to trace the detector
+            with. Defaults to a blank 64x64 image.
+
+    Returns:
+        nn.Module: The quantized detector in eval mode on CPU.
+    """
+    # the packed int8 weights are not plain tensors
+    checkpoint = torch.load(filename, map_location='cpu', weights_only=False)
+    quant_cfg = checkpoint['meta']['quant_cfg']
+    torch.backends.quantized.engine = quant_cfg['backend']
+    if example_img is None:
+        example_img = torch.zeros(1, 3, 64, 64)
+
+    model.eval()
+    quantized = copy.deepcopy(model).cpu()
+    targets = _get_quant_targets(quantized, quant_cfg['modules'])
+    with warnings.catch_warnings():
+        # the skipped targets were reported by quantize_detector, and the
+        # observers are empty as the ranges come from the checkpoint
+        warnings.simplefilter('ignore')
+        targets = _prepare_detector(quantized, targets, example_img,
+                                    quant_cfg['backend'])
+        _convert_detector(quantized, targets)
+
+    quantized.load_state_dict(checkpoint['state_dict'])
+    quantized.quant_cfg = quant_cfg
+    return quantized
@@ -1,3 +1,4 @@
+from .boundary import BoundaryResult, FourierBoundaryResult
 from .visualize import *
 from .utils import *
 from .bbox import *
@@ -0,0 +1,296 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def fourier_basis(fourier_degree, num_points, dtype='complex128'):
+    """Inverse DFT basis which maps Fourier coefficients to polygon points.
+
+    The basis is cached per (fourier_degree, num_points, dtype), so it is
+    only built once and shared by every caller.
+
+    Args:
+        fourier_degree (int): The maximum Fourier transform degree k.
+        num_points (int): Number of reconstructed polygon points n.
+        dtype (str): Complex data type of the basis.
+
+    Returns:
+        ndarray: A read-only basis shaped (2k+1, n), whose entry (j, i) is
+        ``exp(2j * pi * (j - k) * i / n)``.
+    """
+    k_vect = np.arange(-fourier_degree, fourier_degree + 1).reshape(-1, 1)
+    i_vect = np.arange(0, num_points).reshape(1, -1)
+
+    basis = np.exp(2j * np.pi / num_points * k_vect * i_vect).astype(dtype)
+    basis.setflags(write=False)
+    return basis
+
+
+class BoundaryResult:
+    """Text boundaries of one image stored as compact arrays.
+
+    This is the ndarray counterpart of the legacy ``list[list[float]]``
+    boundary format, in which every boundary is a flat list of point
+    coordinates followed by its score. The legacy format is only built on
+    demand by :meth:`to_list`.
+
+    Args:
+        points (ndarray): The boundary points of shape (N, P, 2).
+        scores (ndarray): The boundary scores of shape (N, ).
+
+    Example:
+        >>> result = BoundaryResult.from_list(
+        ...     [[0, 0, 4, 0, 4, 2, 0, 2, 0.9]])
+        >>> result.points.shape, result.scores.shape
+        ((1, 4, 2), (1,))
+        >>> result.rescale(np.array([0.5, 0.5, 0.5, 0.5])).to_list()
+        [[0.0, 0.0, 2.0, 0.0, 2.0, 1.0, 0.0, 1.0, 0.8999999761581421]]
+    """
+
+    def __init__(self, points, scores):
+        points = np.asarray(points, dtype=np.float32)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        assert points.ndim == 3 and points.shape[2] == 2
+        assert len(points) == len(scores)
+
+        self.points = points
+        self.scores = scores
+
+    @classmethod
+    def from_array(cls, boundaries):
+        """Create from boundaries with scores of shape (N, 2P+1), whose last
+        column holds the scores."""
+        assert isinstance(boundaries, np.ndarray) and boundaries.ndim == 2
+        num_points = (boundaries.shape[1] - 1) // 2
+        return cls(boundaries[:, :-1].reshape(len(boundaries), num_points, 2),
+                   boundaries[:, -1])
+
+    @classmethod
+    def from_list(cls, boundaries):
+        """Create from the legacy ``list[list[float]]`` format, in which all
+        boundaries have the same number of points."""
+        assert isinstance(boundaries, list)
+        if len(boundaries) == 0:
+            return cls(np.zeros((0, 0, 2)), np.zeros((0, )))
+        return cls.from_array(np.array(boundaries, dtype=np.float64))
+
+    @classmethod
+    def concatenate(cls, results):
+        """Concatenate a list of :obj:`BoundaryResult` with the same number
+        of points per boundary."""
+        results = [result for result in results if len(result) > 0]
+        if len(results) == 0:
+            return cls(np.zeros((0, 0, 2)), np.zeros((0, )))
+        return cls(
+            np.concatenate([result.points for result in results]),
+            np.concatenate([result.scores for result in results]))
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, index):
+        """Select boundaries by a slice, an index array or a bool mask."""
+        if isinstance(index, int):
+            index = [index]
+        return BoundaryResult(self.points[index], self.scores[index])
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(num_boundaries={len(self)}, '
+                f'num_points={self.points.shape[1]})')
+
+    @property
+    def flat_points(self):
+        """ndarray: The boundary points of shape (N, 2P) in
+        (x0, y0, x1, y1, ...) order."""
+        return self.points.reshape(len(self), 2 * self.points.shape[1])
+
+    @property
+    def nbytes(self):
+        """int: The number of bytes of the stored arrays."""
+        return self.points.nbytes + self.scores.nbytes
+
+    def rescale(self, scale_factor):
+        """Rescale the boundary points.
+
+        Args:
+            scale_factor (ndarray): The scale factor of size (4, ) or (2, ),
+                whose first two elements scale x and y.
+
+        Returns:
+            :obj:`BoundaryResult`: The rescaled boundaries.
+        """
+        scale_factor = np.asarray(scale_factor, dtype=np.float32)
+        return BoundaryResult(self.points * scale_factor[:2], self.scores)
+
+    def to_array(self):
+        """Convert to an ndarray of shape (N, 2P+1) with the scores as the
+        last column."""
+        return np.concatenate([self.flat_points, self.scores[:, None]],
+                              axis=1)
+
+    def to_list(self):
+        """Convert to the legacy ``list[list[float]]`` format."""
+        return self.to_array().tolist()
+
+
+class FourierBoundaryResult:
+    """Text boundaries of one image stored as Fourier coefficients.
+
+    Each boundary is kept as its :math:`2k+1` complex Fourier coefficients
+    instead of polygon points, which takes a fraction of the memory of a
+    :obj:`BoundaryResult`. Polygons are reconstructed lazily at any requested
+    number of points by :meth:`to_boundary_result`.
+
+    The coefficients stay in the coordinates they were decoded in. As in the
+    legacy path of :obj:`FCEPostprocessor`, the reconstructed points are
+    truncated to integers there, then moved by ``offsets`` and scaled by
+    ``scale_factor``, which :meth:`translate` and :meth:`rescale` update. The
+    polygons are thus the same as those of the other result formats.
+
+    Args:
+        coeffs (ndarray): The complex Fourier coefficients of shape
+            (N, 2k+1), ordered from degree -k to k.
+        scores (ndarray): The boundary scores of shape (N, ).
+        num_points (int): The default number of points of reconstructed
+            polygons.
+        offsets (ndarray, optional): The (x, y) offset of each boundary of
+            shape (N, 2), added to the truncated points. Default: zeros.
+        scale_factor (ndarray, optional): The (x, y) scale of the points
+            after the offsets are added. Default: ones.
+    """
+
+    def __init__(self,
+                 coeffs,
+                 scores,
+                 num_points=50,
+                 offsets=None,
+                 scale_factor=None):
+        coeffs = np.asarray(coeffs, dtype=np.complex64)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        assert coeffs.ndim == 2 and coeffs.shape[1] % 2 == 1
+        assert len(coeffs) == len(scores)
+        if offsets is None:
+            offsets = np.zeros((len(scores), 2), dtype=np.float32)
+        offsets = np.asarray(offsets, dtype=np.float32)
+        assert offsets.shape == (len(scores), 2)
+        if scale_factor is None:
+            scale_factor = np.ones(2, dtype=np.float32)
+        scale_factor = np.asarray(scale_factor, dtype=np.float32)[:2]
+
+        self.coeffs = coeffs
+        self.scores = scores
+        self.num_points = num_points
+        self.offsets = offsets
+        self.scale_factor = scale_factor
+
+    @classmethod
+    def concatenate(cls, results):
+        """Concatenate a list of :obj:`FourierBoundaryResult` with the same
+        Fourier degree and scale factor."""
+        assert len(results) > 0
+        scale_factor = results[0].scale_factor
+        assert all(
+            np.array_equal(result.scale_factor, scale_factor)
+            for result in results)
+        return cls(
+            np.concatenate([result.coeffs for result in results]),
+            np.concatenate([result.scores for result in results]),
+            results[0].num_points,
+            np.concatenate([result.offsets for result in results]),
+            scale_factor)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, index):
+        """Select boundaries by a slice, an index array or a bool mask."""
+        if isinstance(index, int):
+            index = [index]
+        return FourierBoundaryResult(self.coeffs[index], self.scores[index],
+                                     self.num_points, self.offsets[index],
+                                     self.scale_factor)
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(num_boundaries={len(self)}, '
+                f'fourier_degree={self.fourier_degree})')
+
+    @property
+    def fourier_degree(self):
+        """int: The maximum Fourier transform degree k."""
+        return (self.coeffs.shape[1] - 1) // 2
+
+    @property
+    def nbytes(self):
+        """int: The number of bytes of the stored arrays."""
+        return (self.coeffs.nbytes + self.scores.nbytes +
+                self.offsets.nbytes + self.scale_factor.nbytes)
+
+    @property
+    def flat_points(self):
+        """ndarray: The polygon points with the default number of points,
+        of shape (N, 2P) in (x0, y0, x1, y1, ...) order."""
+        return self.to_polygons().reshape(len(self), 2 * self.num_points)
+
+    def translate(self, offset):
+        """Move the boundaries.
+
+        Args:
+            offset (ndarray): The (x, y) offset in the scaled coordinates.
+
+        Returns:
+            :obj:`FourierBoundaryResult`: The moved boundaries.
+        """
+        offset = np.asarray(offset, dtype=np.float32) / self.scale_factor
+        return FourierBoundaryResult(self.coeffs, self.scores,
+                                     self.num_points, self.offsets + offset,
+                                     self.scale_factor)
+
+    def rescale(self, scale_factor):
+        """Rescale the boundaries.
+
+        Args:
+            scale_factor (ndarray): The scale factor of size (4, ) or (2, ),
+                whose first two elements scale x and y.
+
+        Returns:
+            :obj:`FourierBoundaryResult`: The rescaled boundaries.
+        """
+        scale_factor = np.asarray(scale_factor, dtype=np.float32)[:2]
+        return FourierBoundaryResult(self.coeffs, self.scores,
+                                     self.num_points, self.offsets,
+                                     self.scale_factor * scale_factor)
+
+    def _points(self, num_points, dtype):
+        num_points = num_points or self.num_points
+        basis = fourier_basis(self.fourier_degree, num_points)
+        poly_complex = self.coeffs.astype(np.complex128) @ basis
+        # truncated as by fourier2poly
+        points = np.stack([poly_complex.real, poly_complex.imag],
+                          axis=-1).astype(np.int32).astype(dtype)
+        return (points + self.offsets[:, None].astype(dtype)) * \
+            self.scale_factor.astype(dtype)
+
+    def to_polygons(self, num_points=None):
+        """Reconstruct the polygons.
+
+        Args:
+            num_points (int, optional): The number of points of each polygon.
+                Defaults to ``self.num_points``.
+
+        Returns:
+            ndarray: The float32 polygon points of shape (N, num_points, 2).
+        """
+        return self._points(num_points, np.float32)
+
+    def to_boundary_result(self, num_points=None):
+        """Reconstruct the polygons as a :obj:`BoundaryResult`."""
+        return BoundaryResult(self.to_polygons(num_points), self.scores)
+
+    def to_list(self, num_points=None):
+        """Reconstruct the polygons in the legacy ``list[list[float]]``
+        format, computed in float64 as by ``result_format='list'``."""
+        points = self._points(num_points, np.float64)
+        return np.concatenate(
+            [points.reshape(len(self), -1), self.scores[:, None]],
+            axis=1).tolist()
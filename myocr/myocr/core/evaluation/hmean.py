@@ -91,7 +91,8 @@ def eval_hmean(results,
 
     Args:
         results (list[dict]): Each dict corresponds to one image,
-            containing the following keys: boundary_result
+            containing the following keys: boundary_result, which is either
+            a list of boundaries with scores or a :obj:`BoundaryResult`
         img_infos (list[dict]): Each dict corresponds to one image,
             containing the following keys: filename, height, width
         ann_infos (list[dict]): Each dict corresponds to one image,
@@ -131,8 +132,14 @@ def eval_hmean(results,
         _, texts, scores = extract_boundary(result)
         if len(texts) > 0:
             assert utils.valid_boundary(texts[0], False)
-        valid_texts, valid_text_scores = filter_2dlist_result(
-            texts, scores, min_score_thr)
+        if isinstance(texts, np.ndarray):
+            # only the boundaries above the threshold are converted to lists
+            inds = scores > min_score_thr
+            valid_texts = texts[inds].tolist()
+            valid_text_scores = scores[inds].tolist()
+        else:
+            valid_texts, valid_text_scores = filter_2dlist_result(
+                texts, scores, min_score_thr)
         preds.append(valid_texts)
         pred_scores.append(valid_text_scores)
 
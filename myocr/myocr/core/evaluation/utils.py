@@ -202,4 +202,93 @@ def select_top_boundary(boundaries_list, scores_list, score_thr):
             selected_boundaries.append([boundary[i] for i in inds])
         else:
             selected_boundaries.append(boundary)
-    return selected_boundaries
\ No newline at end of file
+    return selected_boundaries
+
+
+def ignore_pred(pred_boxes, gt_ignored_index, gt_polys, precision_thr):
+    """Ignore the predicted box if it hits any ignored ground truth.
+
+    Args:
+        pred_boxes (list[ndarray or list]): The predicted boxes of one image.
+        gt_ignored_index (list[int]): The ignored ground truth index list.
+        gt_polys (list[Polygon]): The polygon list of one image.
+        precision_thr (float): The precision threshold.
+
+    Returns:
+        pred_polys (list[Polygon]): The predicted polygon list.
+        pred_points (list[list]): The predicted box list represented
+            by point sequences.
+        pred_ignored_index (list[int]): The ignored text index list.
+    """
+
+    assert isinstance(pred_boxes, list)
+    assert isinstance(gt_ignored_index, list)
+    assert isinstance(gt_polys, list)
+    assert 0 <= precision_thr <= 1
+
+    pred_polys = []
+    pred_points = []
+    pred_ignored_index = []
+
+    gt_ignored_num = len(gt_ignored_index)
+    # get detection polygons
+    for box_id, box in enumerate(pred_boxes):
+        poly = points2polygon(box)
+        pred_polys.append(poly)
+        pred_points.append(box)
+
+        if gt_ignored_num < 1:
+            continue
+
+        # ignore the current detection box
+        # if its overlap with any ignored gt > precision_thr
+        for ignored_box_id in gt_ignored_index:
+            ignored_box = gt_polys[ignored_box_id]
+            inter_area = poly_intersection(poly, ignored_box)
+            area = poly.area
+            precision = 0 if area == 0 else inter_area / area
+            if precision > precision_thr:
+                pred_ignored_index.append(box_id)
+                break
+
+    return pred_polys, pred_points, pred_ignored_index
+
+
+def compute_hmean(accum_hit_recall, accum_hit_prec, gt_num, pred_num):
+    """Compute hmean given hit number, ground truth number and prediction
+    number.
+
+    Args:
+        accum_hit_recall (int|float): Accumulated hits for computing recall.
+        accum_hit_prec (int|float): Accumulated hits for computing precision.
+        gt_num (int): Ground truth number.
+        pred_num (int): Prediction number.
+
+    Returns:
+        recall (float):  The recall value.
+        precision (float): The precision value.
+        hmean (float): The hmean value.
+    """
+
+    assert isinstance(accum_hit_recall, (float, int))
+    assert isinstance(accum_hit_prec, (float, int))
+
+    assert isinstance(gt_num, int)
+    assert isinstance(pred_num, int)
+    assert accum_hit_recall >= 0.0
+    assert accum_hit_prec >= 0.0
+    assert gt_num >= 0.0
+    assert pred_num >= 0.0
+
+    if gt_num == 0:
+        recall = 1.0
+        precision = 0.0 if pred_num > 0 else 1.0
+    else:
+        recall = float(accum_hit_recall) / gt_num
+        precision = 0.0 if pred_num == 0 else float(accum_hit_prec) / pred_num
+
+    denom = recall + precision
+
+    hmean = 0.0 if denom == 0 else (2.0 * precision * recall / denom)
+
+    return recall, precision, hmean
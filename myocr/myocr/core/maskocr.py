@@ -1,4 +1,5 @@
 import myocr.myocr.utils as utils
+from .boundary import BoundaryResult, FourierBoundaryResult
 
 
 def extract_boundary(result):
@@ -13,11 +14,22 @@ def extract_boundary(result):
             list.
         boundaries (list[list[float]]): The boundary list.
         scores (list[float]): The boundary score list.
+
+        If the boundary result is a :obj:`BoundaryResult`, it is returned
+        as is together with the boundary points of shape (N, 2P) and the
+        scores of shape (N, ), without building lists. A
+        :obj:`FourierBoundaryResult` is reconstructed to a
+        :obj:`BoundaryResult` first.
     """
     assert isinstance(result, dict)
     assert 'boundary_result' in result.keys()
 
     boundaries_with_scores = result['boundary_result']
+    if isinstance(boundaries_with_scores, FourierBoundaryResult):
+        boundaries_with_scores = boundaries_with_scores.to_boundary_result()
+    if isinstance(boundaries_with_scores, BoundaryResult):
+        return (boundaries_with_scores, boundaries_with_scores.flat_points,
+                boundaries_with_scores.scores)
     assert utils.is_2dlist(boundaries_with_scores)
 
     boundaries = [b[:-1] for b in boundaries_with_scores]
@@ -5,6 +5,7 @@ import mycv
 import numpy as np
 
 import myocr.myocr.utils as utils
+from .boundary import BoundaryResult, FourierBoundaryResult
 
 
 def imshow_pred_boundary(img,
@@ -24,7 +25,8 @@ def imshow_pred_boundary(img,
 
     Args:
         img (str or ndarray): The image to be displayed.
-        boundaries_with_scores (list[list[float]]): Boundaries with scores.
+        boundaries_with_scores (list[list[float]] | BoundaryResult |
+            FourierBoundaryResult): Boundaries with scores.
         labels (list[int]): Labels of boundaries.
         score_thr (float): Minimum score of boundaries to be shown.
         boundary_color (str or tuple or :obj:`Color`): Color of boundaries.
@@ -38,20 +40,32 @@ def imshow_pred_boundary(img,
         show_score (bool): Whether to show text instance score.
     """
     assert isinstance(img, (str, np.ndarray))
-    assert utils.is_2dlist(boundaries_with_scores)
+    assert isinstance(boundaries_with_scores,
+                      (BoundaryResult, FourierBoundaryResult)) or \
+        utils.is_2dlist(boundaries_with_scores)
     assert utils.is_type_list(labels, int)
     assert utils.equal_len(boundaries_with_scores, labels)
     if len(boundaries_with_scores) == 0:
         warnings.warn('0 text found in ' + out_file)
         return None
 
-    utils.valid_boundary(boundaries_with_scores[0])
     img = mycv.imread(img)
 
-    scores = np.array([b[-1] for b in boundaries_with_scores])
-    inds = scores > score_thr
-    boundaries = [boundaries_with_scores[i][:-1] for i in np.where(inds)[0]]
-    scores = [scores[i] for i in np.where(inds)[0]]
+    if isinstance(boundaries_with_scores, FourierBoundaryResult):
+        boundaries_with_scores = boundaries_with_scores.to_boundary_result()
+    if isinstance(boundaries_with_scores, BoundaryResult):
+        scores = boundaries_with_scores.scores
+        inds = scores > score_thr
+        boundaries = boundaries_with_scores.flat_points[inds]
+        scores = scores[inds]
+    else:
+        utils.valid_boundary(boundaries_with_scores[0])
+        scores = np.array([b[-1] for b in boundaries_with_scores])
+        inds = scores > score_thr
+        boundaries = [
+            boundaries_with_scores[i][:-1] for i in np.where(inds)[0]
+        ]
+        scores = [scores[i] for i in np.where(inds)[0]]
     labels = [labels[i] for i in np.where(inds)[0]]
 
     boundary_color = mycv.color_val(boundary_color)
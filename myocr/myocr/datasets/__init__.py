@@ -1,10 +1,14 @@
 from .dataset_wrappers import (ClassBalancedDataset, ConcatDataset,
                                MultiImageMixDataset, RepeatDataset)
-from .builder import DATASETS, PIPELINES, build_dataset  # , build_dataloader
+from .builder import DATASETS, PIPELINES, build_dataloader, build_dataset
+from .collate import collate, pad_stack
 from .uniform_concat_dataset import UniformConcatDataset
 from .icdar_dataset import IcdarDataset
+from .sharded_dataset import ShardedIcdarDataset, pack_shards
 
 
 __all__ = ['ClassBalancedDataset', 'ConcatDataset', 'MultiImageMixDataset', 'RepeatDataset', 'build_dataset',
-           'UniformConcatDataset', 'IcdarDataset'
+           'build_dataloader', 'collate', 'pad_stack',
+           'UniformConcatDataset', 'IcdarDataset', 'ShardedIcdarDataset',
+           'pack_shards'
            ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from .coco_api import COCO, COCOeval
+from .coco_stream import JsonStream, get_cat_ids, load_coco_stream
 
 
 __all__ = [
-    'COCO', 'COCOeval'
+    'COCO', 'COCOeval', 'JsonStream', 'get_cat_ids', 'load_coco_stream'
 ]
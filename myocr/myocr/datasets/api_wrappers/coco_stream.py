@@ -0,0 +1,190 @@
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# the characters which may follow a complete value
+_DELIMITERS = ' \t\n\r,]}'
+
+
+class JsonStream:
+    """Parse a json file incrementally.
+
+    Only the containers being iterated by :meth:`items` and :meth:`array` are
+    parsed incrementally, every other value is decoded as a whole by
+    :meth:`value`. The file is read in chunks, and only the unparsed part of
+    the current chunk is kept in memory.
+
+    Args:
+        f (file): The json file opened in text mode.
+        chunk_size (int): The number of characters to read at a time.
+            Default: 1 << 20.
+    """
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read the next chunk, returning False at the end of the file."""
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def _next_char(self):
+        self._skip_whitespace()
+        if self.pos == len(self.buffer):
+            raise ValueError('Unexpected end of the json file')
+        char = self.buffer[self.pos]
+        self.pos += 1
+        return char
+
+    def _expect(self, char):
+        got = self._next_char()
+        if got != char:
+            raise ValueError(f'Expect {char!r} at character {self.pos - 1} '
+                             f'of the chunk, got {got!r}')
+
+    def _peek_end(self, char):
+        """Consume ``char`` if it is the next non-whitespace character."""
+        self._skip_whitespace()
+        if self.buffer.startswith(char, self.pos):
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """Decode the next value."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number may continue in the next chunk, e.g. the decoder
+            # stops before the dot of a chunk ending with '-2.'
+            incomplete = end == len(self.buffer) or (
+                isinstance(value, (int, float))
+                and self.buffer[end] not in _DELIMITERS)
+            if incomplete and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Iterate over the keys of the next object.
+
+        The value of each key must be consumed by the caller, with
+        :meth:`value` or :meth:`array`, before the next key is taken.
+        """
+        self._expect('{')
+        if self._peek_end('}'):
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self._next_char() == '}':
+                return
+            self.pos -= 1
+            self._expect(',')
+
+    def array(self):
+        """Iterate over the values of the next array."""
+        self._expect('[')
+        if self._peek_end(']'):
+            return
+        while True:
+            yield self.value()
+            if self._next_char() == ']':
+                return
+            self.pos -= 1
+            self._expect(',')
+
+
+def load_coco_stream(ann_file, builder, max_images=-1, chunk_size=1 << 20):
+    """Load a COCO style annotation file without keeping the json tree.
+
+    The images and the annotations are parsed one by one and added to
+    ``builder``. The parsing stops as soon as the ``images``,
+    ``annotations`` and ``categories`` fields are read. If ``max_images`` is
+    set, the images after it are skipped without being kept, and so are
+    their annotations if the ``images`` field comes before the
+    ``annotations`` field, as in the files converted by MMOCR.
+
+    Args:
+        ann_file (str): The local path of the annotation file.
+        builder (PackedAnnotationsBuilder): The builder to add the images
+            and the annotations to.
+        max_images (int): The number of images to load. All the images are
+            loaded if it is not positive. Default: -1.
+        chunk_size (int): The number of characters to read at a time.
+            Default: 1 << 20.
+
+    Returns:
+        list[dict]: The categories.
+    """
+    categories = []
+    todo = {'images', 'annotations', 'categories'}
+    kept_img_ids = None
+    with open(ann_file, encoding='utf-8') as f:
+        stream = JsonStream(f, chunk_size)
+        for key in stream.items():
+            if key == 'images':
+                for img in stream.array():
+                    if max_images <= 0 or len(builder) < max_images:
+                        builder.add_image(img)
+                    elif todo == {'images'}:
+                        # nothing else to read
+                        return categories
+                if max_images > 0:
+                    kept_img_ids = set(builder.img_ids)
+            elif key == 'annotations':
+                for ann in stream.array():
+                    if kept_img_ids is None or ann['image_id'] in kept_img_ids:
+                        builder.add_annotation(ann)
+            elif key == 'categories':
+                categories = stream.value()
+            else:
+                stream.value()
+            todo.discard(key)
+            if not todo:
+                break
+    return categories
+
+
+def get_cat_ids(categories, cat_names):
+    """Get the ids of the categories with the given names.
+
+    It is the same as ``COCO.get_cat_ids(cat_names=cat_names)``.
+
+    Args:
+        categories (list[dict]): The ``categories`` field of a COCO style
+            annotation file.
+        cat_names (str | Sequence[str]): The category names.
+
+    Returns:
+        list[int]: The category ids, in the order of ``categories``.
+    """
+    if isinstance(cat_names, str):
+        cat_names = [cat_names]
+    if len(cat_names) == 0:
+        return [cat['id'] for cat in categories]
+    return [cat['id'] for cat in categories if cat['name'] in cat_names]
@@ -1,7 +1,16 @@
 import copy
+import random
+import warnings
+from functools import partial
 
+import numpy as np
+import torch
+from mycv.runner import get_dist_info
 from mycv.utils import Registry, build_from_cfg
-# from mycv.runner import get_dist_info
+from torch.utils.data import DataLoader, IterableDataset
+
+from .collate import collate
+from .samplers import DistributedGroupSampler, DistributedSampler, GroupSampler
 
 
 def _concat_dataset(cfg, default_args=None):
@@ -63,123 +72,107 @@ def build_dataset(cfg, default_args=None):
     return dataset
 
 
-# def build_dataloader(dataset,
-#                      samples_per_gpu,
-#                      workers_per_gpu,
-#                      num_gpus=1,
-#                      dist=True,
-#                      shuffle=True,
-#                      seed=None,
-#                      runner_type='EpochBasedRunner',
-#                      persistent_workers=False,
-#                      class_aware_sampler=None,
-#                      **kwargs):
-#     """Build PyTorch DataLoader.
-#
-#     In distributed training, each GPU/process has a dataloader.
-#     In non-distributed training, there is only one dataloader for all GPUs.
-#
-#     Args:
-#         dataset (Dataset): A PyTorch dataset.
-#         samples_per_gpu (int): Number of training samples on each GPU, i.e.,
-#             batch size of each GPU.
-#         workers_per_gpu (int): How many subprocesses to use for data loading
-#             for each GPU.
-#         num_gpus (int): Number of GPUs. Only used in non-distributed training.
-#         dist (bool): Distributed training/test or not. Default: True.
-#         shuffle (bool): Whether to shuffle the data at every epoch.
-#             Default: True.
-#         seed (int, Optional): Seed to be used. Default: None.
-#         runner_type (str): Type of runner. Default: `EpochBasedRunner`
-#         persistent_workers (bool): If True, the data loader will not shutdown
-#             the worker processes after a dataset has been consumed once.
-#             This allows to maintain the workers `Dataset` instances alive.
-#             This argument is only valid when PyTorch>=1.7.0. Default: False.
-#         class_aware_sampler (dict): Whether to use `ClassAwareSampler`
-#             during training. Default: None.
-#         kwargs: any keyword argument to be used to initialize DataLoader
-#
-#     Returns:
-#         DataLoader: A PyTorch dataloader.
-#     """
-#     rank, world_size = get_dist_info()
-#
-#     if dist:
-#         # When model is :obj:`DistributedDataParallel`,
-#         # `batch_size` of :obj:`dataloader` is the
-#         # number of training samples on each GPU.
-#         batch_size = samples_per_gpu
-#         num_workers = workers_per_gpu
-#     else:
-#         # When model is obj:`DataParallel`
-#         # the batch size is samples on all the GPUS
-#         batch_size = num_gpus * samples_per_gpu
-#         num_workers = num_gpus * workers_per_gpu
-#
-#     if runner_type == 'IterBasedRunner':
-#         # this is a batch sampler, which can yield
-#         # a mini-batch indices each time.
-#         # it can be used in both `DataParallel` and
-#         # `DistributedDataParallel`
-#         if shuffle:
-#             batch_sampler = InfiniteGroupBatchSampler(
-#                 dataset, batch_size, world_size, rank, seed=seed)
-#         else:
-#             batch_sampler = InfiniteBatchSampler(
-#                 dataset,
-#                 batch_size,
-#                 world_size,
-#                 rank,
-#                 seed=seed,
-#                 shuffle=False)
-#         batch_size = 1
-#         sampler = None
-#     else:
-#         if class_aware_sampler is not None:
-#             # ClassAwareSampler can be used in both distributed and
-#             # non-distributed training.
-#             num_sample_class = class_aware_sampler.get('num_sample_class', 1)
-#             sampler = ClassAwareSampler(
-#                 dataset,
-#                 samples_per_gpu,
-#                 world_size,
-#                 rank,
-#                 seed=seed,
-#                 num_sample_class=num_sample_class)
-#         elif dist:
-#             # DistributedGroupSampler will definitely shuffle the data to
-#             # satisfy that images on each GPU are in the same group
-#             if shuffle:
-#                 sampler = DistributedGroupSampler(
-#                     dataset, samples_per_gpu, world_size, rank, seed=seed)
-#             else:
-#                 sampler = DistributedSampler(
-#                     dataset, world_size, rank, shuffle=False, seed=seed)
-#         else:
-#             sampler = GroupSampler(dataset,
-#                                    samples_per_gpu) if shuffle else None
-#         batch_sampler = None
-#
-#     init_fn = partial(
-#         worker_init_fn, num_workers=num_workers, rank=rank,
-#         seed=seed) if seed is not None else None
-#
-#     if (TORCH_VERSION != 'parrots'
-#             and digit_version(TORCH_VERSION) >= digit_version('1.7.0')):
-#         kwargs['persistent_workers'] = persistent_workers
-#     elif persistent_workers is True:
-#         warnings.warn('persistent_workers is invalid because your pytorch '
-#                       'version is lower than 1.7.0')
-#
-#     data_loader = DataLoader(
-#         dataset,
-#         batch_size=batch_size,
-#         sampler=sampler,
-#         num_workers=num_workers,
-#         batch_sampler=batch_sampler,
-#         collate_fn=partial(collate, samples_per_gpu=samples_per_gpu),
-#         pin_memory=kwargs.pop('pin_memory', False),
-#         worker_init_fn=init_fn,
-#         **kwargs)
-#
-#     return data_loader
+def build_dataloader(dataset,
+                     samples_per_gpu,
+                     workers_per_gpu,
+                     num_gpus=1,
+                     dist=True,
+                     shuffle=True,
+                     seed=None,
+                     persistent_workers=False,
+                     pin_memory=False,
+                     prefetch_factor=2,
+                     collate_cfg=None,
+                     **kwargs):
+    """Build PyTorch DataLoader.
+
+    In distributed training, each GPU/process has a dataloader.
+    In non-distributed training, there is only one dataloader for all GPUs.
+
+    Args:
+        dataset (Dataset): A PyTorch dataset.
+        samples_per_gpu (int): Number of training samples on each GPU, i.e.,
+            batch size of each GPU.
+        workers_per_gpu (int): How many subprocesses to use for data loading
+            for each GPU.
+        num_gpus (int): Number of GPUs. Only used in non-distributed training.
+        dist (bool): Distributed training/test or not. Default: True.
+        shuffle (bool): Whether to shuffle the data at every epoch. The images
+            of a batch are sampled from the same group of ``dataset.flag``,
+            e.g. the same aspect ratio group. Default: True.
+        seed (int, Optional): Seed to be used. Default: None.
+        persistent_workers (bool): If True, the data loader will not shutdown
+            the worker processes after a dataset has been consumed once.
+            This allows to maintain the workers `Dataset` instances alive.
+            Only used when there are workers. Default: False.
+        pin_memory (bool): Whether to copy the batches into pinned memory,
+            which speeds up the copy to GPUs. Default: False.
+        prefetch_factor (int): The number of batches loaded in advance by
+            each worker. Only used when there are workers. Default: 2.
+        collate_cfg (dict, optional): The keyword arguments of
+            :func:`collate`, e.g. ``dict(size_divisor=32)``. Default: None.
+        kwargs: any keyword argument to be used to initialize DataLoader
+
+    Returns:
+        DataLoader: A PyTorch dataloader.
+    """
+    rank, world_size = get_dist_info()
+
+    if dist:
+        # When model is :obj:`DistributedDataParallel`,
+        # `batch_size` of :obj:`dataloader` is the
+        # number of training samples on each GPU.
+        batch_size = samples_per_gpu
+        num_workers = workers_per_gpu
+    else:
+        # When model is obj:`DataParallel`
+        # the batch size is samples on all the GPUS
+        batch_size = num_gpus * samples_per_gpu
+        num_workers = num_gpus * workers_per_gpu
+
+    if isinstance(dataset, IterableDataset):
+        # the dataset splits and shuffles the data itself
+        sampler = None
+    elif dist:
+        # DistributedGroupSampler will definitely shuffle the data to
+        # satisfy that images on each GPU are in the same group
+        if shuffle:
+            sampler = DistributedGroupSampler(
+                dataset, samples_per_gpu, world_size, rank, seed=seed)
+        else:
+            sampler = DistributedSampler(
+                dataset, world_size, rank, shuffle=False, seed=seed)
+    else:
+        sampler = GroupSampler(dataset, samples_per_gpu) if shuffle else None
+
+    init_fn = partial(
+        worker_init_fn, num_workers=num_workers, rank=rank,
+        seed=seed) if seed is not None else None
+
+    if num_workers > 0:
+        kwargs['persistent_workers'] = persistent_workers
+        kwargs['prefetch_factor'] = prefetch_factor
+    elif persistent_workers:
+        warnings.warn('persistent_workers is invalid because there are no '
+                      'dataloader workers')
+
+    data_loader = DataLoader(
+        dataset,
+        batch_size=batch_size,
+        sampler=sampler,
+        num_workers=num_workers,
+        collate_fn=partial(collate, **(collate_cfg or {})),
+        pin_memory=pin_memory,
+        worker_init_fn=init_fn,
+        **kwargs)
+
+    return data_loader
+
+
+def worker_init_fn(worker_id, num_workers, rank, seed):
+    # The seed of each worker equals to
+    # num_worker * rank + worker_id + user_seed
+    worker_seed = num_workers * rank + worker_id + seed
+    np.random.seed(worker_seed)
+    random.seed(worker_seed)
+    torch.manual_seed(worker_seed)
@@ -1,7 +1,10 @@
 import contextlib
+import hashlib
 import io
 import itertools
+import json
 import logging
+import os
 import os.path as osp
 import tempfile
 import warnings
@@ -13,13 +16,37 @@ from mycv.utils import print_log
 from terminaltables import AsciiTable
 
 from myocr.myocr.core import eval_recalls
-from .api_wrappers import COCO, COCOeval
+from .api_wrappers import COCO, COCOeval, get_cat_ids, load_coco_stream
 from .builder import DATASETS
 from .custom import CustomDataset
+from .packed_annotations import PackedAnnotations, PackedAnnotationsBuilder
 
 
 @DATASETS.register_module()
 class CocoDataset(CustomDataset):
+    """Dataset for COCO style annotation files.
+
+    Args:
+        packed (bool): Whether to pack the images and annotations into
+            :class:`PackedAnnotations` and release the COCO api, so that the
+            dataloader workers forked from the main process share them
+            instead of copying them. The COCO style evaluation is not
+            available then. Default: False.
+        ann_cache_dir (str, optional): The directory to cache the packed
+            annotations in. The cache is keyed by the configured
+            ``ann_file``, its size and modification time, or the digest of
+            its content for a remote file, and the options used to load it,
+            e.g. the classes. Later runs memory-map the cache
+            instead of parsing the annotation file again. It implies
+            ``packed=True``. Default: None.
+        streaming (bool): Whether to parse the annotation file incrementally
+            into the packed annotations, without building the whole json
+            tree and the COCO api in memory. It implies ``packed=True``.
+            Default: False.
+
+    The other arguments are the same as :class:`CustomDataset`.
+    """
+
     CLASSES = ('person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus',
                'train', 'truck', 'boat', 'traffic light', 'fire hydrant',
                'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog',
@@ -57,6 +84,127 @@ class CocoDataset(CustomDataset):
                (95, 54, 80), (128, 76, 255), (201, 57, 1), (246, 0, 122),
                (191, 162, 208)]
 
+    def __init__(self,
+                 *args,
+                 packed=False,
+                 ann_cache_dir=None,
+                 streaming=False,
+                 **kwargs):
+        self.packed = packed or ann_cache_dir is not None or streaming
+        self.ann_cache_dir = ann_cache_dir
+        self.streaming = streaming
+        super().__init__(*args, **kwargs)
+
+    def _ann_cache_key(self, local_path):
+        """The information which invalidates the cache when it changes.
+
+        The cache is keyed by the configured ``self.ann_file``, not by the
+        path it is read from, which may be a temporary copy of a remote
+        file. A local file is identified by its size and modification time,
+        and a remote one by the size and the digest of its downloaded copy.
+
+        Args:
+            local_path (str): The local path the annotation file is read
+                from.
+        """
+        stat = os.stat(local_path)
+        classes = self.CLASSES if isinstance(self.CLASSES,
+                                             str) else list(self.CLASSES)
+        key = dict(
+            version=PackedAnnotations.VERSION,
+            ann_file=self.ann_file,
+            size=stat.st_size,
+            classes=classes)
+        if osp.isfile(self.ann_file) and osp.samefile(self.ann_file,
+                                                      local_path):
+            key.update(
+                ann_file=osp.abspath(self.ann_file),
+                mtime_ns=stat.st_mtime_ns)
+        else:
+            sha1 = hashlib.sha1()
+            with open(local_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha1.update(chunk)
+            key['sha1'] = sha1.hexdigest()
+        return key
+
+    def _ann_cache_file(self, local_path):
+        """Get the cache file of the annotation file and its key.
+
+        Args:
+            local_path (str): The local path the annotation file is read
+                from.
+
+        Returns:
+            tuple(str, dict): The cache file, or None if the annotations are
+            not cached, and the cache key.
+        """
+        if self.ann_cache_dir is None or not osp.isfile(local_path):
+            return None, None
+        key = self._ann_cache_key(local_path)
+        digest = hashlib.sha1(
+            json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        name = osp.splitext(osp.basename(self.ann_file))[0]
+        return osp.join(self.ann_cache_dir, f'{name}_{digest[:16]}.bin'), key
+
+    def _load_ann_cache(self, local_path):
+        """Load the cached annotations.
+
+        Args:
+            local_path (str): The local path the annotation file is read
+                from.
+
+        Returns:
+            PackedAnnotations | None: The cached annotations, or None if
+            there is no valid cache.
+        """
+        cache_file, key = self._ann_cache_file(local_path)
+        if cache_file is None or not osp.isfile(cache_file):
+            return None
+        data_infos, meta = PackedAnnotations.load(cache_file)
+        if meta['key'] != key:
+            return None
+        self.coco = None
+        self.cat_ids = meta['cat_ids']
+        self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
+        self.img_ids = data_infos.img_ids
+        return data_infos
+
+    def _stream_annotations(self, local_path, max_images=-1):
+        """Parse the annotation file incrementally into packed annotations.
+
+        Args:
+            local_path (str): The local path the annotation file is read
+                from.
+            max_images (int): The number of images to load. All the images
+                are loaded if it is not positive. Default: -1.
+
+        Returns:
+            PackedAnnotations: The packed annotations.
+        """
+        builder = PackedAnnotationsBuilder()
+        categories = load_coco_stream(local_path, builder, max_images)
+        self.coco = None
+        self.cat_ids = get_cat_ids(categories, self.CLASSES)
+        self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
+        return self._set_packed_annotations(local_path, builder.build())
+
+    def _pack_annotations(self, local_path, img_ids):
+        """Pack the given images of ``self.coco``, cache and release it."""
+        data_infos = PackedAnnotations.from_coco(self.coco, img_ids)
+        return self._set_packed_annotations(local_path, data_infos)
+
+    def _set_packed_annotations(self, local_path, data_infos):
+        assert len(np.unique(data_infos.ann_ids)) == data_infos.num_anns, \
+            f"Annotation ids in '{self.ann_file}' are not unique!"
+        cache_file, key = self._ann_cache_file(local_path)
+        if cache_file is not None:
+            mycv.mkdir_or_exist(self.ann_cache_dir)
+            data_infos.dump(cache_file, dict(key=key, cat_ids=self.cat_ids))
+        self.coco = None
+        self.img_ids = data_infos.img_ids
+        return data_infos
+
     def load_annotations(self, ann_file):
         """Load annotation from COCO style annotation file.
 
@@ -64,8 +212,14 @@ class CocoDataset(CustomDataset):
             ann_file (str): Path of annotation file.
 
         Returns:
-            list[dict]: Annotation info from COCO api.
+            list[dict] | PackedAnnotations: Annotation info from COCO api.
         """
+        if self.ann_cache_dir is not None:
+            data_infos = self._load_ann_cache(ann_file)
+            if data_infos is not None:
+                return data_infos
+        if self.streaming:
+            return self._stream_annotations(ann_file)
 
         self.coco = COCO(ann_file)
         # The order of returned `cat_ids` will not
@@ -74,6 +228,8 @@ class CocoDataset(CustomDataset):
 
         self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
         self.img_ids = self.coco.get_img_ids()
+        if self.packed:
+            return self._pack_annotations(ann_file, self.img_ids)
         data_infos = []
         total_ann_ids = []
         for i in self.img_ids:
@@ -96,6 +252,9 @@ class CocoDataset(CustomDataset):
             dict: Annotation info of specified index.
         """
 
+        if self.packed:
+            return self._parse_ann_info(self.data_infos[idx],
+                                        self.data_infos.get_anns(idx))
         img_id = self.data_infos[idx]['id']
         ann_ids = self.coco.get_ann_ids(img_ids=[img_id])
         ann_info = self.coco.load_anns(ann_ids)
@@ -111,6 +270,8 @@ class CocoDataset(CustomDataset):
             list[int]: All categories in the image of specified index.
         """
 
+        if self.packed:
+            return self.data_infos.get_cat_ids(idx)
         img_id = self.data_infos[idx]['id']
         ann_ids = self.coco.get_ann_ids(img_ids=[img_id])
         ann_info = self.coco.load_anns(ann_ids)
@@ -118,6 +279,14 @@ class CocoDataset(CustomDataset):
 
     def _filter_imgs(self, min_size=32):
         """Filter images too small or without ground truths."""
+        if self.packed:
+            valid = np.minimum(self.data_infos.widths,
+                               self.data_infos.heights) >= min_size
+            if self.filter_empty_gt:
+                valid &= self.data_infos.in_cats(self.cat_ids)
+            valid_inds = np.flatnonzero(valid)
+            self.img_ids = self.img_ids[valid_inds]
+            return valid_inds
         valid_inds = []
         # obtain images that contain annotation
         ids_with_ann = set(_['image_id'] for _ in self.coco.anns.values())
@@ -140,6 +309,13 @@ class CocoDataset(CustomDataset):
         self.img_ids = valid_img_ids
         return valid_inds
 
+    def _set_group_flag(self):
+        """Set flag according to image aspect ratio."""
+        if not self.packed:
+            return super()._set_group_flag()
+        aspect_ratios = self.data_infos.widths / self.data_infos.heights
+        self.flag = (aspect_ratios > 1).astype(np.uint8)
+
     def _parse_ann_info(self, img_info, ann_info):
         """Parse bbox and mask annotation.
 
@@ -0,0 +1,83 @@
+from collections.abc import Mapping, Sequence
+
+import torch
+import torch.nn.functional as F
+
+
+def pad_stack(tensors, size_divisor=1, pad_value=0):
+    """Pad tensors to the same spatial size and stack them.
+
+    The last two dimensions are padded at the bottom and the right to the
+    largest height and width in the batch, rounded up to a multiple of
+    ``size_divisor``.
+
+    Args:
+        tensors (list[Tensor]): Tensors of shape (..., H, W) whose leading
+            dimensions are the same.
+        size_divisor (int): The padded height and width are divisible by it.
+            Default: 1.
+        pad_value (float): The value to pad with. Default: 0.
+
+    Returns:
+        Tensor: The stacked tensor of shape (N, ..., H_max, W_max).
+    """
+    assert len(tensors) > 0
+    assert all(t.shape[:-2] == tensors[0].shape[:-2] for t in tensors)
+    max_h = max(t.shape[-2] for t in tensors)
+    max_w = max(t.shape[-1] for t in tensors)
+    max_h = (max_h + size_divisor - 1) // size_divisor * size_divisor
+    max_w = (max_w + size_divisor - 1) // size_divisor * size_divisor
+
+    out = tensors[0].new_full((len(tensors), *tensors[0].shape[:-2], max_h,
+                               max_w), pad_value)
+    for i, t in enumerate(tensors):
+        out[i, ..., :t.shape[-2], :t.shape[-1]] = t
+    return out
+
+
+def _collate_values(values, pad, size_divisor, pad_value):
+    if all(isinstance(v, torch.Tensor) for v in values):
+        if pad and values[0].dim() >= 2:
+            return pad_stack(values, size_divisor, pad_value)
+        if all(v.shape == values[0].shape for v in values):
+            return torch.stack(values)
+        return list(values)
+    if pad and all(
+            isinstance(v, Sequence) and not isinstance(v, str)
+            and len(v) == len(values[0]) for v in values):
+        # test time augmentations, e.g. [img_aug0, img_aug1] of each sample
+        return [
+            _collate_values(list(aug_values), pad, size_divisor, pad_value)
+            for aug_values in zip(*values)
+        ]
+    return list(values)
+
+
+def collate(batch, pad_keys=('img', ), size_divisor=32, pad_value=0):
+    """Collate the results of a dataset into a batch.
+
+    The images in ``pad_keys`` may have different sizes and are padded to
+    the largest one of the batch, see :func:`pad_stack`. The other tensors
+    are stacked if they have the same shape. Anything else, e.g. the image
+    metas and the numpy targets, is kept as a list of the batch size.
+
+    Args:
+        batch (list[dict]): The results of the data pipeline.
+        pad_keys (tuple[str]): The keys of the images to pad. Default:
+            ('img', ).
+        size_divisor (int): The padded height and width are divisible by it.
+            Default: 32.
+        pad_value (float): The value to pad the images with. Default: 0.
+
+    Returns:
+        dict: The batch.
+    """
+    assert len(batch) > 0
+    assert isinstance(batch[0], Mapping), \
+        f'{type(batch[0])} is not supported, the data pipeline should ' \
+        'return dicts'
+    return {
+        key: _collate_values([results[key] for results in batch], key
+                             in pad_keys, size_divisor, pad_value)
+        for key in batch[0]
+    }
@@ -10,6 +10,7 @@ from torch.utils.data import Dataset
 
 from myocr.myocr.core import eval_map, eval_recalls
 from .builder import DATASETS
+from .packed_annotations import PackedAnnotations
 from .pipelines import Compose
 
 
@@ -120,7 +121,10 @@ class CustomDataset(Dataset):
         # filter images too small and containing no annotations
         if not test_mode:
             valid_inds = self._filter_imgs()
-            self.data_infos = [self.data_infos[i] for i in valid_inds]
+            if isinstance(self.data_infos, PackedAnnotations):
+                self.data_infos = self.data_infos.subset(valid_inds)
+            else:
+                self.data_infos = [self.data_infos[i] for i in valid_inds]
             if self.proposals is not None:
                 self.proposals = [self.proposals[i] for i in valid_inds]
             # set group flag for the sampler
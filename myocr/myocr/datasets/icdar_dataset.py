@@ -17,6 +17,14 @@ class IcdarDataset(CocoDataset):
     Args:
         ann_file_backend (str): Storage backend for annotation file,
             should be one in ['disk', 'petrel', 'http']. Default to 'disk'.
+        packed (bool): Whether to pack the images and annotations into flat
+            arrays shared by the forked dataloader workers, see
+            :class:`PackedAnnotations`. Default to False.
+        ann_cache_dir (str, optional): The directory to cache the packed
+            annotations in, see :class:`CocoDataset`. Default to None.
+        streaming (bool): Whether to parse the annotation file incrementally
+            into packed annotations, stopping after ``select_first_k``
+            images if it is set, see :class:`CocoDataset`. Default to False.
     """
     CLASSES = ('text')
 
@@ -31,7 +39,10 @@ class IcdarDataset(CocoDataset):
                  test_mode=False,
                  filter_empty_gt=True,
                  select_first_k=-1,
-                 ann_file_backend='disk'):
+                 ann_file_backend='disk',
+                 packed=False,
+                 ann_cache_dir=None,
+                 streaming=False):
         # select first k images for fast debugging.
         self.select_first_k = select_first_k
         assert ann_file_backend in ['disk', 'petrel', 'http']
@@ -46,10 +57,15 @@ class IcdarDataset(CocoDataset):
             seg_prefix=seg_prefix,
             proposal_file=proposal_file,
             test_mode=test_mode,
-            filter_empty_gt=filter_empty_gt)
+            filter_empty_gt=filter_empty_gt,
+            packed=packed,
+            ann_cache_dir=ann_cache_dir,
+            streaming=streaming)
 
-        # Set dummy flags just to be compatible with MMDet
-        self.flag = np.zeros(len(self), dtype=np.uint8)
+        # The aspect ratio groups are only set for training, set dummy flags
+        # to be compatible with MMDet otherwise
+        if not hasattr(self, 'flag'):
+            self.flag = np.zeros(len(self), dtype=np.uint8)
 
     def load_annotations(self, ann_file):
         """Load annotation from COCO style annotation file.
@@ -61,18 +77,39 @@ class IcdarDataset(CocoDataset):
             list[dict]: Annotation info from COCO api.
         """
         if self.ann_file_backend == 'disk':
-            self.coco = COCO(ann_file)
-        else:
-            mmcv_version = digit_version(mycv.__version__)
-            if mmcv_version < digit_version('1.3.16'):
-                raise Exception('Please update mmcv to 1.3.16 or higher '
-                                'to enable "get_local_path" of "FileClient".')
-            file_client = mycv.FileClient(backend=self.ann_file_backend)
-            with file_client.get_local_path(ann_file) as local_path:
-                self.coco = COCO(local_path)
+            return self._load_local_annotations(ann_file)
+        mmcv_version = digit_version(mycv.__version__)
+        if mmcv_version < digit_version('1.3.16'):
+            raise Exception('Please update mmcv to 1.3.16 or higher '
+                            'to enable "get_local_path" of "FileClient".')
+        file_client = mycv.FileClient(backend=self.ann_file_backend)
+        with file_client.get_local_path(ann_file) as local_path:
+            return self._load_local_annotations(local_path)
+
+    def _load_local_annotations(self, local_path):
+        """Load the annotations from a local copy of the annotation file.
+
+        The cache is still keyed by ``self.ann_file``, see
+        :meth:`CocoDataset._ann_cache_key`.
+        """
+        if self.ann_cache_dir is not None:
+            data_infos = self._load_ann_cache(local_path)
+            if data_infos is not None:
+                return data_infos
+
+        # the images after select_first_k are not loaded
+        max_images = self.select_first_k + 1 if self.select_first_k > 0 \
+            else -1
+        if self.streaming:
+            return self._stream_annotations(local_path, max_images)
+        self.coco = COCO(local_path)
         self.cat_ids = self.coco.get_cat_ids(cat_names=self.CLASSES)
         self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
         self.img_ids = self.coco.get_img_ids()
+        if self.packed:
+            if max_images > 0:
+                self.img_ids = self.img_ids[:max_images]
+            return self._pack_annotations(local_path, self.img_ids)
         data_infos = []
 
         count = 0
@@ -85,6 +122,11 @@ class IcdarDataset(CocoDataset):
                 break
         return data_infos
 
+    def _ann_cache_key(self, local_path):
+        key = super()._ann_cache_key(local_path)
+        key['select_first_k'] = self.select_first_k
+        return key
+
     def _parse_ann_info(self, img_info, ann_info):
         """Parse bbox and mask annotation.
 
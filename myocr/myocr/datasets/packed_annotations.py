@@ -0,0 +1,390 @@
+import json
+import os
+from array import array
+
+import numpy as np
+
+
+def take_segments(offsets, inds):
+    """Select variable-length segments of a flat array.
+
+    Segment ``i`` is ``flat[offsets[i]:offsets[i + 1]]``.
+
+    Args:
+        offsets (np.ndarray): The segment offsets of shape (n + 1, ).
+        inds (np.ndarray): The indices of the segments to take.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): The offsets of the taken segments, and
+        the indices into the flat array of their elements, in order.
+    """
+    inds = np.asarray(inds, dtype=np.int64)
+    starts = offsets[inds]
+    lengths = offsets[inds + 1] - starts
+    new_offsets = np.zeros(len(inds) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    flat_inds = np.arange(new_offsets[-1], dtype=np.int64) + np.repeat(
+        starts - new_offsets[:-1], lengths)
+    return new_offsets, flat_inds
+
+
+class PackedAnnotations:
+    """Images and COCO style annotations packed into flat numpy arrays.
+
+    A list of dicts is made of many Python objects, whose reference counts
+    are updated whenever they are read. In the dataloader workers forked
+    from the main process, this copies the pages holding them one by one,
+    until each worker has its own copy of all the annotations. Here there
+    are only a few arrays, so the pages stay shared.
+
+    The annotations of image ``i`` are ``ann_offsets[i]:ann_offsets[i + 1]``,
+    the polygons of annotation ``j`` are ``seg_offsets[j]:seg_offsets[j + 1]``
+    and the coordinates of polygon ``k`` are
+    ``poly_offsets[k]:poly_offsets[k + 1]``. The file names are stored the
+    same way, as utf-8 bytes. The boxes, areas and coordinates are stored in
+    float32, and only polygon segmentations are supported.
+
+    Indexing returns the image info dict, with the ``id``, ``file_name``,
+    ``filename``, ``width`` and ``height`` keys only. The annotations are
+    decoded by :meth:`get_anns`.
+
+    Args:
+        arrays (dict[str, np.ndarray]): The arrays of :attr:`ARRAY_KEYS`.
+    """
+
+    ARRAY_KEYS = ('img_ids', 'widths', 'heights', 'name_offsets', 'names',
+                  'ann_offsets', 'ann_ids', 'bboxes', 'areas',
+                  'category_ids', 'iscrowd', 'ignore', 'seg_offsets',
+                  'poly_offsets', 'coords')
+
+    # the magic bytes and the version of the binary format of dump()
+    MAGIC = b'MYOCRPKD'
+    VERSION = 1
+    ALIGNMENT = 64
+
+    def __init__(self, arrays):
+        assert set(arrays) == set(self.ARRAY_KEYS), \
+            f'The keys of arrays should be {self.ARRAY_KEYS}'
+        self.arrays = arrays
+        for key, value in arrays.items():
+            setattr(self, key, value)
+
+    def __len__(self):
+        return len(self.img_ids)
+
+    def __getitem__(self, idx):
+        name = self.names[self.name_offsets[idx]:self.name_offsets[idx + 1]]
+        file_name = name.tobytes().decode('utf-8')
+        return dict(
+            id=int(self.img_ids[idx]),
+            file_name=file_name,
+            filename=file_name,
+            width=int(self.widths[idx]),
+            height=int(self.heights[idx]))
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    @property
+    def num_anns(self):
+        return len(self.ann_ids)
+
+    def get_anns(self, idx):
+        """Decode the annotations of an image.
+
+        Args:
+            idx (int): The index of the image.
+
+        Returns:
+            list[dict]: The COCO annotations, with polygon segmentations.
+        """
+        anns = []
+        img_id = int(self.img_ids[idx])
+        for j in range(self.ann_offsets[idx], self.ann_offsets[idx + 1]):
+            segmentation = [
+                self.coords[self.poly_offsets[k]:self.poly_offsets[k +
+                                                                   1]].tolist()
+                for k in range(self.seg_offsets[j], self.seg_offsets[j + 1])
+            ]
+            anns.append(
+                dict(
+                    id=int(self.ann_ids[j]),
+                    image_id=img_id,
+                    bbox=self.bboxes[j].tolist(),
+                    area=float(self.areas[j]),
+                    category_id=int(self.category_ids[j]),
+                    iscrowd=int(self.iscrowd[j]),
+                    ignore=bool(self.ignore[j]),
+                    segmentation=segmentation))
+        return anns
+
+    def get_cat_ids(self, idx):
+        """Get the category ids of the annotations of an image."""
+        start, end = self.ann_offsets[idx], self.ann_offsets[idx + 1]
+        return self.category_ids[start:end].tolist()
+
+    def in_cats(self, cat_ids):
+        """Find the images with annotations of the given categories.
+
+        Args:
+            cat_ids (list[int]): The category ids.
+
+        Returns:
+            np.ndarray: A bool mask of the images.
+        """
+        img_inds = np.repeat(
+            np.arange(len(self), dtype=np.int64), np.diff(self.ann_offsets))
+        mask = np.zeros(len(self), dtype=bool)
+        mask[img_inds[np.isin(self.category_ids, cat_ids)]] = True
+        return mask
+
+    def subset(self, inds):
+        """Select some of the images with their annotations.
+
+        Args:
+            inds (list[int] | np.ndarray): The indices of the images.
+
+        Returns:
+            PackedAnnotations: The selected images.
+        """
+        inds = np.asarray(inds, dtype=np.int64)
+        if len(inds) == len(self) and (inds == np.arange(len(self))).all():
+            return self
+        arrays = {
+            key: self.arrays[key][inds]
+            for key in ('img_ids', 'widths', 'heights')
+        }
+        arrays['name_offsets'], name_inds = take_segments(
+            self.name_offsets, inds)
+        arrays['names'] = self.names[name_inds]
+        arrays['ann_offsets'], ann_inds = take_segments(self.ann_offsets, inds)
+        arrays.update(self._take_anns(ann_inds))
+        return PackedAnnotations(arrays)
+
+    def _take_anns(self, ann_inds):
+        arrays = {
+            key: self.arrays[key][ann_inds]
+            for key in ('ann_ids', 'bboxes', 'areas', 'category_ids',
+                        'iscrowd', 'ignore')
+        }
+        arrays['seg_offsets'], poly_inds = take_segments(
+            self.seg_offsets, ann_inds)
+        arrays['poly_offsets'], coord_inds = take_segments(
+            self.poly_offsets, poly_inds)
+        arrays['coords'] = self.coords[coord_inds]
+        return arrays
+
+    def dump(self, filename, meta=None):
+        """Save the arrays to a binary file which can be memory-mapped.
+
+        The file starts with :attr:`MAGIC`, followed by the byte size of a
+        json header and the header itself. The arrays follow, each aligned
+        to :attr:`ALIGNMENT` bytes at the offset given in the header. The
+        file is written to a temporary file first and then renamed, so the
+        processes loading it never see a partial file.
+
+        Args:
+            filename (str): The file name.
+            meta (dict, optional): Extra json serializable information, e.g.
+                the key of a cache.
+        """
+        specs = {}
+        offset = 0
+        for key in self.ARRAY_KEYS:
+            value = np.ascontiguousarray(self.arrays[key])
+            specs[key] = dict(
+                dtype=value.dtype.str, shape=value.shape, offset=offset)
+            offset += -(-value.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+        header = json.dumps(
+            dict(version=self.VERSION, meta=meta,
+                 arrays=specs)).encode('utf-8')
+        data_start = len(self.MAGIC) + 8 + len(header)
+        data_start = -(-data_start // self.ALIGNMENT) * self.ALIGNMENT
+
+        tmp_filename = f'{filename}.{os.getpid()}.tmp'
+        with open(tmp_filename, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for key in self.ARRAY_KEYS:
+                f.seek(data_start + specs[key]['offset'])
+                f.write(np.ascontiguousarray(self.arrays[key]).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_filename, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """Memory-map a file saved by :meth:`dump`.
+
+        The arrays are read-only views of the file, so the pages are read
+        on demand and shared by all the processes which load it.
+
+        Args:
+            filename (str): The file name.
+
+        Returns:
+            tuple(PackedAnnotations, dict): The packed annotations and the
+            meta information given to :meth:`dump`.
+        """
+        with open(filename, 'rb') as f:
+            magic = f.read(len(cls.MAGIC))
+            assert magic == cls.MAGIC, f'{filename} is not a packed ' \
+                'annotation file'
+            header_size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(header_size).decode('utf-8'))
+        assert header['version'] == cls.VERSION, \
+            f'The version of {filename} is {header["version"]}, ' \
+            f'expect {cls.VERSION}'
+        data_start = len(cls.MAGIC) + 8 + header_size
+        data_start = -(-data_start // cls.ALIGNMENT) * cls.ALIGNMENT
+
+        buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+        arrays = {}
+        for key, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape']))
+            arrays[key] = np.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=count,
+                offset=data_start + spec['offset']).reshape(spec['shape'])
+        return cls(arrays), header['meta']
+
+    @classmethod
+    def from_coco(cls, coco, img_ids=None):
+        """Pack the images and annotations of a COCO api object.
+
+        Args:
+            coco (COCO): The COCO api.
+            img_ids (list[int], optional): The ids of the images to pack, in
+                order. Defaults to all the images.
+
+        Returns:
+            PackedAnnotations: The packed images and annotations.
+        """
+        if img_ids is None:
+            img_ids = coco.get_img_ids()
+        builder = PackedAnnotationsBuilder()
+        for img_id in img_ids:
+            builder.add_image(coco.imgs[img_id])
+            for ann in coco.img_ann_map[img_id]:
+                builder.add_annotation(ann)
+        return builder.build()
+
+
+class PackedAnnotationsBuilder:
+    """Build :class:`PackedAnnotations` from images and annotations added one
+    by one.
+
+    The annotations can be added in any order, before or after their images.
+    They are grouped by image in :meth:`build`, keeping the order in which
+    they are added. The annotations of images which are not added are
+    dropped.
+    """
+
+    def __init__(self):
+        self.img_ids = array('q')
+        self.widths = array('i')
+        self.heights = array('i')
+        self.name_lengths = array('q')
+        self.names = bytearray()
+
+        self.ann_img_ids = array('q')
+        self.ann_ids = array('q')
+        self.bboxes = array('f')
+        self.areas = array('f')
+        self.category_ids = array('q')
+        self.iscrowd = array('B')
+        self.ignore = array('B')
+        self.num_polys = array('q')
+        self.poly_lengths = array('q')
+        self.coords = array('f')
+
+    def __len__(self):
+        return len(self.img_ids)
+
+    def add_image(self, img):
+        """Add an image of the ``images`` field of a COCO annotation file."""
+        name = img['file_name'].encode('utf-8')
+        self.img_ids.append(img['id'])
+        self.widths.append(img['width'])
+        self.heights.append(img['height'])
+        self.name_lengths.append(len(name))
+        self.names += name
+
+    def add_annotation(self, ann):
+        """Add an annotation of the ``annotations`` field of a COCO annotation
+        file."""
+        segmentation = ann.get('segmentation', None) or []
+        assert isinstance(segmentation, list), \
+            'Only the polygon segmentations can be packed'
+        self.ann_img_ids.append(ann['image_id'])
+        self.ann_ids.append(ann['id'])
+        self.bboxes.extend(ann['bbox'])
+        self.areas.append(ann['area'])
+        self.category_ids.append(ann['category_id'])
+        self.iscrowd.append(int(ann.get('iscrowd', 0)))
+        self.ignore.append(int(ann.get('ignore', False)))
+        self.num_polys.append(len(segmentation))
+        for poly in segmentation:
+            self.poly_lengths.append(len(poly))
+            self.coords.extend(poly)
+
+    @staticmethod
+    def _numpy(values, dtype):
+        if len(values) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(values, dtype=dtype).copy()
+
+    @classmethod
+    def _offsets(cls, lengths):
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(cls._numpy(lengths, np.int64), out=offsets[1:])
+        return offsets
+
+    def build(self):
+        """Group the annotations by image and pack everything.
+
+        Returns:
+            PackedAnnotations: The packed images and annotations.
+        """
+        img_ids = self._numpy(self.img_ids, np.int64)
+        assert len(np.unique(img_ids)) == len(img_ids), \
+            'Image ids are not unique!'
+        arrays = dict(
+            img_ids=img_ids,
+            widths=self._numpy(self.widths, np.int32),
+            heights=self._numpy(self.heights, np.int32),
+            name_offsets=self._offsets(self.name_lengths),
+            names=self._numpy(self.names, np.uint8))
+
+        # find the image of each annotation
+        ann_img_ids = self._numpy(self.ann_img_ids, np.int64)
+        order = np.argsort(img_ids, kind='stable')
+        sorted_ids = img_ids[order]
+        pos = np.searchsorted(sorted_ids, ann_img_ids)
+        valid = pos < len(img_ids)
+        valid[valid] = sorted_ids[pos[valid]] == ann_img_ids[valid]
+        ann_img_inds = order[pos[valid]]
+        ann_inds = np.flatnonzero(valid)[np.argsort(
+            ann_img_inds, kind='stable')]
+        arrays['ann_offsets'] = np.zeros(len(img_ids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(ann_img_inds, minlength=len(img_ids)),
+            out=arrays['ann_offsets'][1:])
+
+        unsorted = PackedAnnotations(
+            dict(
+                arrays,
+                ann_ids=self._numpy(self.ann_ids, np.int64),
+                bboxes=self._numpy(self.bboxes, np.float32).reshape(-1, 4),
+                areas=self._numpy(self.areas, np.float32),
+                category_ids=self._numpy(self.category_ids, np.int64),
+                iscrowd=self._numpy(self.iscrowd, np.uint8),
+                ignore=self._numpy(self.ignore, np.uint8).astype(bool),
+                seg_offsets=self._offsets(self.num_polys),
+                poly_offsets=self._offsets(self.poly_lengths),
+                coords=self._numpy(self.coords, np.float32)))
+        arrays.update(unsorted._take_anns(ann_inds))
+        return PackedAnnotations(arrays)
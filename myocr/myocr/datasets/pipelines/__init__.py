@@ -1,4 +1,5 @@
 from .compose import Compose
+from .textdet_targets import BaseTextDetTargets, FCENetTargets
 
 
-__all__ = ['Compose']
\ No newline at end of file
+__all__ = ['Compose', 'BaseTextDetTargets', 'FCENetTargets']
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .base_textdet_targets import BaseTextDetTargets
+from .fcenet_targets import FCENetTargets
+
+__all__ = ['BaseTextDetTargets', 'FCENetTargets']
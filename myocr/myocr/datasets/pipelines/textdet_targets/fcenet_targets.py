@@ -0,0 +1,599 @@
+import cv2
+import numpy as np
+from numpy.linalg import norm
+
+from myocr.myocr.core.boundary import fourier_basis
+from myocr.myocr.datasets.builder import PIPELINES
+from myocr.myocr.utils import check_argument
+from .base_textdet_targets import BaseTextDetTargets
+
+
+@PIPELINES.register_module()
+class FCENetTargets(BaseTextDetTargets):
+    """Generate the ground truth targets of FCENet: Fourier Contour Embedding
+    for Arbitrary-Shaped Text Detection.
+
+    [https://arxiv.org/abs/2104.10442]
+
+    All the maps of a level are rasterized without any per-pixel loop. Each
+    text polygon is filled once into an instance index map, from which the
+    text region mask and the Fourier coefficient maps of all instances are
+    gathered in one step. The Fourier coefficients are computed with the
+    cached DFT basis from :func:`myocr.myocr.core.boundary.fourier_basis`,
+    for all polygons with the same number of resampled points at once.
+
+    Args:
+        fourier_degree (int): The maximum Fourier transform degree k.
+        resample_step (float): The step size for resampling the text center
+            line (TCL). It's better not to exceed half of the minimum width.
+        center_region_shrink_ratio (float): The shrink ratio of text center
+            region.
+        level_size_divisors (tuple(int)): The downsample ratio on each level.
+        level_proportion_range (tuple(tuple(int))): The range of text sizes
+            assigned to each level.
+        orientation_thr (float): The threshold for distinguishing between
+            head edge and tail edge among the horizontal and vertical edges
+            of a quadrangle.
+        num_resample_points (int): The number of points a polygon is
+            resampled to before its Fourier coefficients are computed.
+        compact (bool): Whether to emit the compact encoding of the maps of
+            each level built by :meth:`encode_level_targets` instead of the
+            dense float maps. It is expanded on the device by
+            :obj:`FCELoss`.
+    """
+
+    def __init__(self,
+                 fourier_degree=5,
+                 resample_step=4.0,
+                 center_region_shrink_ratio=0.3,
+                 level_size_divisors=(8, 16, 32),
+                 level_proportion_range=((0, 0.4), (0.3, 0.7), (0.6, 1.0)),
+                 orientation_thr=2.0,
+                 num_resample_points=400,
+                 compact=False):
+
+        super().__init__()
+        assert isinstance(level_size_divisors, tuple)
+        assert isinstance(level_proportion_range, tuple)
+        assert len(level_size_divisors) == len(level_proportion_range)
+        self.fourier_degree = fourier_degree
+        self.resample_step = resample_step
+        self.center_region_shrink_ratio = center_region_shrink_ratio
+        self.level_size_divisors = level_size_divisors
+        self.level_proportion_range = level_proportion_range
+        self.orientation_thr = orientation_thr
+        self.num_resample_points = num_resample_points
+        self.compact = compact
+
+    def reorder_poly_edge(self, points):
+        """Get the respective points composing head edge, tail edge, top
+        sideline and bottom sideline.
+
+        Args:
+            points (ndarray): The points composing a text polygon.
+
+        Returns:
+            head_edge (ndarray): The two points composing the head edge of text
+                polygon.
+            tail_edge (ndarray): The two points composing the tail edge of text
+                polygon.
+            top_sideline (ndarray): The points composing top curved sideline of
+                text polygon.
+            bot_sideline (ndarray): The points composing bottom curved sideline
+                of text polygon.
+        """
+
+        assert points.ndim == 2
+        assert points.shape[0] >= 4
+        assert points.shape[1] == 2
+
+        head_inds, tail_inds = self.find_head_tail(points,
+                                                   self.orientation_thr)
+        head_edge, tail_edge = points[head_inds], points[tail_inds]
+
+        pad_points = np.vstack([points, points])
+        if tail_inds[1] < 1:
+            tail_inds[1] = len(points)
+        sideline1 = pad_points[head_inds[1]:tail_inds[1]]
+        sideline2 = pad_points[tail_inds[1]:(head_inds[1] + len(points))]
+        sideline_mean_shift = np.mean(
+            sideline1, axis=0) - np.mean(
+                sideline2, axis=0)
+
+        if sideline_mean_shift[1] > 0:
+            top_sideline, bot_sideline = sideline2, sideline1
+        else:
+            top_sideline, bot_sideline = sideline1, sideline2
+
+        return head_edge, tail_edge, top_sideline, bot_sideline
+
+    def resample_line(self, line, n):
+        """Resample n points on a line.
+
+        Args:
+            line (ndarray): The points composing a line.
+            n (int): The resampled points number.
+
+        Returns:
+            resampled_line (ndarray): The points composing the resampled line.
+        """
+
+        assert line.ndim == 2
+        assert line.shape[0] >= 2
+        assert line.shape[1] == 2
+        assert isinstance(n, int)
+        assert n > 0
+
+        length_list = norm(line[1:] - line[:-1], axis=1)
+        length_cumsum = np.cumsum(np.concatenate([[0.0], length_list]))
+        delta_length = length_cumsum[-1] / (float(n) + 1e-8)
+
+        # the index of the edge where each inner point lies, found from the
+        # accumulated length along the line
+        current_line_len = np.arange(1, n) * delta_length
+        edge_inds = np.searchsorted(
+            length_cumsum[1:], current_line_len, side='right')
+        valid = edge_inds < len(length_list)
+        current_line_len = current_line_len[valid]
+        edge_inds = edge_inds[valid]
+
+        end_shift_ratio = (current_line_len - length_cumsum[edge_inds]
+                           ) / length_list[edge_inds]
+        points = line[edge_inds] + (line[edge_inds + 1] - line[edge_inds]
+                                    ) * end_shift_ratio[:, None]
+
+        resampled_line = np.vstack([line[:1], points, line[-1:]])
+
+        return resampled_line
+
+    def resample_sidelines(self, sideline1, sideline2, resample_step):
+        """Resample two sidelines to be of the same points number according to
+        step size.
+
+        Args:
+            sideline1 (ndarray): The points composing a sideline of a text
+                polygon.
+            sideline2 (ndarray): The points composing another sideline of a
+                text polygon.
+            resample_step (float): The resampled step size.
+
+        Returns:
+            resampled_line1 (ndarray): The resampled line 1.
+            resampled_line2 (ndarray): The resampled line 2.
+        """
+
+        assert sideline1.ndim == sideline2.ndim == 2
+        assert sideline1.shape[1] == sideline2.shape[1] == 2
+        assert sideline1.shape[0] >= 2
+        assert sideline2.shape[0] >= 2
+        assert isinstance(resample_step, float)
+
+        length1 = norm(sideline1[1:] - sideline1[:-1], axis=1).sum()
+        length2 = norm(sideline2[1:] - sideline2[:-1], axis=1).sum()
+
+        total_length = (length1 + length2) / 2
+        resample_point_num = max(int(float(total_length) / resample_step), 1)
+
+        resampled_line1 = self.resample_line(sideline1, resample_point_num)
+        resampled_line2 = self.resample_line(sideline2, resample_point_num)
+
+        return resampled_line1, resampled_line2
+
+    def generate_center_region_mask(self, img_size, text_polys):
+        """Generate text center region mask.
+
+        Args:
+            img_size (tuple): The image size of (height, width).
+            text_polys (list[list[ndarray]]): The list of text polygons.
+
+        Returns:
+            center_region_mask (ndarray): The text center region mask.
+        """
+
+        assert isinstance(img_size, tuple)
+        assert check_argument.is_2dlist(text_polys)
+
+        h, w = img_size
+
+        center_region_mask = np.zeros((h, w), np.uint8)
+
+        center_region_boxes = []
+        for poly in text_polys:
+            assert len(poly) == 1
+            polygon_points = poly[0].reshape(-1, 2)
+            _, _, top_line, bot_line = self.reorder_poly_edge(polygon_points)
+            resampled_top_line, resampled_bot_line = self.resample_sidelines(
+                top_line, bot_line, self.resample_step)
+            resampled_bot_line = resampled_bot_line[::-1]
+            center_line = (resampled_top_line + resampled_bot_line) / 2
+
+            line_head_shrink_len = norm(resampled_top_line[0] -
+                                        resampled_bot_line[0]) / 4.0
+            line_tail_shrink_len = norm(resampled_top_line[-1] -
+                                        resampled_bot_line[-1]) / 4.0
+            head_shrink_num = int(line_head_shrink_len // self.resample_step)
+            tail_shrink_num = int(line_tail_shrink_len // self.resample_step)
+            if len(center_line) > head_shrink_num + tail_shrink_num + 2:
+                end = len(center_line) - tail_shrink_num
+                center_line = center_line[head_shrink_num:end]
+                resampled_top_line = resampled_top_line[head_shrink_num:end]
+                resampled_bot_line = resampled_bot_line[head_shrink_num:end]
+
+            # the quadrangles between every two consecutive center points
+            top = center_line + (resampled_top_line -
+                                 center_line) * self.center_region_shrink_ratio
+            bot = center_line + (resampled_bot_line -
+                                 center_line) * self.center_region_shrink_ratio
+            boxes = np.stack([top[:-1], top[1:], bot[1:], bot[:-1]], axis=1)
+            center_region_boxes.extend(boxes.astype(np.int32))
+
+        if len(center_region_boxes) > 0:
+            cv2.fillPoly(center_region_mask, center_region_boxes, 1)
+        return center_region_mask
+
+    def resample_polygon(self, polygon, n=400):
+        """Resample one polygon with n points on its boundary.
+
+        Args:
+            polygon (ndarray): The input polygon.
+            n (int): The number of resampled points.
+
+        Returns:
+            resampled_polygon (ndarray): The resampled polygon.
+        """
+        edges = np.roll(polygon, -1, axis=0) - polygon
+        length = np.sqrt(edges[:, 0]**2 + edges[:, 1]**2)
+        total_length = np.cumsum(length)[-1]
+        n_on_each_line = (length / (total_length + 1e-8)) * n
+        n_on_each_line = n_on_each_line.astype(np.int32)
+
+        # point j of edge i is p_i + (p_{i+1} - p_i) / n_i * j
+        edge_inds = np.repeat(np.arange(len(polygon)), n_on_each_line)
+        starts = np.cumsum(n_on_each_line) - n_on_each_line
+        point_inds = np.arange(len(edge_inds)) - starts[edge_inds]
+        dxdy = edges / np.maximum(n_on_each_line, 1)[:, None]
+        new_polygon = polygon[edge_inds] + dxdy[edge_inds] * point_inds[:,
+                                                                        None]
+
+        return new_polygon
+
+    def normalize_polygon(self, polygon):
+        """Normalize one polygon so that its start point is at right most.
+
+        Args:
+            polygon (ndarray): The input polygon.
+
+        Returns:
+            new_polygon (ndarray): The polygon with start point at right.
+        """
+        temp_polygon = polygon - polygon.mean(axis=0)
+        x = np.abs(temp_polygon[:, 0])
+        y = temp_polygon[:, 1]
+        index_x = np.argsort(x)
+        index_y = np.argmin(y[index_x[:8]])
+        index = index_x[index_y]
+        new_polygon = np.concatenate([polygon[index:], polygon[:index]])
+        return new_polygon
+
+    def poly2fourier(self, polygons, fourier_degree):
+        """Compute the Fourier coefficients of polygons with the same number
+        of points.
+
+        Args:
+            polygons (ndarray): The polygons of shape (N, n, 2), or a single
+                polygon of shape (n, 2).
+            fourier_degree (int): The maximum Fourier degree K.
+
+        Returns:
+            c (ndarray(complex)): The Fourier coefficients of shape
+            (N, 2k+1), or (2k+1, ) for a single polygon, ordered from degree
+            -k to k.
+        """
+        points = polygons[..., 0] + polygons[..., 1] * 1j
+        num_points = points.shape[-1]
+        # the rows of the inverse DFT basis reversed give the forward basis
+        basis = fourier_basis(fourier_degree, num_points)[::-1]
+        c = points @ basis.T / num_points
+        return c
+
+    def clockwise(self, c, fourier_degree):
+        """Make sure the polygons reconstructed from Fourier coefficients c in
+        the clockwise direction.
+
+        Args:
+            c (ndarray(complex)): The Fourier coefficients of shape
+                (N, 2k+1), or (2k+1, ) for a single polygon.
+            fourier_degree (int): The maximum Fourier degree K.
+
+        Returns:
+            c (ndarray(complex)): The coefficients in clockwise order.
+        """
+        k = fourier_degree
+        abs_c = np.abs(c)
+        keep = (abs_c[..., k + 1] > abs_c[..., k - 1]) | (
+            (abs_c[..., k + 1] == abs_c[..., k - 1]) &
+            (abs_c[..., k + 2] > abs_c[..., k - 2]))
+        return np.where(keep[..., None], c, c[..., ::-1])
+
+    def cal_fourier_signature(self, polygon, fourier_degree):
+        """Calculate Fourier signature from input polygon.
+
+        Args:
+              polygon (ndarray): The input polygon.
+              fourier_degree (int): The maximum Fourier degree K.
+        Returns:
+              fourier_signature (ndarray): An array shaped (2k+1, 2) containing
+                  real part and image part of 2k+1 Fourier coefficients.
+        """
+        return self.cal_fourier_signatures([polygon], fourier_degree)[0]
+
+    def cal_fourier_signatures(self, polygons, fourier_degree):
+        """Calculate the Fourier signatures of a list of polygons.
+
+        The polygons which have the same number of points after resampling
+        are transformed together.
+
+        Args:
+            polygons (list[ndarray]): The input polygons.
+            fourier_degree (int): The maximum Fourier degree K.
+
+        Returns:
+            fourier_signatures (ndarray): An array shaped (N, 2k+1, 2)
+            containing the real and image parts of the 2k+1 Fourier
+            coefficients of each polygon.
+        """
+        resampled_polygons = [
+            self.normalize_polygon(
+                self.resample_polygon(polygon, self.num_resample_points))
+            for polygon in polygons
+        ]
+
+        fourier_coeff = np.zeros((len(polygons), 2 * fourier_degree + 1),
+                                 dtype=np.complex128)
+        groups = {}
+        for idx, polygon in enumerate(resampled_polygons):
+            groups.setdefault(len(polygon), []).append(idx)
+        for inds in groups.values():
+            fourier_coeff[inds] = self.poly2fourier(
+                np.stack([resampled_polygons[idx] for idx in inds]),
+                fourier_degree)
+        fourier_coeff = self.clockwise(fourier_coeff, fourier_degree)
+
+        fourier_signatures = np.stack(
+            [np.real(fourier_coeff),
+             np.imag(fourier_coeff)], axis=-1)
+        return fourier_signatures
+
+    def generate_instance_map(self, img_size, text_polys):
+        """Generate the instance index map, in which the pixels of the i-th
+        text polygon are set to i + 1 and the background to 0. Polygons
+        filled later overwrite the overlapping pixels.
+
+        Args:
+            img_size (tuple): The image size of (height, width).
+            text_polys (list[list[ndarray]]): The list of text polygons.
+
+        Returns:
+            instance_map (ndarray): The instance index map.
+        """
+        assert isinstance(img_size, tuple)
+        assert check_argument.is_2dlist(text_polys)
+
+        h, w = img_size
+        instance_map = np.zeros((h, w), dtype=np.int32)
+        for idx, poly in enumerate(text_polys):
+            assert len(poly) == 1
+            polygon = np.array(poly[0]).reshape((1, -1, 2)).astype(np.int32)
+            cv2.fillPoly(instance_map, polygon, idx + 1)
+
+        return instance_map
+
+    def generate_fourier_maps(self, img_size, text_polys, instance_map=None):
+        """Generate Fourier coefficient maps.
+
+        Args:
+            img_size (tuple): The image size of (height, width).
+            text_polys (list[list[ndarray]]): The list of text polygons.
+            instance_map (ndarray, optional): The instance index map of
+                text_polys from :meth:`generate_instance_map`. It is generated
+                if not given.
+
+        Returns:
+            fourier_real_map (ndarray): The Fourier coefficient real part maps.
+            fourier_image_map (ndarray): The Fourier coefficient image part
+                maps.
+        """
+
+        assert isinstance(img_size, tuple)
+        assert check_argument.is_2dlist(text_polys)
+
+        h, w = img_size
+        k = self.fourier_degree
+        real_map = np.zeros((k * 2 + 1, h, w), dtype=np.float32)
+        imag_map = np.zeros((k * 2 + 1, h, w), dtype=np.float32)
+        if len(text_polys) == 0:
+            return real_map, imag_map
+
+        if instance_map is None:
+            instance_map = self.generate_instance_map(img_size, text_polys)
+        fourier_coeff = self.cal_fourier_signatures(
+            [np.array(poly[0]).reshape(-1, 2) for poly in text_polys], k)
+
+        y, x = np.nonzero(instance_map)
+        inds = instance_map[y, x] - 1
+        real_map[:, y, x] = fourier_coeff[inds, :, 0].T
+        imag_map[:, y, x] = fourier_coeff[inds, :, 1].T
+        # the degree 0 coefficient is stored relative to each pixel
+        real_map[k, y, x] = fourier_coeff[inds, k, 0] - x
+        imag_map[k, y, x] = fourier_coeff[inds, k, 1] - y
+
+        return real_map, imag_map
+
+    def generate_level_targets(self, img_size, text_polys, ignore_polys):
+        """Generate ground truth target on each level.
+
+        Args:
+            img_size (list[int]): Shape of input image.
+            text_polys (list[list[ndarray]]): A list of ground truth polygons.
+            ignore_polys (list[list[ndarray]]): A list of ignored polygons.
+        Returns:
+            level_maps (list(ndarray)): A list of ground target on each level.
+        """
+        h, w = img_size
+        lv_size_divs = self.level_size_divisors
+        lv_proportion_range = self.level_proportion_range
+        lv_text_polys = [[] for i in range(len(lv_size_divs))]
+        lv_ignore_polys = [[] for i in range(len(lv_size_divs))]
+        level_maps = []
+        for polys, lv_polys in [(text_polys, lv_text_polys),
+                                (ignore_polys, lv_ignore_polys)]:
+            for poly in polys:
+                assert len(poly) == 1
+                polygon = np.array(poly[0]).reshape((-1, 2)).astype(np.int32)
+                _, _, box_w, box_h = cv2.boundingRect(polygon)
+                proportion = max(box_h, box_w) / (h + 1e-8)
+
+                for ind, proportion_range in enumerate(lv_proportion_range):
+                    if proportion_range[0] < proportion < proportion_range[1]:
+                        lv_polys[ind].append([poly[0] / lv_size_divs[ind]])
+
+        for ind, size_divisor in enumerate(lv_size_divs):
+            current_level_maps = []
+            level_img_size = (h // size_divisor, w // size_divisor)
+
+            instance_map = self.generate_instance_map(level_img_size,
+                                                      lv_text_polys[ind])
+            if self.compact:
+                level_maps.append(
+                    self.encode_level_targets(
+                        instance_map,
+                        self.generate_center_region_mask(
+                            level_img_size, lv_text_polys[ind]),
+                        self.generate_effective_mask(level_img_size,
+                                                     lv_ignore_polys[ind]),
+                        lv_text_polys[ind]))
+                continue
+
+            text_region = (instance_map > 0).astype(np.uint8)[None]
+            current_level_maps.append(text_region)
+
+            center_region = self.generate_center_region_mask(
+                level_img_size, lv_text_polys[ind])[None]
+            current_level_maps.append(center_region)
+
+            effective_mask = self.generate_effective_mask(
+                level_img_size, lv_ignore_polys[ind])[None]
+            current_level_maps.append(effective_mask)
+
+            fourier_real_map, fourier_image_maps = self.generate_fourier_maps(
+                level_img_size, lv_text_polys[ind], instance_map)
+            current_level_maps.append(fourier_real_map)
+            current_level_maps.append(fourier_image_maps)
+
+            level_maps.append(np.concatenate(current_level_maps))
+
+        return level_maps
+
+    def encode_level_targets(self, instance_map, center_region,
+                             effective_mask, text_polys):
+        """Encode the target maps of a level compactly.
+
+        The text region mask and the Fourier coefficient maps are only
+        nonzero on the text pixels, whose coefficients are shared by all the
+        pixels of an instance. So they are stored as the flat indices of the
+        text pixels, the instance of each of them and the coefficients of
+        each instance. The center region and effective masks are packed as
+        bits.
+
+        Args:
+            instance_map (ndarray): The instance index map of text_polys.
+            center_region (ndarray): The text center region mask.
+            effective_mask (ndarray): The effective mask.
+            text_polys (list[list[ndarray]]): The list of text polygons.
+
+        Returns:
+            dict: The encoded targets, with keys
+
+            - size (tuple(int)): The map size of (height, width).
+            - masks (ndarray): The center region and effective masks packed
+              as bits, in uint8.
+            - inds (ndarray): The flat indices of the text pixels, in int32.
+            - instances (ndarray): The instance index of each text pixel, in
+              int16.
+            - coeffs (ndarray): The Fourier coefficients of each instance of
+              shape (N, 2, 2k+1), with the real parts first, in float32.
+        """
+        h, w = instance_map.shape
+        assert len(text_polys) <= np.iinfo(np.int16).max
+
+        k = self.fourier_degree
+        fourier_coeff = np.zeros((len(text_polys), 2 * k + 1, 2))
+        if len(text_polys) > 0:
+            fourier_coeff = self.cal_fourier_signatures(
+                [np.array(poly[0]).reshape(-1, 2) for poly in text_polys], k)
+
+        inds = np.flatnonzero(instance_map)
+        return dict(
+            size=(h, w),
+            masks=np.packbits(np.stack([center_region, effective_mask])),
+            inds=inds.astype(np.int32),
+            instances=(instance_map.reshape(-1)[inds] - 1).astype(np.int16),
+            coeffs=fourier_coeff.transpose(0, 2, 1).astype(np.float32))
+
+    def decode_level_targets(self, encoded):
+        """Decode the targets built by :meth:`encode_level_targets` into the
+        dense maps of shape (4k+5, height, width)."""
+        h, w = encoded['size']
+        k = self.fourier_degree
+        maps = np.zeros((4 * k + 5, h * w), dtype=np.float32)
+        maps[1:3] = np.unpackbits(encoded['masks'])[:2 * h * w].reshape(2, -1)
+
+        inds = encoded['inds']
+        coeffs = encoded['coeffs'][encoded['instances']]
+        maps[0, inds] = 1
+        maps[3:3 + 2 * k + 1, inds] = coeffs[:, 0].T
+        maps[3 + 2 * k + 1:, inds] = coeffs[:, 1].T
+        maps[3 + k, inds] -= inds % w
+        maps[3 + 3 * k + 1, inds] -= inds // w
+
+        return maps.reshape(-1, h, w)
+
+    def generate_targets(self, results):
+        """Generate the ground truth targets for FCENet.
+
+        Args:
+            results (dict): The input result dictionary.
+
+        Returns:
+            results (dict): The output result dictionary.
+        """
+
+        assert isinstance(results, dict)
+
+        polygon_masks = results['gt_masks'].masks
+        polygon_masks_ignore = results['gt_masks_ignore'].masks
+
+        h, w, _ = results['img_shape']
+
+        level_maps = self.generate_level_targets((h, w), polygon_masks,
+                                                 polygon_masks_ignore)
+
+        results['mask_fields'].clear()  # rm gt_masks encoded by polygons
+        mapping = {
+            'p3_maps': level_maps[0],
+            'p4_maps': level_maps[1],
+            'p5_maps': level_maps[2]
+        }
+        for key, value in mapping.items():
+            results[key] = value
+
+        return results
+
+    def __repr__(self):
+        repr_str = self.__class__.__name__
+        repr_str += f'(fourier_degree={self.fourier_degree}, '
+        repr_str += f'resample_step={self.resample_step}, '
+        repr_str += f'level_size_divisors={self.level_size_divisors}, '
+        repr_str += f'level_proportion_range={self.level_proportion_range}, '
+        repr_str += f'compact={self.compact})'
+        return repr_str
@@ -0,0 +1,296 @@
+import os.path as osp
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import mycv
+import numpy as np
+from mycv.fileio.file_client import HardDiskBackend
+from mycv.runner import get_dist_info
+from torch.utils.data import IterableDataset, get_worker_info
+
+from .builder import DATASETS
+from .icdar_dataset import IcdarDataset
+from .packed_annotations import PackedAnnotations
+
+ANN_FILE = 'annotations.bin'
+INDEX_FILE = 'index.npy'
+INDEX_DTYPE = np.dtype([('shard', np.int32), ('offset', np.int64),
+                        ('length', np.int64)])
+
+
+def pack_shards(dataset, out_dir, shard_size=256 << 20, logger=None):
+    """Pack the images and annotations of a dataset into shard files.
+
+    The images are appended to the shards as they are stored, in the order
+    of the dataset, and a new shard is started when the current one is
+    larger than ``shard_size``. The output directory contains
+
+    - ``shard-xxxxx.bin``: The concatenated encoded images.
+    - ``index.npy``: The shard, the byte offset and the byte size of each
+      image, as a structured array.
+    - ``annotations.bin``: The images and annotations saved by
+      :meth:`PackedAnnotations.dump`, with the shard file names and the
+      category ids as meta information.
+
+    Args:
+        dataset (IcdarDataset): A packed dataset in test mode, so that no
+            image is filtered out.
+        out_dir (str): The local output directory.
+        shard_size (int): The approximate byte size of a shard. Default:
+            256 MB.
+        logger (logging.Logger | str, optional): The logger to report the
+            progress to. Default: None.
+    """
+    assert isinstance(dataset.data_infos, PackedAnnotations), \
+        'Only packed datasets can be sharded'
+    mycv.mkdir_or_exist(out_dir)
+    index = np.zeros(len(dataset), dtype=INDEX_DTYPE)
+    shards = []
+    f = None
+    for idx in range(len(dataset)):
+        if f is None or f.tell() >= shard_size:
+            if f is not None:
+                f.close()
+                mycv.print_log(
+                    f'Packed {shards[-1]} up to image {idx}', logger=logger)
+            shards.append(f'shard-{len(shards):05d}.bin')
+            f = open(osp.join(out_dir, shards[-1]), 'wb')
+        filename = osp.join(dataset.img_prefix,
+                            dataset.data_infos[idx]['filename'])
+        img_bytes = dataset.file_client.get(filename)
+        index[idx] = (len(shards) - 1, f.tell(), len(img_bytes))
+        f.write(img_bytes)
+    if f is not None:
+        f.close()
+
+    np.save(osp.join(out_dir, INDEX_FILE), index)
+    dataset.data_infos.dump(
+        osp.join(out_dir, ANN_FILE),
+        meta=dict(shards=shards, cat_ids=list(dataset.cat_ids)))
+    mycv.print_log(
+        f'Packed {len(dataset)} images into {len(shards)} shards',
+        logger=logger)
+
+
+@DATASETS.register_module()
+class ShardedIcdarDataset(IcdarDataset, IterableDataset):
+    """Text detection dataset packed into shards by :func:`pack_shards`.
+
+    Iterating over the dataset reads whole shards with one
+    ``FileClient.get`` each, instead of one request per image. The next
+    ``prefetch_shards`` shards are read in a background thread while the
+    current one is decoded.
+
+    The shards are split between the distributed ranks and the dataloader
+    workers, after being shuffled with ``seed`` plus the epoch if
+    ``shuffle`` is True. The images within the shards are then shuffled
+    through a buffer of ``shuffle_buffer`` images. Without persistent
+    workers, :meth:`set_epoch` should be called before each epoch to get a
+    new shard order, as each worker iterates over a fresh copy of the
+    dataset. The ranks may get a different number of images if the shards
+    cannot be split evenly, so use enough shards of similar size.
+
+    The images are decoded with OpenCV and the results are filled as by
+    ``LoadImageFromFile``, so the pipeline should not load the images
+    again. Random access by index is also supported for evaluation, reading
+    a single image by a range read for local shards.
+
+    Args:
+        shard_dir (str): The directory written by :func:`pack_shards`.
+        pipeline (list[dict]): Processing pipeline.
+        shuffle (bool): Whether to shuffle the shards and the images.
+            Default: True.
+        shuffle_buffer (int): The number of images to shuffle within.
+            Default: 1000.
+        seed (int): The random seed of the shuffling. Default: 0.
+        prefetch_shards (int): The number of shards to read ahead.
+            Default: 1.
+        color_type (str): The flag of ``cv2.imdecode``, ``'color'``,
+            ``'grayscale'`` or ``'unchanged'``. Default: 'color'.
+        to_float32 (bool): Whether to convert the images to float32.
+            Default: False.
+        file_client_args (dict): The arguments of the file client to read
+            the shards with. Default: dict(backend='disk').
+
+    The other arguments are the same as :class:`IcdarDataset`.
+    """
+
+    IMDECODE_FLAGS = dict(
+        color=cv2.IMREAD_COLOR,
+        grayscale=cv2.IMREAD_GRAYSCALE,
+        unchanged=cv2.IMREAD_UNCHANGED)
+
+    def __init__(self,
+                 shard_dir,
+                 pipeline,
+                 shuffle=True,
+                 shuffle_buffer=1000,
+                 seed=0,
+                 prefetch_shards=1,
+                 color_type='color',
+                 to_float32=False,
+                 file_client_args=dict(backend='disk'),
+                 **kwargs):
+        assert color_type in self.IMDECODE_FLAGS
+        assert prefetch_shards >= 0
+        self.shuffle = shuffle
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.prefetch_shards = prefetch_shards
+        self.color_type = color_type
+        self.to_float32 = to_float32
+        self.epoch = 0
+        self.shard_client = mycv.FileClient(**file_client_args)
+        super().__init__(
+            ann_file=self.shard_client.join_path(shard_dir, ANN_FILE),
+            pipeline=pipeline,
+            packed=True,
+            **kwargs)
+
+    def load_annotations(self, ann_file):
+        """Load the packed annotations and the shard index."""
+        # the memory maps stay valid after the temporary copies of remote
+        # files are removed
+        self.shard_dir = osp.dirname(self.ann_file)
+        with self.shard_client.get_local_path(self.ann_file) as local_path:
+            data_infos, meta = PackedAnnotations.load(local_path)
+        self.shards = meta['shards']
+        self.cat_ids = meta['cat_ids']
+        self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
+        self.coco = None
+
+        index_file = self.shard_client.join_path(self.shard_dir, INDEX_FILE)
+        with self.shard_client.get_local_path(index_file) as local_path:
+            self.index = np.load(local_path)
+        assert len(self.index) == len(data_infos)
+
+        if self.select_first_k > 0:
+            keep = np.arange(min(self.select_first_k + 1, len(data_infos)))
+            data_infos = data_infos.subset(keep)
+            self.index = self.index[keep]
+        self.img_ids = data_infos.img_ids
+        return data_infos
+
+    def _filter_imgs(self, min_size=32):
+        valid_inds = super()._filter_imgs(min_size)
+        self.index = self.index[valid_inds]
+        return valid_inds
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _shard_path(self, shard):
+        return self.shard_client.join_path(self.shard_dir, self.shards[shard])
+
+    def _read_image(self, idx):
+        shard, offset, length = self.index[idx].tolist()
+        if isinstance(self.shard_client.client, HardDiskBackend):
+            with open(self._shard_path(shard), 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        # there is no range read in the other backends
+        data = self.shard_client.get(self._shard_path(shard))
+        return bytes(data[offset:offset + length])
+
+    def _prepare(self, idx, img_bytes):
+        """Decode an image and run the pipeline on it."""
+        img_info = self.data_infos[idx]
+        results = dict(img_info=img_info)
+        if not self.test_mode:
+            results['ann_info'] = self.get_ann_info(idx)
+        self.pre_pipeline(results)
+
+        img = cv2.imdecode(
+            np.frombuffer(img_bytes, dtype=np.uint8),
+            self.IMDECODE_FLAGS[self.color_type])
+        if self.to_float32:
+            img = img.astype(np.float32)
+        results['filename'] = osp.join(self.img_prefix, img_info['filename'])
+        results['ori_filename'] = img_info['filename']
+        results['img'] = img
+        results['img_shape'] = img.shape
+        results['ori_shape'] = img.shape
+        results['img_fields'] = ['img']
+        return self.pipeline(results)
+
+    def __getitem__(self, idx):
+        if self.test_mode:
+            return self._prepare(idx, self._read_image(idx))
+        while True:
+            data = self._prepare(idx, self._read_image(idx))
+            if data is None:
+                idx = self._rand_another(idx)
+                continue
+            return data
+
+    def _split_shards(self, epoch):
+        """Get the shards of this rank and dataloader worker."""
+        shards = np.unique(self.index['shard'])
+        if self.shuffle:
+            shards = np.random.default_rng([self.seed, epoch]).permutation(
+                shards)
+        rank, world_size = get_dist_info()
+        worker_info = get_worker_info()
+        worker_id, num_workers = (0, 1) if worker_info is None else (
+            worker_info.id, worker_info.num_workers)
+        return shards[rank * num_workers + worker_id::world_size *
+                      num_workers]
+
+    def _iter_images(self, shards):
+        """Read the shards in order, and yield the index and the bytes of
+        their images."""
+        # the images of each shard, in the order of the shard
+        offsets, lengths = self.index['offset'], self.index['length']
+        order = np.lexsort((offsets, self.index['shard']))
+        sorted_shards = self.index['shard'][order]
+        starts = np.searchsorted(sorted_shards, shards)
+        ends = np.searchsorted(sorted_shards, shards, side='right')
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futures = [
+                executor.submit(self.shard_client.get,
+                                self._shard_path(shard))
+                for shard in shards[:self.prefetch_shards + 1]
+            ]
+            for i, shard in enumerate(shards):
+                data = futures[i].result()
+                futures[i] = None
+                next_i = i + self.prefetch_shards + 1
+                if next_i < len(shards):
+                    futures.append(
+                        executor.submit(self.shard_client.get,
+                                        self._shard_path(shards[next_i])))
+                for idx in order[starts[i]:ends[i]]:
+                    start, end = offsets[idx], offsets[idx] + lengths[idx]
+                    yield idx, bytes(data[start:end])
+
+    def __iter__(self):
+        epoch = self.epoch
+        # a persistent worker iterates over its own copy of the dataset
+        self.epoch += 1
+        shards = self._split_shards(epoch)
+        images = self._iter_images(shards)
+        if self.shuffle and self.shuffle_buffer > 1:
+            images = self._shuffle(images, epoch)
+        for idx, img_bytes in images:
+            data = self._prepare(idx, img_bytes)
+            # unlike random access, a failed image is skipped
+            if data is not None:
+                yield data
+
+    def _shuffle(self, images, epoch):
+        """Shuffle the images through a buffer."""
+        worker_info = get_worker_info()
+        worker_id = 0 if worker_info is None else worker_info.id
+        rank, _ = get_dist_info()
+        rng = np.random.default_rng([self.seed, epoch, rank, worker_id])
+        buffer = []
+        for item in images:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(item)
+                continue
+            i = rng.integers(len(buffer))
+            yield buffer[i]
+            buffer[i] = item
+        rng.shuffle(buffer)
+        yield from buffer
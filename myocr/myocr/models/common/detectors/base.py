@@ -17,6 +17,10 @@ class BaseDetector(BaseModule, metaclass=ABCMeta):
     def __init__(self, init_cfg=None):
         super(BaseDetector, self).__init__(init_cfg)
         self.fp16_enabled = False
+        # the log variables accumulated on the device, see train_step
+        self._log_vars_sum = OrderedDict()
+        self._log_vars_samples = 0
+        self._log_vars_iters = 0
 
     @property
     def with_neck(self):
@@ -173,12 +177,16 @@ class BaseDetector(BaseModule, metaclass=ABCMeta):
         else:
             return self.forward_test(img, img_metas, **kwargs)
 
-    def _parse_losses(self, losses):
+    def _parse_losses(self, losses, to_host=True):
         """Parse the raw outputs (losses) of the network.
 
         Args:
             losses (dict): Raw output of the network, which usually contain
                 losses and other necessary information.
+            to_host (bool): Whether to copy the log variables to the host.
+                All of them are copied at once. If False, they are kept as
+                detached scalar tensors, which can be read later in bulk by
+                :meth:`read_log_vars`, and the device is not synchronized.
 
         Returns:
             tuple[Tensor, dict]: (loss, log_vars), loss is the loss tensor \
@@ -209,15 +217,39 @@ class BaseDetector(BaseModule, metaclass=ABCMeta):
                 'loss log variables are different across GPUs!\n' + message
 
         log_vars['loss'] = loss
-        for loss_name, loss_value in log_vars.items():
-            # reduce loss when distributed training
-            if dist.is_available() and dist.is_initialized():
-                loss_value = loss_value.data.clone()
-                dist.all_reduce(loss_value.div_(dist.get_world_size()))
-            log_vars[loss_name] = loss_value.item()
+        values = torch.stack(
+            [loss_value.detach().float() for loss_value in log_vars.values()])
+        # reduce loss when distributed training
+        if dist.is_available() and dist.is_initialized():
+            dist.all_reduce(values.div_(dist.get_world_size()))
+        for loss_name, loss_value in zip(log_vars, values):
+            log_vars[loss_name] = loss_value
+        if to_host:
+            log_vars = self.read_log_vars(log_vars)
 
         return loss, log_vars
 
+    @staticmethod
+    def read_log_vars(log_vars):
+        """Copy the tensor log variables to the host with a single transfer.
+
+        Args:
+            log_vars (dict): Log variables, whose values are scalar tensors
+                or Python numbers.
+
+        Returns:
+            OrderedDict: The log variables as Python floats.
+        """
+        names = [
+            name for name, value in log_vars.items()
+            if isinstance(value, torch.Tensor)
+        ]
+        host_vars = OrderedDict(log_vars)
+        if len(names) > 0:
+            values = torch.stack([log_vars[name] for name in names]).tolist()
+            host_vars.update(zip(names, values))
+        return host_vars
+
     def train_step(self, data, optimizer):
         """The iteration step during training.
 
@@ -244,15 +276,60 @@ class BaseDetector(BaseModule, metaclass=ABCMeta):
                 - ``num_samples`` indicates the batch size (when the model is
                   DDP, it means the batch size on each GPU), which is used for
                   averaging the logs.
+
+                With ``train_cfg=dict(defer_log_vars=True)``, the log
+                variables are accumulated on the device instead of being
+                read at every iteration. Every ``log_interval`` iterations
+                (``train_cfg.log_interval``, 50 by default), they are read
+                at once and ``log_vars`` holds their mean over the interval,
+                weighted by the number of samples. ``log_vars`` is empty at
+                the other iterations, so the interval should be the one of
+                the logger.
         """
         losses = self(**data)
-        loss, log_vars = self._parse_losses(losses)
+        train_cfg = getattr(self, 'train_cfg', None) or {}
+        defer_log_vars = train_cfg.get('defer_log_vars', False)
+        loss, log_vars = self._parse_losses(losses, to_host=not defer_log_vars)
 
-        outputs = dict(
-            loss=loss, log_vars=log_vars, num_samples=len(data['img_metas']))
+        num_samples = len(data['img_metas'])
+        if defer_log_vars:
+            log_vars = self._accumulate_log_vars(
+                log_vars, num_samples, train_cfg.get('log_interval', 50))
+
+        outputs = dict(loss=loss, log_vars=log_vars, num_samples=num_samples)
 
         return outputs
 
+    def _accumulate_log_vars(self, log_vars, num_samples, log_interval):
+        """Accumulate the log variables of an iteration on the device.
+
+        Args:
+            log_vars (dict): The log variables as detached scalar tensors.
+            num_samples (int): The batch size of the iteration.
+            log_interval (int): The number of iterations to accumulate.
+
+        Returns:
+            OrderedDict: The mean of the log variables over the last
+            ``log_interval`` iterations as Python floats, or an empty dict
+            if the interval is not over.
+        """
+        for name, value in log_vars.items():
+            value = value * num_samples
+            if name in self._log_vars_sum:
+                value = value + self._log_vars_sum[name]
+            self._log_vars_sum[name] = value
+        self._log_vars_samples += num_samples
+        self._log_vars_iters += 1
+        if self._log_vars_iters < log_interval:
+            return OrderedDict()
+
+        host_vars = self.read_log_vars(self._log_vars_sum)
+        for name in host_vars:
+            host_vars[name] /= self._log_vars_samples
+        self._log_vars_sum = OrderedDict()
+        self._log_vars_samples = self._log_vars_iters = 0
+        return host_vars
+
     def val_step(self, data, optimizer=None):
         """The iteration step during validation.
 
@@ -27,8 +27,24 @@ class FCENet(TextDetectorMixin, SingleStageTextDetector):
         TextDetectorMixin.__init__(self, show_score)
 
     def simple_test(self, img, img_metas, rescale=False):
+        if self.with_tiles:
+            return self.tiled_test(img, img_metas, rescale, **self.tile_cfg)
+
         x = self.extract_feat(img)
         outs = self.bbox_head(x)
-        boundaries = self.bbox_head.get_boundary(outs, img_metas, rescale)
 
-        return [boundaries]
\ No newline at end of file
+        boundaries = []
+        for img_idx, img_meta in enumerate(img_metas):
+            single_outs = self.split_level_outs(outs, img_idx)
+            boundaries.append(
+                self.bbox_head.get_boundary(single_outs, [img_meta], False))
+
+        if rescale:
+            # rescale the boundaries of all images at once
+            results = self.bbox_head.resize_boundaries(
+                [result['boundary_result'] for result in boundaries],
+                [1.0 / img_meta['scale_factor'] for img_meta in img_metas])
+            for result, boundary_result in zip(boundaries, results):
+                result['boundary_result'] = boundary_result
+
+        return boundaries
\ No newline at end of file
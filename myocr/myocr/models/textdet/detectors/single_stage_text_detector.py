@@ -1,7 +1,10 @@
+import numpy as np
 import torch
 
+from myocr.myocr.core import BoundaryResult, FourierBoundaryResult
 from myocr.myocr.models.builder import DETECTORS
 from myocr.myocr.models.common.detectors import SingleStageDetector
+from myocr.myocr.models.textdet.postprocess import merge_tiled_polygons
 
 
 @DETECTORS.register_module()
@@ -37,7 +40,23 @@ class SingleStageTextDetector(SingleStageDetector):
         losses = self.bbox_head.loss(preds, **kwargs)
         return losses
 
+    @property
+    def tile_cfg(self):
+        """dict | None: The ``tile`` field of ``test_cfg``, which enables
+        :meth:`tiled_test` if set."""
+        return (self.test_cfg or {}).get('tile')
+
+    @property
+    def with_tiles(self):
+        """bool: Whether :meth:`simple_test` runs :meth:`tiled_test`, which
+        is never the case while exporting to ONNX."""
+        return self.tile_cfg is not None and \
+            not torch.onnx.is_in_onnx_export()
+
     def simple_test(self, img, img_metas, rescale=False):
+        if self.with_tiles:
+            return self.tiled_test(img, img_metas, rescale, **self.tile_cfg)
+
         x = self.extract_feat(img)
         outs = self.bbox_head(x)
 
@@ -58,3 +77,163 @@ class SingleStageTextDetector(SingleStageDetector):
             ]
 
         return boundaries
+
+    @staticmethod
+    def split_level_outs(outs, idx):
+        """Select the predictions of one image from batched level outputs.
+
+        Args:
+            outs (list[[Tensor, Tensor] | None]): The classification and
+                regression predictions of each level. Levels skipped at
+                inference are None.
+            idx (int): The image index in the batch.
+
+        Returns:
+            list[[Tensor, Tensor] | None]: The level predictions of the image
+            with batch size 1.
+        """
+        return [
+            None if level_outs is None else
+            [pred[idx:idx + 1] for pred in level_outs] for level_outs in outs
+        ]
+
+    def tiled_test(self,
+                   img,
+                   img_metas,
+                   rescale=False,
+                   size=1024,
+                   overlap=256,
+                   batch_size=4,
+                   border=8,
+                   iou_thr=None,
+                   cover_thr=0.8):
+        """Test large images tile by tile.
+
+        Each image is split into overlapping square tiles which are forwarded
+        ``batch_size`` at a time and decoded one by one, so that the peak
+        memory of the network and of the postprocessing depends on the tile
+        size rather than on the image size. The boundaries of all tiles are
+        moved to image coordinates and merged by
+        :func:`merge_tiled_polygons`. It is enabled by setting
+        ``test_cfg.tile`` to a dict of these keyword arguments.
+
+        Args:
+            img (Tensor): Input images of shape (N, C, H, W).
+            img_metas (list[dict]): The image meta info of each image.
+            rescale (bool): Whether to rescale the boundaries to the original
+                image resolution.
+            size (int): The side length of the tiles, a multiple of 32.
+            overlap (int): The overlap of adjacent tiles, which should be
+                larger than the text instances so that each instance lies
+                within at least one tile.
+            batch_size (int): The number of tiles forwarded at a time.
+            border (int): The distance to a tile edge shared with another tile
+                within which a boundary is considered cut by the edge.
+            iou_thr (float, optional): The IoU threshold of the merge.
+                Defaults to ``bbox_head.nms_thr``.
+            cover_thr (float): The covered area ratio above which a cut
+                boundary is dropped in favour of an overlapping one.
+
+        Returns:
+            list[dict]: A dict per image where the merged boundaries are
+            stored in ``boundary_result``, in the format of the postprocessor.
+        """
+        assert size % 32 == 0 and 0 <= overlap < size
+        if iou_thr is None:
+            iou_thr = self.bbox_head.nms_thr
+
+        boundaries = []
+        for img_idx, img_meta in enumerate(img_metas):
+            tile_results, origins, tile_shape = self._test_tiles(
+                img[img_idx:img_idx + 1], img_meta, size, overlap, batch_size)
+            boundaries.append(
+                self._merge_tiles(tile_results, origins, tile_shape,
+                                  img.shape[2:], border, iou_thr, cover_thr))
+
+        if rescale:
+            boundaries = self.bbox_head.resize_boundaries(
+                boundaries,
+                [1.0 / img_meta['scale_factor'] for img_meta in img_metas])
+
+        return [dict(boundary_result=boundary) for boundary in boundaries]
+
+    @staticmethod
+    def _tile_starts(length, tile, stride):
+        starts = list(range(0, length - tile + 1, stride))
+        if starts[-1] + tile < length:
+            starts.append(length - tile)
+        return starts
+
+    def _test_tiles(self, img, img_meta, size, overlap, batch_size):
+        """Forward and decode the tiles of one image.
+
+        Returns:
+            tuple(list, list[tuple(int, int)], tuple(int, int)): The boundary
+            results of the tiles in tile coordinates, the (x, y) origin of
+            each tile and the tile shape (h, w).
+        """
+        height, width = img.shape[2:]
+        tile_h, tile_w = min(size, height), min(size, width)
+        origins = [(x, y)
+                   for y in self._tile_starts(height, tile_h, size - overlap)
+                   for x in self._tile_starts(width, tile_w, size - overlap)]
+
+        tile_results = []
+        for start in range(0, len(origins), batch_size):
+            batch_origins = origins[start:start + batch_size]
+            tiles = torch.cat([
+                img[:, :, y:y + tile_h, x:x + tile_w] for x, y in batch_origins
+            ])
+            outs = self.bbox_head(self.extract_feat(tiles))
+            for tile_idx in range(len(batch_origins)):
+                single_outs = self.split_level_outs(outs, tile_idx)
+                result = self.bbox_head.get_boundary(single_outs, [img_meta],
+                                                     False)
+                tile_results.append(result['boundary_result'])
+            del outs
+
+        return tile_results, origins, (tile_h, tile_w)
+
+    def _merge_tiles(self, tile_results, origins, tile_shape, img_shape,
+                     border, iou_thr, cover_thr):
+        """Move the boundaries of the tiles to image coordinates, flag those
+        cut by a tile edge and deduplicate them."""
+        tile_h, tile_w = tile_shape
+        height, width = img_shape
+        as_list = isinstance(tile_results[0], list)
+
+        results, cut = [], []
+        for result, (x, y) in zip(tile_results, origins):
+            if isinstance(result, list):
+                result = BoundaryResult.from_list(result)
+            if len(result) == 0:
+                continue
+            if isinstance(result, FourierBoundaryResult):
+                # moved after the truncation, as the polygons of the other
+                # result formats
+                result = result.translate([x, y])
+                points = result.to_polygons()
+            else:
+                result = BoundaryResult(
+                    result.points + np.array([x, y], np.float32),
+                    result.scores)
+                points = result.points
+            results.append(result)
+
+            # only the edges shared with another tile cut the instances
+            lo, hi = points.min(axis=1), points.max(axis=1)
+            cut.append(((x > 0) & (lo[:, 0] < x + border))
+                       | ((x + tile_w < width) &
+                          (hi[:, 0] > x + tile_w - border))
+                       | ((y > 0) & (lo[:, 1] < y + border))
+                       | ((y + tile_h < height) &
+                          (hi[:, 1] > y + tile_h - border)))
+
+        if len(results) == 0:
+            return [] if as_list else tile_results[0]
+
+        result = type(results[0]).concatenate(results)
+        keep = merge_tiled_polygons(result.flat_points, result.scores,
+                                    np.concatenate(cut), iou_thr, cover_thr)
+        result = result[keep]
+        return result.to_list() if as_list else result
@@ -1,10 +1,15 @@
 import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
+import torch
 import torch.nn as nn
 from mycv.runner import BaseModule
-from myocr.myocr.core import multi_apply
+from myocr.myocr.core import (BoundaryResult, FourierBoundaryResult,
+                              multi_apply)
 
 from myocr.myocr.models.builder import HEADS
+from myocr.myocr.models.textdet.postprocess import polygon_nms
 from myocr.myocr.models.textdet.postprocess.utils import poly_nms
 from .head_mixin import HeadMixin
 
@@ -22,6 +27,15 @@ class FCEHead(HeadMixin, BaseModule):
         nms_thr (float) : The threshold of nms.
         loss (dict): Config of loss for FCENet.
         postprocessor (dict): Config of postprocessor for FCENet.
+        postprocess_workers (int): The number of threads used to decode the
+            levels concurrently in :meth:`get_boundary`. The decoding is
+            dominated by OpenCV and NumPy calls which release the GIL. Levels
+            are decoded one after another if it is 0.
+        test_levels (list[int], optional): The indices of the levels which are
+            predicted and decoded at inference. The predictions of the other
+            levels are None, and so are those of the levels whose input
+            feature is None, e.g. skipped by ``FPN.test_out_levels``. All
+            levels are used if it is None or in training mode.
     """
 
     def __init__(self,
@@ -37,6 +51,8 @@ class FCEHead(HeadMixin, BaseModule):
                      alpha=1.0,
                      beta=2.0,
                      score_thr=0.3),
+                 postprocess_workers=0,
+                 test_levels=None,
                  train_cfg=None,
                  test_cfg=None,
                  init_cfg=dict(
@@ -81,6 +97,13 @@ class FCEHead(HeadMixin, BaseModule):
         self.fourier_degree = fourier_degree
 
         self.nms_thr = nms_thr
+        assert postprocess_workers >= 0
+        self.postprocess_workers = postprocess_workers
+        self._executor = None
+        if test_levels is not None:
+            assert len(test_levels) > 0
+            assert all(0 <= level < len(scales) for level in test_levels)
+        self.test_levels = test_levels
         self.train_cfg = train_cfg
         self.test_cfg = test_cfg
         self.out_channels_cls = 4
@@ -98,6 +121,34 @@ class FCEHead(HeadMixin, BaseModule):
             kernel_size=3,
             stride=1,
             padding=1)
+        # the merged out_conv_cls and out_conv_reg, see fuse_out_convs
+        self.out_conv = None
+
+    @property
+    def executor(self):
+        """ThreadPoolExecutor: The thread pool for level decoding, which is
+        created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.postprocess_workers)
+            # stop the idle threads when the head is garbage collected
+            weakref.finalize(self, self._executor.shutdown, wait=False)
+        return self._executor
+
+    def close(self):
+        """Shut down the thread pool for level decoding, if any.
+
+        A new pool is created if the head decodes levels again.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __getstate__(self):
+        # thread pools can be neither copied nor pickled
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
 
     def forward(self, feats):
         """
@@ -111,27 +162,109 @@ class FCEHead(HeadMixin, BaseModule):
             tensor with the same index. They have the shapes of :math:`(N,
             C_{cls,i}, H_i, W_i)` and :math:`(N, C_{out,i}, H_i, W_i)`.
         """
+        if not self.training and (self.test_levels is not None
+                                  or any(feat is None for feat in feats)):
+            return [
+                list(self.forward_single(feat))
+                if self._use_level(level, feat) else None
+                for level, feat in enumerate(feats)
+            ]
+
         cls_res, reg_res = multi_apply(self.forward_single, feats)
         level_num = len(cls_res)
         preds = [[cls_res[i], reg_res[i]] for i in range(level_num)]
         return preds
 
+    def _use_level(self, level, feat):
+        if feat is None:
+            return False
+        return self.test_levels is None or level in self.test_levels
+
     def forward_single(self, x):
+        if self.out_conv is not None:
+            predict = self.out_conv(x)
+            return (predict[:, :self.out_channels_cls],
+                    predict[:, self.out_channels_cls:])
         cls_predict = self.out_conv_cls(x)
         reg_predict = self.out_conv_reg(x)
         return cls_predict, reg_predict
 
+    def fuse_out_convs(self):
+        """Merge ``out_conv_cls`` and ``out_conv_reg`` into one convolution
+        ``out_conv`` for inference, whose output channels are those of the
+        two concatenated. The predictions are unchanged.
+        """
+        if self.out_conv is not None:
+            return
+        self.out_conv = nn.Conv2d(
+            self.in_channels,
+            self.out_channels_cls + self.out_channels_reg,
+            kernel_size=3,
+            stride=1,
+            padding=1).to(self.out_conv_cls.weight)
+        self.out_conv.weight.data.copy_(
+            torch.cat([self.out_conv_cls.weight, self.out_conv_reg.weight]))
+        self.out_conv.bias.data.copy_(
+            torch.cat([self.out_conv_cls.bias, self.out_conv_reg.bias]))
+        del self.out_conv_cls
+        del self.out_conv_reg
+
     def get_boundary(self, score_maps, img_metas, rescale):
+        """Compute text boundaries of one image via post processing.
+
+        Args:
+            score_maps (list[[Tensor, Tensor] | None]): The classification and
+                regression predictions of each level, with batch size 1. The
+                levels skipped at inference are None.
+            img_metas (list[dict]): The image meta info of the image.
+            rescale (bool): Rescale boundaries to the original image resolution
+                if true, and keep the score_maps resolution if false.
+
+        Returns:
+            dict: A dict where boundary results are stored in
+            ``boundary_result``.
+        """
         assert len(score_maps) == len(self.scales)
+        assert len(img_metas) == 1
+        levels = [
+            level for level, score_map in enumerate(score_maps)
+            if score_map is not None
+        ]
+        assert len(levels) > 0
+        score_maps = [score_maps[level] for level in levels]
+        scales = [self.scales[level] for level in levels]
+        assert all(score_map[0].size(0) == 1 for score_map in score_maps), \
+            'get_boundary decodes one image, split batched predictions first'
+
+        if self.postprocess_workers > 0:
+            level_boundaries = self.executor.map(self._get_boundary_single,
+                                                 score_maps, scales)
+        else:
+            level_boundaries = map(self._get_boundary_single, score_maps,
+                                   scales)
 
-        boundaries = []
-        for idx, score_map in enumerate(score_maps):
-            scale = self.scales[idx]
-            boundaries = boundaries + self._get_boundary_single(
-                score_map, scale)
+        level_boundaries = list(level_boundaries)
+        if all(isinstance(b, BoundaryResult) for b in level_boundaries):
+            boundaries = BoundaryResult.concatenate(level_boundaries)
+            # nms
+            _, keep = polygon_nms(boundaries.flat_points, boundaries.scores,
+                                  self.nms_thr)
+            boundaries = boundaries[keep]
+        elif all(
+                isinstance(b, FourierBoundaryResult)
+                for b in level_boundaries):
+            boundaries = FourierBoundaryResult.concatenate(level_boundaries)
+            # nms on the same integer polygons as the other result formats
+            _, keep = polygon_nms(boundaries.flat_points, boundaries.scores,
+                                  self.nms_thr)
+            boundaries = boundaries[keep]
+        else:
+            boundaries = []
+            for single_boundaries in level_boundaries:
+                boundaries = boundaries + single_boundaries
 
-        # nms
-        boundaries = poly_nms(boundaries, self.nms_thr)
+            # nms
+            boundaries = poly_nms(boundaries, self.nms_thr)
 
         if rescale:
             boundaries = self.resize_boundary(
@@ -1,5 +1,6 @@
 import numpy as np
 
+from myocr.myocr.core import BoundaryResult, FourierBoundaryResult
 from myocr.myocr.models.builder import HEADS, build_loss, build_postprocessor
 from myocr.myocr.utils import check_argument
 
@@ -25,25 +26,89 @@ class HeadMixin:
         """Rescale boundaries via scale_factor.
 
         Args:
-            boundaries (list[list[float]]): The boundary list. Each boundary
-                has :math:`2k+1` elements with :math:`k>=4`.
+            boundaries (list[list[float]] | ndarray | BoundaryResult |
+                FourierBoundaryResult): The boundary list. Each boundary has
+                :math:`2k+1` elements with :math:`k>=4`. An ndarray holds
+                boundaries of the same length with shape :math:`(N, 2k+1)`.
             scale_factor (ndarray): The scale factor of size :math:`(4,)`.
 
         Returns:
-            list[list[float]]: The scaled boundaries.
+            list[list[float]] | ndarray | BoundaryResult |
+            FourierBoundaryResult: The scaled boundaries.
         """
-        assert check_argument.is_2dlist(boundaries)
-        assert isinstance(scale_factor, np.ndarray)
-        assert scale_factor.shape[0] == 4
-
-        for b in boundaries:
-            sz = len(b)
-            check_argument.valid_boundary(b, True)
-            b[:sz -
-              1] = (np.array(b[:sz - 1]) *
-                    (np.tile(scale_factor[:2], int(
-                        (sz - 1) / 2)).reshape(1, sz - 1))).flatten().tolist()
-        return boundaries
+        return self.resize_boundaries([boundaries], [scale_factor])[0]
+
+    def resize_boundaries(self, boundaries_list, scale_factors):
+        """Rescale the boundaries of a batch of images.
+
+        All boundaries in the list or ndarray format which have the same
+        length are rescaled together in one NumPy operation, whichever image
+        they belong to.
+
+        Args:
+            boundaries_list (list): The boundaries of each image, in any of
+                the formats accepted by :meth:`resize_boundary`.
+            scale_factors (list[ndarray]): The scale factor of size
+                :math:`(4,)` of each image.
+
+        Returns:
+            list: The scaled boundaries of each image, in the same format as
+            the input.
+        """
+        assert isinstance(boundaries_list, list)
+        assert len(boundaries_list) == len(scale_factors)
+        for scale_factor in scale_factors:
+            assert isinstance(scale_factor, np.ndarray)
+            assert scale_factor.shape[0] == 4
+
+        results = list(boundaries_list)
+        # boundary arrays grouped by their length as (image index, array)
+        groups = {}
+        for idx, boundaries in enumerate(boundaries_list):
+            if isinstance(boundaries, (BoundaryResult, FourierBoundaryResult)):
+                results[idx] = boundaries.rescale(scale_factors[idx])
+                continue
+            if isinstance(boundaries, np.ndarray):
+                assert boundaries.ndim == 2
+                groups.setdefault(boundaries.shape[1], []).append(
+                    (idx, boundaries))
+                continue
+
+            assert check_argument.is_2dlist(boundaries)
+            lengths = set(len(b) for b in boundaries)
+            if len(lengths) == 1:
+                groups.setdefault(lengths.pop(), []).append(
+                    (idx, np.array(boundaries)))
+            else:
+                # boundaries of various lengths are rescaled one by one
+                results[idx] = [
+                    self.resize_boundaries([[b]], [scale_factors[idx]])[0][0]
+                    for b in boundaries
+                ]
+
+        for sz, items in groups.items():
+            # 2k points and a score, with k >= 4
+            assert sz % 2 == 1 and sz >= 9, \
+                f'Invalid boundary length {sz}'
+            inds = [idx for idx, _ in items]
+            counts = [len(boundaries) for _, boundaries in items]
+            scales = np.repeat(
+                np.stack([scale_factors[idx][:2] for idx in inds]),
+                counts,
+                axis=0)
+
+            boundaries = np.concatenate([b for _, b in items])
+            points = boundaries[:, :-1] * np.tile(scales, (sz - 1) // 2)
+            boundaries = np.concatenate([points, boundaries[:, -1:]], axis=1)
+
+            for idx, scaled in zip(inds,
+                                   np.split(boundaries, np.cumsum(counts))):
+                if isinstance(boundaries_list[idx], np.ndarray):
+                    results[idx] = scaled
+                else:
+                    results[idx] = scaled.tolist()
+
+        return results
 
     def get_boundary(self, score_maps, img_metas, rescale):
         """Compute text boundaries via post processing.
@@ -4,6 +4,7 @@ import torch.nn.functional as F
 from myocr.myocr.core import multi_apply
 from torch import nn
 
+from myocr.myocr.core.boundary import fourier_basis
 from myocr.myocr.models.builder import LOSSES
 
 
@@ -19,13 +20,31 @@ class FCELoss(nn.Module):
         num_sample (int) : The sampling points number of regression
             loss. If it is too small, fcenet tends to be overfitting.
         ohem_ratio (float): the negative/positive ratio in OHEM.
+        sync_free (bool): Whether to compute the loss without any host
+            synchronization. The empty-mask branches are replaced by masked
+            arithmetic and OHEM selects the hard negatives with a device-side
+            sort and tensor-valued counts, so the training step never waits
+            for the device. In exchange the regression branch reconstructs
+            the polygons of all pixels instead of the positive ones only.
+        fuse_levels (bool): Whether to compute the losses of all levels in a
+            single pass over the concatenated pixels of every level, see
+            :meth:`forward_fused`, instead of once per level.
     """
 
-    def __init__(self, fourier_degree, num_sample, ohem_ratio=3.):
+    def __init__(self,
+                 fourier_degree,
+                 num_sample,
+                 ohem_ratio=3.,
+                 sync_free=False,
+                 fuse_levels=False):
         super().__init__()
         self.fourier_degree = fourier_degree
         self.num_sample = num_sample
         self.ohem_ratio = ohem_ratio
+        self.sync_free = sync_free
+        self.fuse_levels = fuse_levels
+        # DFT basis tensors cached per (device, dtype)
+        self._basis_cache = {}
 
     def forward(self, preds, _, p3_maps, p4_maps, p5_maps):
         """Compute FCENet loss.
@@ -35,33 +54,53 @@ class FCELoss(nn.Module):
                 in a batch, and the inner list indicates the classification
                 prediction map (with shape :math:`(N, C, H, W)`) and
                 regression map (with shape :math:`(N, C, H, W)`).
-            p3_maps (list[ndarray]): List of leval 3 ground truth target map
-                with shape :math:`(C, H, W)`.
-            p4_maps (list[ndarray]): List of leval 4 ground truth target map
-                with shape :math:`(C, H, W)`.
-            p5_maps (list[ndarray]): List of leval 5 ground truth target map
-                with shape :math:`(C, H, W)`.
+            p3_maps (list[ndarray | dict]): List of leval 3 ground truth
+                target map with shape :math:`(C, H, W)`, or its compact
+                encoding from :meth:`FCENetTargets.encode_level_targets`.
+            p4_maps (list[ndarray | dict]): List of leval 4 ground truth
+                target map with shape :math:`(C, H, W)`, or its compact
+                encoding.
+            p5_maps (list[ndarray | dict]): List of leval 5 ground truth
+                target map with shape :math:`(C, H, W)`, or its compact
+                encoding.
 
         Returns:
             dict:  A loss dict with ``loss_text``, ``loss_center``,
             ``loss_reg_x`` and ``loss_reg_y``.
         """
         assert isinstance(preds, list)
-        assert p3_maps[0].shape[0] == 4 * self.fourier_degree + 5,\
+        compact = isinstance(p3_maps[0], dict)
+        if compact:
+            num_coeffs = p3_maps[0]['coeffs'].shape[2]
+        else:
+            num_coeffs = (p3_maps[0].shape[0] - 3) // 2
+        assert num_coeffs == 2 * self.fourier_degree + 1,\
             'fourier degree not equal in FCEhead and FCEtarget'
 
         device = preds[0][0].device
         # to tensor
-        gts = [p3_maps, p4_maps, p5_maps]
-        for idx, maps in enumerate(gts):
-            gts[idx] = torch.from_numpy(np.stack(maps)).float().to(device)
+        if compact:
+            gt, level_shapes = self.expand_targets(
+                [p3_maps, p4_maps, p5_maps], device)
+        else:
+            gt, level_shapes = self.upload_targets(
+                [p3_maps, p4_maps, p5_maps], device)
+        level_sizes = [int(np.prod(shape)) for shape in level_shapes]
+        if self.fuse_levels:
+            return self.forward_fused(preds, gt, level_sizes)
+
+        gts = []
+        for shape, level_gt in zip(level_shapes, gt.split(level_sizes)):
+            gts.append(
+                level_gt.view(shape + (gt.shape[1], )).permute(0, 3, 1, 2))
 
         losses = multi_apply(self.forward_single, preds, gts)
 
-        loss_tr = torch.tensor(0., device=device).float()
-        loss_tcl = torch.tensor(0., device=device).float()
-        loss_reg_x = torch.tensor(0., device=device).float()
-        loss_reg_y = torch.tensor(0., device=device).float()
+        # filled on the device, unlike torch.tensor which copies from host
+        loss_tr = torch.zeros((), device=device)
+        loss_tcl = torch.zeros((), device=device)
+        loss_reg_x = torch.zeros((), device=device)
+        loss_reg_y = torch.zeros((), device=device)
 
         for idx, loss in enumerate(losses):
             if idx == 0:
@@ -82,6 +121,227 @@ class FCELoss(nn.Module):
 
         return results
 
+    def upload_targets(self, gts, device):
+        """Copy the target maps of all levels to the device at once.
+
+        The maps are written pixel by pixel into one host buffer, which is
+        pinned for a non-blocking copy when the device is a GPU.
+
+        Args:
+            gts (list[list[ndarray]]): The target maps of shape (C, H, W) of
+                each image for each level.
+            device (torch.device): The device to copy the maps to.
+
+        Returns:
+            tuple(Tensor, list[tuple(int)]): The targets of all pixels of
+            shape (num_pixels, C), ordered by level, image, row and column,
+            and the (N, H, W) shape of each level.
+        """
+        level_shapes = [(len(maps), ) + maps[0].shape[1:] for maps in gts]
+        num_pixels = sum(int(np.prod(shape)) for shape in level_shapes)
+        num_channels = gts[0][0].shape[0]
+        buffer = torch.empty((num_pixels, num_channels),
+                             dtype=torch.float32,
+                             pin_memory=torch.device(device).type == 'cuda')
+        buffer_np = buffer.numpy()
+
+        start = 0
+        for maps in gts:
+            for m in maps:
+                size = m.shape[1] * m.shape[2]
+                buffer_np[start:start + size] = m.reshape(num_channels, -1).T
+                start += size
+
+        return buffer.to(device, non_blocking=True), level_shapes
+
+    def expand_targets(self, gts, device):
+        """Expand the compact targets of all levels on the device.
+
+        Only the compact arrays are copied to the device, each as one pinned
+        non-blocking transfer on a GPU. The dense targets are then built on
+        the device in the layout of :meth:`upload_targets`.
+
+        Args:
+            gts (list[list[dict]]): The compact targets from
+                :meth:`FCENetTargets.encode_level_targets` of each image for
+                each level.
+            device (torch.device): The device to expand the targets on.
+
+        Returns:
+            tuple(Tensor, list[tuple(int)]): The same as
+            :meth:`upload_targets`.
+        """
+        k = self.fourier_degree
+        num_coeffs = 2 * k + 1
+
+        level_shapes = []
+        masks, inds, instances, coeffs = [], [], [], []
+        num_pixels = num_instances = 0
+        for maps in gts:
+            h, w = maps[0]['size']
+            level_shapes.append((len(maps), h, w))
+            for m in maps:
+                assert tuple(m['size']) == (h, w)
+                masks.append(m['masks'])
+                inds.append(m['inds'] + num_pixels)
+                instances.append(m['instances'].astype(np.int32) +
+                                 num_instances)
+                coeffs.append(m['coeffs'])
+                num_pixels += h * w
+                num_instances += len(m['coeffs'])
+
+        def to_device(arrays):
+            tensor = torch.from_numpy(np.concatenate(arrays))
+            if torch.device(device).type == 'cuda':
+                tensor = tensor.pin_memory()
+            return tensor.to(device, non_blocking=True)
+
+        masks, inds = to_device(masks), to_device(inds).long()
+        instances, coeffs = to_device(instances).long(), to_device(coeffs)
+
+        # unpack the mask bits of each level, whose images share one size
+        shifts = torch.arange(7, -1, -1, device=device, dtype=torch.uint8)
+        level_masks = []
+        byte_start = 0
+        for num, h, w in level_shapes:
+            num_bytes = (2 * h * w + 7) // 8
+            level_bytes = masks[byte_start:byte_start + num * num_bytes]
+            bits = (level_bytes.view(num, num_bytes, 1) >> shifts) & 1
+            bits = bits.view(num, -1)[:, :2 * h * w].view(num, 2, h * w)
+            level_masks.append(bits.permute(0, 2, 1).reshape(-1, 2))
+            byte_start += num * num_bytes
+
+        gt = torch.zeros((num_pixels, 4 * k + 5), device=device)
+        gt[:, 1:3] = torch.cat(level_masks).float()
+
+        # the pixel coordinates of each text pixel within its image
+        x, y, pixel_start, pos_start = [], [], 0, 0
+        for maps, (num, h, w) in zip(gts, level_shapes):
+            num_pos = sum(len(m['inds']) for m in maps)
+            local_inds = (inds[pos_start:pos_start + num_pos] -
+                          pixel_start) % (h * w)
+            x.append(local_inds % w)
+            y.append(torch.div(local_inds, w, rounding_mode='floor'))
+            pixel_start += num * h * w
+            pos_start += num_pos
+
+        real = coeffs[instances, 0]
+        imag = coeffs[instances, 1]
+        real[:, k] -= torch.cat(x)
+        imag[:, k] -= torch.cat(y)
+        gt[inds, 0] = 1
+        gt[inds, 3:3 + num_coeffs] = real
+        gt[inds, 3 + num_coeffs:] = imag
+
+        return gt, level_shapes
+
+    def forward_fused(self, preds, gt, level_sizes):
+        """Compute the losses of all levels in one pass.
+
+        The pixels of all levels are concatenated and tagged with their level
+        index. Every loss term is computed once over all of them and reduced
+        per level, which keeps the per-level OHEM of :meth:`forward_single`:
+        the hard negatives of each level are picked by a device-side sort
+        with the level as the primary key.
+
+        Args:
+            preds (list[list[Tensor]]): The classification and regression
+                predictions of each level.
+            gt (Tensor): The targets of all pixels of shape (num_pixels, C),
+                as returned by :meth:`upload_targets`.
+            level_sizes (list[int]): The number of pixels of each level.
+
+        Returns:
+            dict: The same loss dict as :meth:`forward`.
+        """
+        k = 2 * self.fourier_degree + 1
+        num_levels = len(level_sizes)
+        cls_pred = torch.cat(
+            [pred[0].permute(0, 2, 3, 1).reshape(-1, 4) for pred in preds])
+        reg_pred = torch.cat([
+            pred[1].permute(0, 2, 3, 1).reshape(-1, 2 * k) for pred in preds
+        ])
+        device = gt.device
+        level = torch.cat([
+            torch.full((size, ), idx, dtype=torch.long, device=device)
+            for idx, size in enumerate(level_sizes)
+        ])
+
+        def level_sum(x):
+            return x.new_zeros(num_levels).index_add_(0, level, x)
+
+        tr_mask = gt[:, 0]
+        tcl_mask = gt[:, 1]
+        train_mask = gt[:, 2]
+        tr_train_mask = train_mask * tr_mask
+        tr_neg_mask = 1 - tr_train_mask
+        n_pos = level_sum(tr_train_mask)
+        has_pos = (n_pos > 0).float()
+
+        # tr loss with OHEM per level
+        neg = (1 - tr_mask) * train_mask
+        n_neg_total = level_sum(neg)
+        loss = F.cross_entropy(
+            cls_pred[:, :2], tr_mask.long(), reduction='none')
+        loss_pos = level_sum(loss * tr_train_mask)
+        n_neg = torch.where(
+            n_pos > 0,
+            torch.min(n_neg_total, torch.floor(self.ohem_ratio * n_pos)),
+            n_pos.new_full((), 100.))
+        loss_neg = torch.where(neg.bool(), loss, loss.new_full((), -1.))
+        # sort by descending loss, then stably by level
+        order = torch.sort(loss_neg, descending=True, stable=True)[1]
+        order = order[torch.sort(level[order], stable=True)[1]]
+        level_starts = torch.searchsorted(
+            level, torch.arange(num_levels, device=device))
+        rank = torch.arange(len(level), device=device) - level_starts[level]
+        keep = (rank < torch.min(n_neg, n_neg_total)[level]).float()
+        loss_neg = level_sum(loss_neg[order] * keep)
+        loss_tr = (loss_pos + loss_neg) / (n_pos + n_neg)
+
+        # tcl loss
+        loss_tcl = F.cross_entropy(
+            cls_pred[:, 2:], tcl_mask.long(), reduction='none')
+        loss_tcl_pos = level_sum(loss_tcl * tr_train_mask) / n_pos.clamp(
+            min=1)
+        loss_tcl_neg = level_sum(loss_tcl * tr_neg_mask) / level_sum(
+            tr_neg_mask).clamp(min=1)
+        loss_tcl = has_pos * (loss_tcl_pos + 0.5 * loss_tcl_neg)
+
+        # regression loss
+        weight = tr_train_mask * (tr_mask + tcl_mask) / 2
+        x_map, y_map = gt[:, 3:3 + k], gt[:, 3 + k:]
+        x_pred, y_pred = reg_pred[:, :k], reg_pred[:, k:]
+        reg_level = level
+        if not self.sync_free:
+            # only reconstruct the polygons of the positive pixels
+            pos_inds = torch.nonzero(tr_train_mask, as_tuple=True)[0]
+            weight, reg_level = weight[pos_inds], level[pos_inds]
+            x_map, y_map = x_map[pos_inds], y_map[pos_inds]
+            x_pred, y_pred = x_pred[pos_inds], y_pred[pos_inds]
+        num_elements = (n_pos * self.num_sample).clamp(min=1)
+
+        ft_x, ft_y = self.fourier2poly(x_map, y_map)
+        ft_x_pre, ft_y_pre = self.fourier2poly(x_pred, y_pred)
+
+        loss_reg_x = weight * F.smooth_l1_loss(
+            ft_x_pre, ft_x, reduction='none').sum(dim=1)
+        loss_reg_y = weight * F.smooth_l1_loss(
+            ft_y_pre, ft_y, reduction='none').sum(dim=1)
+        loss_reg_x = n_pos.new_zeros(num_levels).index_add_(
+            0, reg_level, loss_reg_x) / num_elements
+        loss_reg_y = n_pos.new_zeros(num_levels).index_add_(
+            0, reg_level, loss_reg_y) / num_elements
+
+        results = dict(
+            loss_text=loss_tr.sum(),
+            loss_center=loss_tcl.sum(),
+            loss_reg_x=loss_reg_x.sum(),
+            loss_reg_y=loss_reg_y.sum(),
+        )
+
+        return results
+
     def forward_single(self, pred, gt):
         cls_pred = pred[0].permute(0, 2, 3, 1).contiguous()
         reg_pred = pred[1].permute(0, 2, 3, 1).contiguous()
@@ -101,6 +361,11 @@ class FCELoss(nn.Module):
 
         tr_train_mask = train_mask * tr_mask
         device = x_map.device
+        if self.sync_free:
+            return self.forward_single_sync_free(tr_pred, tcl_pred, x_pred,
+                                                 y_pred, tr_mask, tcl_mask,
+                                                 train_mask, x_map, y_map)
+
         # tr loss
         loss_tr = self.ohem(tr_pred, tr_mask.long(), train_mask.long())
 
@@ -119,21 +384,20 @@ class FCELoss(nn.Module):
         loss_reg_x = torch.tensor(0.).float().to(device)
         loss_reg_y = torch.tensor(0.).float().to(device)
         if tr_train_mask.sum().item() > 0:
-            weight = (tr_mask[tr_train_mask.bool()].float() +
-                      tcl_mask[tr_train_mask.bool()].float()) / 2
+            pos_mask = tr_train_mask.bool()
+            weight = (tr_mask[pos_mask].float() +
+                      tcl_mask[pos_mask].float()) / 2
             weight = weight.contiguous().view(-1, 1)
 
-            ft_x, ft_y = self.fourier2poly(x_map, y_map)
-            ft_x_pre, ft_y_pre = self.fourier2poly(x_pred, y_pred)
+            # only reconstruct the polygons of the positive pixels
+            ft_x, ft_y = self.fourier2poly(x_map[pos_mask], y_map[pos_mask])
+            ft_x_pre, ft_y_pre = self.fourier2poly(x_pred[pos_mask],
+                                                   y_pred[pos_mask])
 
             loss_reg_x = torch.mean(weight * F.smooth_l1_loss(
-                ft_x_pre[tr_train_mask.bool()],
-                ft_x[tr_train_mask.bool()],
-                reduction='none'))
+                ft_x_pre, ft_x, reduction='none'))
             loss_reg_y = torch.mean(weight * F.smooth_l1_loss(
-                ft_y_pre[tr_train_mask.bool()],
-                ft_y[tr_train_mask.bool()],
-                reduction='none'))
+                ft_y_pre, ft_y, reduction='none'))
 
         return loss_tr, loss_tcl, loss_reg_x, loss_reg_y
 
@@ -162,6 +426,82 @@ class FCELoss(nn.Module):
 
         return (loss_pos + loss_neg.sum()) / (n_pos + n_neg).float()
 
+    def forward_single_sync_free(self, tr_pred, tcl_pred, x_pred, y_pred,
+                                 tr_mask, tcl_mask, train_mask, x_map, y_map):
+        """The host-synchronization-free counterpart of the losses computed by
+        :meth:`forward_single`, taking the flattened predictions and targets
+        of one level."""
+        tr_train_mask = train_mask * tr_mask
+        tr_neg_mask = 1 - tr_train_mask
+        n_pos = tr_train_mask.sum()
+        has_pos = (n_pos > 0).float()
+
+        # tr loss
+        loss_tr = self.ohem_sync_free(tr_pred, tr_mask.long(),
+                                      train_mask.long())
+
+        # tcl loss
+        loss_tcl = F.cross_entropy(
+            tcl_pred, tcl_mask.long(), reduction='none')
+        loss_tcl_pos = (loss_tcl * tr_train_mask).sum() / n_pos.clamp(min=1)
+        loss_tcl_neg = (loss_tcl * tr_neg_mask).sum() / tr_neg_mask.sum(
+        ).clamp(min=1)
+        loss_tcl = has_pos * (loss_tcl_pos + 0.5 * loss_tcl_neg)
+
+        # regression loss
+        weight = tr_train_mask * (tr_mask + tcl_mask) / 2
+        weight = weight.view(-1, 1)
+        num_elements = (n_pos * self.num_sample).clamp(min=1)
+
+        ft_x, ft_y = self.fourier2poly(x_map, y_map)
+        ft_x_pre, ft_y_pre = self.fourier2poly(x_pred, y_pred)
+
+        loss_reg_x = (weight * F.smooth_l1_loss(
+            ft_x_pre, ft_x, reduction='none')).sum() / num_elements
+        loss_reg_y = (weight * F.smooth_l1_loss(
+            ft_y_pre, ft_y, reduction='none')).sum() / num_elements
+
+        return loss_tr, loss_tcl, loss_reg_x, loss_reg_y
+
+    def ohem_sync_free(self, predict, target, train_mask):
+        """OHEM computed as :meth:`ohem`, but with the number of negatives
+        kept as a tensor and the hard negatives selected by sorting."""
+        pos = (target * train_mask).float()
+        neg = ((1 - target) * train_mask).float()
+        n_pos = pos.sum()
+        n_neg_total = neg.sum()
+
+        loss = F.cross_entropy(predict, target, reduction='none')
+        loss_pos = (loss * pos).sum()
+
+        n_neg = torch.where(n_pos > 0,
+                            torch.min(n_neg_total,
+                                      torch.floor(self.ohem_ratio * n_pos)),
+                            n_pos.new_full((), 100.))
+        # the losses of the negatives are non-negative, so every other pixel
+        # is sorted behind them
+        loss_neg, _ = torch.sort(
+            torch.where(neg.bool(), loss, loss.new_full((), -1.)),
+            descending=True)
+        rank = torch.arange(len(loss_neg), device=loss_neg.device)
+        keep = (rank < torch.min(n_neg, n_neg_total)).float()
+        loss_neg = (loss_neg * keep).sum()
+
+        return (loss_pos + loss_neg) / (n_pos + n_neg)
+
+    def get_basis(self, maps):
+        """Get the cos and sin DFT basis tensors on the device and with the
+        dtype of ``maps``, each of shape (2k+1, n).
+
+        The tensors are built once per device and dtype and then reused.
+        """
+        key = (maps.device, maps.dtype)
+        if key not in self._basis_cache:
+            basis = fourier_basis(self.fourier_degree, self.num_sample)
+            self._basis_cache[key] = (maps.new_tensor(basis.real),
+                                      maps.new_tensor(basis.imag))
+        return self._basis_cache[key]
+
     def fourier2poly(self, real_maps, imag_maps):
         """Transform Fourier coefficient maps to polygon maps.
 
@@ -178,27 +518,12 @@ class FCELoss(nn.Module):
                 represented by n sample points (xn, yn), whose shape is (-1, n)
         """
 
-        device = real_maps.device
-
-        k_vect = torch.arange(
-            -self.fourier_degree,
-            self.fourier_degree + 1,
-            dtype=torch.float,
-            device=device).view(-1, 1)
-        i_vect = torch.arange(
-            0, self.num_sample, dtype=torch.float, device=device).view(1, -1)
-
-        transform_matrix = 2 * np.pi / self.num_sample * torch.mm(
-            k_vect, i_vect)
-
-        x1 = torch.einsum('ak, kn-> an', real_maps,
-                          torch.cos(transform_matrix))
-        x2 = torch.einsum('ak, kn-> an', imag_maps,
-                          torch.sin(transform_matrix))
-        y1 = torch.einsum('ak, kn-> an', real_maps,
-                          torch.sin(transform_matrix))
-        y2 = torch.einsum('ak, kn-> an', imag_maps,
-                          torch.cos(transform_matrix))
+        cos_matrix, sin_matrix = self.get_basis(real_maps)
+
+        x1 = torch.einsum('ak, kn-> an', real_maps, cos_matrix)
+        x2 = torch.einsum('ak, kn-> an', imag_maps, sin_matrix)
+        y1 = torch.einsum('ak, kn-> an', real_maps, sin_matrix)
+        y2 = torch.einsum('ak, kn-> an', imag_maps, cos_matrix)
 
         x_maps = x1 - x2
         y_maps = y1 + y2
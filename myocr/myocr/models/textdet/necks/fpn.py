@@ -39,6 +39,10 @@ class FPN(BaseModule):
             Default: None.
         upsample_cfg (dict): Config dict for interpolate layer.
             Default: dict(mode='nearest').
+        test_out_levels (list[int], optional): The indices of the outputs
+            computed at inference. The other outputs are None, and the convs
+            used only by them are skipped. All outputs are computed if it is
+            None or in training mode. Default: None.
         init_cfg (dict or list[dict], optional): Initialization config dict.
 
     Example:
@@ -70,6 +74,7 @@ class FPN(BaseModule):
                  norm_cfg=None,
                  act_cfg=None,
                  upsample_cfg=dict(mode='nearest'),
+                 test_out_levels=None,
                  init_cfg=dict(
                      type='Xavier', layer='Conv2d', distribution='uniform')):
         super(FPN, self).__init__(init_cfg)
@@ -82,6 +87,10 @@ class FPN(BaseModule):
         self.no_norm_on_lateral = no_norm_on_lateral
         self.fp16_enabled = False
         self.upsample_cfg = upsample_cfg.copy()
+        if test_out_levels is not None:
+            assert len(test_out_levels) > 0
+            assert all(0 <= level < num_outs for level in test_out_levels)
+        self.test_out_levels = test_out_levels
 
         if end_level == -1 or end_level == self.num_ins - 1:
             self.backbone_end_level = self.num_ins
@@ -150,6 +159,8 @@ class FPN(BaseModule):
     def forward(self, inputs):
         """Forward function."""
         assert len(inputs) == len(self.in_channels)
+        if not self.training and self.test_out_levels is not None:
+            return self.forward_levels(inputs, self.test_out_levels)
 
         # build laterals
         laterals = [
@@ -199,4 +210,78 @@ class FPN(BaseModule):
                         outs.append(self.fpn_convs[i](F.relu(outs[-1])))
                     else:
                         outs.append(self.fpn_convs[i](outs[-1]))
-        return tuple(outs)
\ No newline at end of file
+        return tuple(outs)
+
+    def forward_levels(self, inputs, levels):
+        """Compute only the outputs of the given levels.
+
+        A level needs the laterals of all the levels above it, for the
+        top-down path, and its own output conv. The extra levels only need
+        the top level.
+
+        Args:
+            inputs (list[Tensor]): The backbone features.
+            levels (list[int]): The indices of the outputs to compute.
+
+        Returns:
+            tuple[Tensor | None]: The outputs, with None at the skipped
+            levels.
+        """
+        levels = set(levels)
+        used_backbone_levels = len(self.lateral_convs)
+        start = min(min(levels), used_backbone_levels - 1)
+
+        laterals = [
+            self.lateral_convs[i](inputs[i + self.start_level])
+            for i in range(start, used_backbone_levels)
+        ]
+        for i in range(len(laterals) - 1, 0, -1):
+            if 'scale_factor' in self.upsample_cfg:
+                laterals[i - 1] = laterals[i - 1] + F.interpolate(
+                    laterals[i], **self.upsample_cfg)
+            else:
+                prev_shape = laterals[i - 1].shape[2:]
+                laterals[i - 1] = laterals[i - 1] + F.interpolate(
+                    laterals[i], size=prev_shape, **self.upsample_cfg)
+
+        outs = [None] * self.num_outs
+        for i in range(start, used_backbone_levels):
+            if i in levels:
+                outs[i] = self.fpn_convs[i](laterals[i - start])
+
+        max_level = max(levels)
+        if max_level < used_backbone_levels:
+            return tuple(outs)
+
+        def top_output():
+            top = used_backbone_levels - 1
+            if outs[top] is not None:
+                return outs[top]
+            return self.fpn_convs[top](laterals[-1])
+
+        if not self.add_extra_convs:
+            extra = top_output()
+            for i in range(used_backbone_levels, max_level + 1):
+                extra = F.max_pool2d(extra, 1, stride=2)
+                if i in levels:
+                    outs[i] = extra
+            return tuple(outs)
+
+        if self.add_extra_convs == 'on_input':
+            extra_source = inputs[self.backbone_end_level - 1]
+        elif self.add_extra_convs == 'on_lateral':
+            extra_source = laterals[-1]
+        elif self.add_extra_convs == 'on_output':
+            extra_source = top_output()
+        else:
+            raise NotImplementedError
+        extra = self.fpn_convs[used_backbone_levels](extra_source)
+        for i in range(used_backbone_levels, max_level + 1):
+            if i > used_backbone_levels:
+                if self.relu_before_extra_convs:
+                    extra = self.fpn_convs[i](F.relu(extra))
+                else:
+                    extra = self.fpn_convs[i](extra)
+            if i in levels:
+                outs[i] = extra
+        return tuple(outs)
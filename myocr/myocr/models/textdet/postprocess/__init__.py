@@ -1,4 +1,8 @@
 from .base_postprocessor import BasePostprocessor
 from .fce_postprocessor import FCEPostprocessor
+from .polygon_nms import PolygonGridIndex, merge_tiled_polygons, polygon_nms
 
-__all__ = ['BasePostprocessor', 'FCEPostprocessor']
\ No newline at end of file
+__all__ = [
+    'BasePostprocessor', 'FCEPostprocessor', 'PolygonGridIndex', 'polygon_nms',
+    'merge_tiled_polygons'
+]
\ No newline at end of file
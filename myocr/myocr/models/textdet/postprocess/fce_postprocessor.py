@@ -1,9 +1,13 @@
 import cv2
 import numpy as np
+import torch
+import torch.nn.functional as F
 
+from myocr.myocr.core import BoundaryResult, FourierBoundaryResult
 from myocr.myocr.models.builder import POSTPROCESSOR
 from .base_postprocessor import BasePostprocessor
-from .utils import fill_hole, fourier2poly, poly_nms
+from .polygon_nms import polygon_nms
+from .utils import fill_hole, fourier2poly, fourier_basis
 
 
 @POSTPROCESSOR.register_module()
@@ -23,6 +27,31 @@ class FCEPostprocessor(BasePostprocessor):
         score_thr (float): The threshold used to filter out the final
             candidates.
         nms_thr (float): The threshold of nms.
+        decoding_mode (str): How text instances are separated from the
+            thresholded score map. 'contour' fills every contour found by
+            ``cv2.findContours`` on a full-size mask, while
+            'connected_component' labels the mask once with
+            ``cv2.connectedComponentsWithStats`` and only visits the bounding
+            box of each instance, which is much faster on dense images.
+        decode_on_device (bool): Whether to compute the score map and the
+            polygon reconstruction on the device of the predictions, so that
+            only the candidate polygons are copied to host instead of the
+            full classification and regression maps.
+        reconstr_dtype (str): Real data type of the polygon reconstruction
+            on host, 'float64' or 'float32'.
+        max_candidates (int, optional): The maximum number of candidate pixels
+            of each instance which are reconstructed to polygons and passed to
+            nms. The highest scoring ones are kept. All candidates are kept if
+            it is None.
+        local_max_candidates (bool): Whether to only use the pixels which are
+            maxima of the score map in their 3x3 neighbourhood as candidates.
+        result_format (str): 'list' returns the legacy list of boundaries
+            with scores, while 'array' returns a :obj:`BoundaryResult` which
+            keeps the points and scores in compact arrays. 'fourier' returns
+            a :obj:`FourierBoundaryResult` which keeps the Fourier
+            coefficients of the boundaries after nms and reconstructs
+            polygons lazily at any resolution. Only the 'list' format
+            supports ``text_repr_type='quad'``.
     """
 
     def __init__(self,
@@ -33,14 +62,35 @@ class FCEPostprocessor(BasePostprocessor):
                  beta=2.0,
                  score_thr=0.3,
                  nms_thr=0.1,
+                 decoding_mode='contour',
+                 decode_on_device=False,
+                 reconstr_dtype='float64',
+                 max_candidates=None,
+                 local_max_candidates=False,
+                 result_format='list',
                  **kwargs):
         super().__init__(text_repr_type)
+        assert decoding_mode in ['contour', 'connected_component'
+                                 ], f'Invalid decoding mode {decoding_mode}'
+        assert reconstr_dtype in ['float64', 'float32'
+                                  ], f'Invalid reconstr dtype {reconstr_dtype}'
+        assert max_candidates is None or max_candidates > 0
+        assert result_format in ['list', 'array', 'fourier'
+                                 ], f'Invalid result format {result_format}'
+        assert result_format == 'list' or text_repr_type == 'poly', \
+            f'result_format {result_format} only supports poly text_repr_type'
         self.fourier_degree = fourier_degree
         self.num_reconstr_points = num_reconstr_points
         self.alpha = alpha
         self.beta = beta
         self.score_thr = score_thr
         self.nms_thr = nms_thr
+        self.decoding_mode = decoding_mode
+        self.decode_on_device = decode_on_device
+        self.reconstr_dtype = reconstr_dtype
+        self.max_candidates = max_candidates
+        self.local_max_candidates = local_max_candidates
+        self.result_format = result_format
 
     def __call__(self, preds, scale):
         """
@@ -50,16 +100,69 @@ class FCEPostprocessor(BasePostprocessor):
             scale (float): Scale of current layer.
 
         Returns:
-            list[list[float]]: The instance boundary and confidence.
+            list[list[float]] | BoundaryResult | FourierBoundaryResult: The
+            instance boundary and confidence.
         """
         assert isinstance(preds, list)
         assert len(preds) == 2
 
         cls_pred = preds[0][0]
+        reg_pred = preds[1][0]
+        if self.decode_on_device:
+            candidates = self._device_candidates(cls_pred, reg_pred, scale)
+        else:
+            candidates = self._host_candidates(cls_pred, reg_pred, scale)
+
+        boundaries = [np.zeros((0, 2 * self.num_reconstr_points + 1))]
+        coeffs = [np.zeros((0, 2 * self.fourier_degree + 1), np.complex64)]
+        for polygons, score, coeff in candidates:
+            dets, keep = polygon_nms(polygons, score, self.nms_thr)
+            boundaries.append(dets)
+            if self.result_format == 'fourier':
+                coeffs.append(coeff[keep])
+
+        boundaries = np.concatenate(boundaries)
+        boundaries, keep = polygon_nms(boundaries[:, :-1], boundaries[:, -1],
+                                       self.nms_thr)
+        if self.result_format == 'fourier':
+            return FourierBoundaryResult(
+                np.concatenate(coeffs)[keep], boundaries[:, -1],
+                self.num_reconstr_points)
+        if self.result_format == 'array':
+            return BoundaryResult.from_array(boundaries)
+        boundaries = boundaries.tolist()
+
+        if self.text_repr_type == 'quad':
+            new_boundaries = []
+            for boundary in boundaries:
+                poly = np.array(boundary[:-1]).reshape(-1,
+                                                       2).astype(np.float32)
+                score = boundary[-1]
+                points = cv2.boxPoints(cv2.minAreaRect(poly))
+                points = np.int0(points)
+                new_boundaries.append(points.reshape(-1).tolist() + [score])
+
+        return boundaries
+
+    def _host_candidates(self, cls_pred, reg_pred, scale):
+        """Decode candidate polygons of each instance with NumPy after
+        copying the full prediction maps to host.
+
+        Args:
+            cls_pred (Tensor): Classification prediction of shape (4, H, W).
+            reg_pred (Tensor): Regression prediction of shape (4k+2, H, W).
+            scale (float): Scale of current layer.
+
+        Yields:
+            tuple(ndarray, ndarray, ndarray): The candidate polygons of one
+            instance with shape (n, 2 * num_reconstr_points), their scores
+            with shape (n, 1) and their Fourier coefficients with shape
+            (n, 2k+1).
+        """
         tr_pred = cls_pred[0:2].softmax(dim=0).data.cpu().numpy()
         tcl_pred = cls_pred[2:].softmax(dim=0).data.cpu().numpy()
 
-        reg_pred = preds[1][0].permute(1, 2, 0).data.cpu().numpy()
+        reg_pred = reg_pred.permute(1, 2, 0).data.cpu().numpy()
         x_pred = reg_pred[:, :, :2 * self.fourier_degree + 1]
         y_pred = reg_pred[:, :, 2 * self.fourier_degree + 1:]
 
@@ -67,43 +170,183 @@ class FCEPostprocessor(BasePostprocessor):
         tr_pred_mask = (score_pred) > self.score_thr
         tr_mask = fill_hole(tr_pred_mask)
 
+        valid_mask = score_pred > 0
+        if self.local_max_candidates:
+            valid_mask &= score_pred >= cv2.dilate(score_pred,
+                                                   np.ones((3, 3), np.uint8))
+
+        for xy_text in self._instances(valid_mask, tr_mask):
+            if (self.max_candidates is not None
+                    and len(xy_text) > self.max_candidates):
+                instance_score = score_pred[xy_text[:, 0], xy_text[:, 1]]
+                inds = np.argpartition(-instance_score,
+                                       self.max_candidates - 1)
+                xy_text = xy_text[np.sort(inds[:self.max_candidates])]
+
+            dxy = xy_text[:, 1] + xy_text[:, 0] * 1j
+
+            x = x_pred[xy_text[:, 0], xy_text[:, 1]]
+            y = y_pred[xy_text[:, 0], xy_text[:, 1]]
+            c = x + y * 1j
+            c[:, self.fourier_degree] = c[:, self.fourier_degree] + dxy
+            c *= scale
+
+            polygons = fourier2poly(c, self.num_reconstr_points,
+                                    self.reconstr_dtype)
+            score = score_pred[xy_text[:, 0], xy_text[:, 1]].reshape(-1, 1)
+            yield polygons, score, c
+
+    def _device_candidates(self, cls_pred, reg_pred, scale):
+        """Decode candidate polygons of each instance on the device of the
+        predictions.
+
+        The final score map, the threshold mask and the Fourier to polygon
+        reconstruction are computed as tensor ops. Only the binary masks
+        needed for instance separation and the polygons and scores of the
+        candidate pixels are copied to host.
+
+        Args:
+            cls_pred (Tensor): Classification prediction of shape (4, H, W).
+            reg_pred (Tensor): Regression prediction of shape (4k+2, H, W).
+            scale (float): Scale of current layer.
+
+        Yields:
+            tuple(ndarray, ndarray, ndarray | None): The candidate polygons of
+            one instance with shape (n, 2 * num_reconstr_points), their
+            scores with shape (n, 1) and, only if ``result_format`` is
+            'fourier', their Fourier coefficients with shape (n, 2k+1).
+        """
+        k = self.fourier_degree
+        cls_pred = cls_pred.detach()
+        reg_pred = reg_pred.detach()
+
+        tr_pred = cls_pred[0:2].softmax(dim=0)[1]
+        tcl_pred = cls_pred[2:].softmax(dim=0)[1]
+        score_pred = (tr_pred**self.alpha) * (tcl_pred**self.beta)
+
+        valid_mask = score_pred > 0
+        if self.local_max_candidates:
+            valid_mask &= score_pred >= F.max_pool2d(
+                score_pred[None, None], 3, stride=1, padding=1)[0, 0]
+        masks = torch.stack([score_pred > self.score_thr,
+                             valid_mask]).cpu().numpy()
+        tr_mask = fill_hole(masks[0])
+
+        instances = list(self._instances(masks[1], tr_mask))
+        if len(instances) == 0:
+            return
+        xy_text = torch.from_numpy(np.concatenate(instances)).to(
+            score_pred.device)
+        rows, cols = xy_text[:, 0], xy_text[:, 1]
+
+        counts = np.array([len(inst) for inst in instances])
+        if self.max_candidates is not None and np.any(
+                counts > self.max_candidates):
+            # group the candidates by instance in descending score order and
+            # keep the first max_candidates of each group
+            inst_ids = torch.repeat_interleave(
+                torch.arange(len(counts), device=rows.device),
+                torch.from_numpy(counts).to(rows.device))
+            _, order = torch.sort(
+                score_pred[rows, cols], descending=True, stable=True)
+            _, group_order = torch.sort(inst_ids[order], stable=True)
+            order = order[group_order]
+            starts = torch.from_numpy(np.cumsum(counts) - counts).to(
+                rows.device)
+            rank = torch.arange(
+                len(order), device=rows.device) - starts[inst_ids[order]]
+            keep, _ = torch.sort(order[rank < self.max_candidates])
+            rows, cols = rows[keep], cols[keep]
+            counts = np.minimum(counts, self.max_candidates)
+
+        coeff = reg_pred[:, rows, cols].t()
+        x = coeff[:, :2 * k + 1].clone()
+        y = coeff[:, 2 * k + 1:].clone()
+        x[:, k] += cols.to(x.dtype)
+        y[:, k] += rows.to(y.dtype)
+        x *= scale
+        y *= scale
+
+        basis = fourier_basis(k, self.num_reconstr_points)
+        cos, sin = x.new_tensor(basis.real), x.new_tensor(basis.imag)
+        poly_x = x @ cos - y @ sin
+        poly_y = x @ sin + y @ cos
+
+        polygons = torch.stack([poly_x, poly_y], dim=-1).flatten(1)
+        candidates = [polygons.trunc(), score_pred[rows, cols].unsqueeze(1)]
+        if self.result_format == 'fourier':
+            candidates += [x, y]
+        candidates = torch.cat(candidates, dim=1).cpu().numpy()
+
+        num_poly = 2 * self.num_reconstr_points
+        sections = np.cumsum(counts)[:-1]
+        for candidate in np.split(candidates, sections):
+            polygons = candidate[:, :num_poly]
+            score = candidate[:, num_poly:num_poly + 1]
+            coeff = None
+            if self.result_format == 'fourier':
+                x_coeff = candidate[:, num_poly + 1:num_poly + 2 * k + 2]
+                y_coeff = candidate[:, num_poly + 2 * k + 2:]
+                coeff = x_coeff + y_coeff * 1j
+            yield polygons, score, coeff
+
+    def _instances(self, valid_mask, tr_mask):
+        if self.decoding_mode == 'contour':
+            return self._contour_instances(valid_mask, tr_mask)
+        return self._connected_component_instances(valid_mask, tr_mask)
+
+    @staticmethod
+    def _contour_instances(valid_mask, tr_mask):
+        """Yield the candidate pixels of each text instance by filling its
+        contour on a full-size mask.
+
+        Args:
+            valid_mask (ndarray): The mask of pixels with a positive final
+                score, of shape (H, W).
+            tr_mask (ndarray): The binary text region mask of shape (H, W).
+
+        Yields:
+            ndarray: The (row, col) coordinates of the candidate pixels of one
+            instance, with shape (n, 2).
+        """
         tr_contours, _ = cv2.findContours(
             tr_mask.astype(np.uint8), cv2.RETR_TREE,
             cv2.CHAIN_APPROX_SIMPLE)  # opencv4
 
         mask = np.zeros_like(tr_mask)
-        boundaries = []
         for cont in tr_contours:
             deal_map = mask.copy().astype(np.int8)
             cv2.drawContours(deal_map, [cont], -1, 1, -1)
 
-            score_map = score_pred * deal_map
-            score_mask = score_map > 0
-            xy_text = np.argwhere(score_mask)
-            dxy = xy_text[:, 1] + xy_text[:, 0] * 1j
-
-            x, y = x_pred[score_mask], y_pred[score_mask]
-            c = x + y * 1j
-            c[:, self.fourier_degree] = c[:, self.fourier_degree] + dxy
-            c *= scale
+            yield np.argwhere(deal_map.astype(bool) & valid_mask)
 
-            polygons = fourier2poly(c, self.num_reconstr_points)
-            score = score_map[score_mask].reshape(-1, 1)
-            polygons = poly_nms(
-                np.hstack((polygons, score)).tolist(), self.nms_thr)
+    @staticmethod
+    def _connected_component_instances(valid_mask, tr_mask):
+        """Yield the candidate pixels of each text instance from a single
+        connected component labeling pass.
 
-            boundaries = boundaries + polygons
+        Only the bounding box of each component is visited, so the cost is
+        proportional to the instance areas rather than to the number of
+        instances times the image size.
 
-        boundaries = poly_nms(boundaries, self.nms_thr)
+        Args:
+            valid_mask (ndarray): The mask of pixels with a positive final
+                score, of shape (H, W).
+            tr_mask (ndarray): The binary text region mask of shape (H, W).
 
-        if self.text_repr_type == 'quad':
-            new_boundaries = []
-            for boundary in boundaries:
-                poly = np.array(boundary[:-1]).reshape(-1,
-                                                       2).astype(np.float32)
-                score = boundary[-1]
-                points = cv2.boxPoints(cv2.minAreaRect(poly))
-                points = np.int0(points)
-                new_boundaries.append(points.reshape(-1).tolist() + [score])
+        Yields:
+            ndarray: The (row, col) coordinates of the candidate pixels of one
+            instance, with shape (n, 2).
+        """
+        # 8-connectivity matches the outer contours of cv2.findContours
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+            tr_mask.astype(np.uint8), connectivity=8)
 
-        return boundaries
\ No newline at end of file
+        for label in range(1, num_labels):
+            x, y, w, h = stats[label, :4]
+            instance_mask = labels[y:y + h, x:x + w] == label
+            instance_mask &= valid_mask[y:y + h, x:x + w]
+            xy_text = np.argwhere(instance_mask)
+            xy_text[:, 0] += y
+            xy_text[:, 1] += x
+            yield xy_text
\ No newline at end of file
@@ -0,0 +1,239 @@
+import numpy as np
+
+from myocr.myocr.core.evaluation.utils import points2polygon, poly_make_valid
+
+
+class PolygonGridIndex:
+    """A uniform grid index over the axis-aligned bounding boxes of polygons.
+
+    Every polygon is registered in all the grid cells covered by its bounding
+    box, and the cell contents are stored as a CSR-style sorted array so that
+    a query only touches the cells covered by the query box.
+
+    Args:
+        bboxes (ndarray): The bounding boxes of shape (N, 4) in
+            (x_min, y_min, x_max, y_max) format.
+        cell_size (float, optional): The side length of a grid cell. If not
+            specified, the median of the larger side of the bounding boxes is
+            used, so that a typical polygon covers at most four cells.
+    """
+
+    def __init__(self, bboxes, cell_size=None):
+        assert isinstance(bboxes, np.ndarray)
+        assert bboxes.ndim == 2 and bboxes.shape[1] == 4
+
+        if cell_size is None:
+            sides = np.maximum(bboxes[:, 2] - bboxes[:, 0],
+                               bboxes[:, 3] - bboxes[:, 1])
+            cell_size = float(np.median(sides)) if len(sides) else 1.
+        self.cell_size = max(cell_size, 1.)
+
+        self.origin = bboxes[:, :2].min(axis=0) if len(bboxes) else np.zeros(2)
+        cells = self._cell_range(bboxes)
+        self.grid_w = int(cells[:, 2].max()) + 1 if len(cells) else 1
+
+        num_x = cells[:, 2] - cells[:, 0] + 1
+        num_y = cells[:, 3] - cells[:, 1] + 1
+        counts = num_x * num_y
+        poly_inds = np.repeat(np.arange(len(bboxes)), counts)
+        starts = np.cumsum(counts) - counts
+        local = np.arange(counts.sum()) - np.repeat(starts, counts)
+        cell_x = cells[poly_inds, 0] + local % num_x[poly_inds]
+        cell_y = cells[poly_inds, 1] + local // num_x[poly_inds]
+        cell_ids = cell_y * self.grid_w + cell_x
+
+        order = np.argsort(cell_ids, kind='stable')
+        self.cell_ids = cell_ids[order]
+        self.poly_inds = poly_inds[order]
+
+    def _cell_range(self, bboxes):
+        cells = np.floor(
+            (bboxes - np.tile(self.origin, 2)) / self.cell_size).astype(
+                np.int64)
+        return np.maximum(cells, 0)
+
+    def query(self, bbox):
+        """Find the polygons sharing at least one grid cell with a box.
+
+        Args:
+            bbox (ndarray): The query box of shape (4, ).
+
+        Returns:
+            ndarray: The unique indices of the candidate polygons.
+        """
+        x0, y0, x1, y1 = self._cell_range(bbox[None])[0]
+        x1 = min(x1, self.grid_w - 1)
+        inds = []
+        for cell_y in range(y0, y1 + 1):
+            first = cell_y * self.grid_w + x0
+            last = cell_y * self.grid_w + x1
+            lo, hi = np.searchsorted(self.cell_ids, [first, last + 1])
+            inds.append(self.poly_inds[lo:hi])
+        if len(inds) == 0:
+            return np.zeros((0, ), dtype=np.int64)
+        return np.unique(np.concatenate(inds))
+
+
+def polygon_nms(polygons, scores, iou_thr, cell_size=None):
+    """Non-maximum suppression for polygons.
+
+    Candidates are first matched through a :obj:`PolygonGridIndex` and an
+    axis-aligned bounding box overlap test, and the exact IoU is only computed
+    for the pairs whose bounding boxes overlap. The result is the same as
+    comparing every pair with :func:`boundary_iou`.
+
+    Args:
+        polygons (ndarray): The polygons of shape (N, 2k), each with k points.
+        scores (ndarray): The scores of shape (N, ).
+        iou_thr (float): IoU threshold above which a lower scoring polygon is
+            suppressed.
+        cell_size (float, optional): The cell size of the grid index.
+
+    Returns:
+        tuple(ndarray, ndarray): The kept polygons with their scores appended
+        as the last column, of shape (M, 2k+1), and the indices of the kept
+        polygons. Both are sorted by descending score.
+    """
+    assert isinstance(polygons, np.ndarray)
+    assert isinstance(scores, np.ndarray)
+    scores = scores.reshape(-1)
+    assert polygons.ndim == 2 and len(polygons) == len(scores)
+
+    num = len(polygons)
+    dets = np.concatenate([polygons, scores[:, None]], axis=1)
+    if num == 0:
+        return dets, np.zeros((0, ), dtype=np.int64)
+
+    # sort ascending with stable ties and walk backwards, which keeps the
+    # tie order of sorting the boundary lists by score
+    order = np.argsort(scores, kind='stable')[::-1]
+    rank = np.empty(num, dtype=np.int64)
+    rank[order] = np.arange(num)
+
+    points = polygons.reshape(num, -1, 2)
+    bboxes = np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+    index = PolygonGridIndex(bboxes, cell_size)
+
+    shapes = [None] * num
+    areas = np.full(num, -1.)
+
+    def get_shape(i):
+        if shapes[i] is None:
+            shapes[i] = poly_make_valid(points2polygon(polygons[i]))
+            areas[i] = shapes[i].area
+        return shapes[i]
+
+    suppressed = np.zeros(num, dtype=bool)
+    keep = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        poly_i = get_shape(i)
+
+        if areas[i] == 0:
+            # the union of two empty polygons is empty, whose IoU falls back
+            # to 1 wherever they are
+            if iou_thr < 1:
+                for j in np.nonzero(~suppressed & (rank > rank[i]))[0]:
+                    get_shape(j)
+                    suppressed[j] = areas[j] == 0
+
+        cands = index.query(bboxes[i])
+        cands = cands[~suppressed[cands] & (rank[cands] > rank[i])]
+        bbox = bboxes[i]
+        overlap = ((bboxes[cands, 0] <= bbox[2])
+                   & (bboxes[cands, 2] >= bbox[0])
+                   & (bboxes[cands, 1] <= bbox[3])
+                   & (bboxes[cands, 3] >= bbox[1]))
+        for j in cands[overlap]:
+            poly_j = get_shape(j)
+            area_inters = poly_i.intersection(poly_j).area
+            area_union = areas[i] + areas[j] - area_inters
+            iou = area_inters / area_union if area_union != 0 else 1
+            if iou > iou_thr:
+                suppressed[j] = True
+
+    keep = np.array(keep, dtype=np.int64)
+    return dets[keep], keep
+
+
+def merge_tiled_polygons(polygons,
+                         scores,
+                         cut,
+                         iou_thr,
+                         cover_thr=0.8,
+                         cell_size=None):
+    """Deduplicate the polygons detected on overlapping tiles.
+
+    An instance in the overlap of two tiles is detected in both, and an
+    instance crossing a tile border is truncated in the tile which cuts it.
+    The polygons are visited with the uncut ones first and by descending
+    score otherwise. A polygon is suppressed by an already kept one if their
+    IoU exceeds ``iou_thr``, or if it is cut and more than ``cover_thr`` of
+    its area is covered by the kept polygon.
+
+    Args:
+        polygons (ndarray): The polygons of shape (N, 2k) in the coordinates
+            of the whole image.
+        scores (ndarray): The scores of shape (N, ).
+        cut (ndarray): Whether each polygon touches a tile border shared with
+            another tile, of shape (N, ).
+        iou_thr (float): The IoU threshold of nms.
+        cover_thr (float): The covered area ratio above which a cut polygon
+            is suppressed.
+        cell_size (float, optional): The cell size of the grid index.
+
+    Returns:
+        ndarray: The indices of the kept polygons.
+    """
+    assert isinstance(polygons, np.ndarray)
+    scores = np.asarray(scores).reshape(-1)
+    cut = np.asarray(cut, dtype=bool).reshape(-1)
+    assert polygons.ndim == 2 and len(polygons) == len(scores) == len(cut)
+
+    num = len(polygons)
+    if num == 0:
+        return np.zeros((0, ), dtype=np.int64)
+
+    order = np.lexsort((-scores, cut))
+    rank = np.empty(num, dtype=np.int64)
+    rank[order] = np.arange(num)
+
+    points = polygons.reshape(num, -1, 2)
+    bboxes = np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+    index = PolygonGridIndex(bboxes, cell_size)
+
+    shapes = [None] * num
+
+    def get_shape(i):
+        if shapes[i] is None:
+            shapes[i] = poly_make_valid(points2polygon(polygons[i]))
+        return shapes[i]
+
+    suppressed = np.zeros(num, dtype=bool)
+    keep = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        poly_i = get_shape(i)
+
+        cands = index.query(bboxes[i])
+        cands = cands[~suppressed[cands] & (rank[cands] > rank[i])]
+        bbox = bboxes[i]
+        overlap = ((bboxes[cands, 0] <= bbox[2])
+                   & (bboxes[cands, 2] >= bbox[0])
+                   & (bboxes[cands, 1] <= bbox[3])
+                   & (bboxes[cands, 3] >= bbox[1]))
+        for j in cands[overlap]:
+            poly_j = get_shape(j)
+            area_inters = poly_i.intersection(poly_j).area
+            area_union = poly_i.area + poly_j.area - area_inters
+            iou = area_inters / area_union if area_union != 0 else 1
+            if iou > iou_thr:
+                suppressed[j] = True
+            elif cut[j] and poly_j.area > 0:
+                suppressed[j] = area_inters / poly_j.area > cover_thr
+
+    return np.array(keep, dtype=np.int64)
@@ -1,9 +1,8 @@
 import numpy as np
 import cv2
 
-from numpy.fft import ifft
-
-from myocr.myocr.core.evaluation.utils import boundary_iou
+from myocr.myocr.core.boundary import fourier_basis
+from .polygon_nms import polygon_nms
 
 def fill_hole(input_mask):
     h, w = input_mask.shape
@@ -17,48 +16,43 @@ def fill_hole(input_mask):
 
     return ~canvas | input_mask
 
-def fourier2poly(fourier_coeff, num_reconstr_points=50):
+def fourier2poly(fourier_coeff, num_reconstr_points=50, dtype='float64'):
     """ Inverse Fourier transform
         Args:
             fourier_coeff (ndarray): Fourier coefficients shaped (n, 2k+1),
                 with n and k being candidates number and Fourier degree
                 respectively.
             num_reconstr_points (int): Number of reconstructed polygon points.
+            dtype (str): Real data type of the reconstruction, 'float64' or
+                'float32'.
         Returns:
             Polygons (ndarray): The reconstructed polygons shaped (n, n')
         """
+    complex_dtype = np.result_type(dtype, np.complex64)
+    k = (fourier_coeff.shape[1] - 1) // 2
+    basis = fourier_basis(k, num_reconstr_points, complex_dtype.name)
 
-    a = np.zeros((len(fourier_coeff), num_reconstr_points), dtype='complex')
-    k = (len(fourier_coeff[0]) - 1) // 2
-
-    a[:, 0:k + 1] = fourier_coeff[:, k:]
-    a[:, -k:] = fourier_coeff[:, :k]
-
-    poly_complex = ifft(a) * num_reconstr_points
-    polygon = np.zeros((len(fourier_coeff), num_reconstr_points, 2))
-    polygon[:, :, 0] = poly_complex.real
-    polygon[:, :, 1] = poly_complex.imag
-    return polygon.astype('int32').reshape((len(fourier_coeff), -1))
+    poly_complex = fourier_coeff.astype(complex_dtype, copy=False) @ basis
+    polygon = np.stack([poly_complex.real, poly_complex.imag], axis=-1)
+    return polygon.astype('int32').reshape(
+        (len(fourier_coeff), 2 * num_reconstr_points))
 
 def poly_nms(polygons, threshold):
-    assert isinstance(polygons, list)
+    """Non-maximum suppression for boundaries in list format.
 
-    polygons = np.array(sorted(polygons, key=lambda x: x[-1]))
+    Args:
+        polygons (list[list[float]]): The boundaries, each with its score as
+            the last element.
+        threshold (float): IoU threshold of nms.
 
-    keep_poly = []
-    index = [i for i in range(polygons.shape[0])]
-
-    while len(index) > 0:
-        keep_poly.append(polygons[index[-1]].tolist())
-        A = polygons[index[-1]][:-1]
-        index = np.delete(index, -1)
-
-        iou_list = np.zeros((len(index), ))
-        for i in range(len(index)):
-            B = polygons[index[i]][:-1]
+    Returns:
+        list[list[float]]: The kept boundaries sorted by descending score.
+    """
+    assert isinstance(polygons, list)
 
-            iou_list[i] = boundary_iou(A, B, 1)
-        remove_index = np.where(iou_list > threshold)
-        index = np.delete(index, remove_index)
+    if len(polygons) == 0:
+        return []
+    boundaries = np.array(polygons)
+    dets, _ = polygon_nms(boundaries[:, :-1], boundaries[:, -1], threshold)
 
-    return keep_poly
\ No newline at end of file
+    return dets.tolist()
\ No newline at end of file
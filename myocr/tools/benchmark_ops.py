@@ -0,0 +1,102 @@
+import argparse
+import time
+
+import torch
+
+from mycv.ops.modulated_deform_conv import (ModulatedDeformConv2dFunction,
+                                            modulated_deform_conv2d_pytorch,
+                                            tv_deform_conv2d)
+from mycv.ops.roi_align import RoIAlignFunction, roi_align_pytorch
+from mycv.utils.ext_loader import check_ops_exist
+
+
+def parse_args(arg_list=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the pure PyTorch ops against the compiled '
+        'extension.')
+    parser.add_argument('--device', default='cpu', help='The device to use.')
+    parser.add_argument(
+        '--repeat', type=int, default=20, help='The number of timed runs.')
+    parser.add_argument(
+        '--size',
+        type=int,
+        default=100,
+        help='The side length of the feature maps, e.g. 100 for the stride '
+        '8 features of a 800x800 image.')
+    parser.add_argument(
+        '--channels', type=int, default=128, help='The number of channels.')
+    parser.add_argument(
+        '--num-rois', type=int, default=256, help='The number of RoIs.')
+    return parser.parse_args(arg_list)
+
+
+def benchmark(func, device, repeat):
+    """Return the mean time in milliseconds of ``func()``."""
+    with torch.no_grad():
+        func()  # warm up
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def dcn_cases(args, device):
+    """DCNv2 as in the 3x3 convolutions of the ResNet stages."""
+    size, channels = args.size, args.channels
+    x = torch.randn(1, channels, size, size, device=device)
+    offset = torch.randn(1, 18, size, size, device=device) * 2
+    mask = torch.rand(1, 9, size, size, device=device)
+    weight = torch.randn(channels, channels, 3, 3, device=device) * 0.01
+    inputs = (x, offset, mask, weight, None, 1, 1, 1, 1, 1)
+
+    cases = dict(im2col=lambda: modulated_deform_conv2d_pytorch(
+        *inputs, use_torchvision=False))
+    if tv_deform_conv2d is not None:
+        cases['torchvision'] = lambda: modulated_deform_conv2d_pytorch(
+            *inputs)
+    if check_ops_exist():
+        cases['extension'] = lambda: ModulatedDeformConv2dFunction.apply(
+            *inputs)
+    return cases
+
+
+def roi_align_cases(args, device):
+    size = args.size
+    x = torch.randn(2, args.channels, size, size, device=device)
+    xy = torch.rand(args.num_rois, 2, device=device) * size * 0.8
+    wh = torch.rand(args.num_rois, 2, device=device) * size * 0.2 + 1
+    batch_inds = torch.randint(2, (args.num_rois, 1), device=device)
+    rois = torch.cat([batch_inds.float(), xy, xy + wh], dim=1)
+    inputs = (x, rois, 7, 1.0, 0, 'avg', True)
+
+    cases = dict(pytorch=lambda: roi_align_pytorch(*inputs))
+    if check_ops_exist():
+        cases['extension'] = lambda: RoIAlignFunction.apply(*inputs)
+    return cases
+
+
+def main():
+    args = parse_args()
+    device = torch.device(args.device)
+    print(f'{"op":<24}{"implementation":<16}{"time (ms)":>12}')
+    for op, cases in (('modulated_deform_conv2d', dcn_cases(args, device)),
+                      ('roi_align', roi_align_cases(args, device))):
+        results = {}
+        for name, func in cases.items():
+            results[name] = func()
+            time_ms = benchmark(func, device, args.repeat)
+            print(f'{op:<24}{name:<16}{time_ms:>12.2f}')
+        ref = results.get('extension')
+        for name, output in results.items():
+            if ref is not None and name != 'extension':
+                max_diff = (output - ref).abs().max().item()
+                print(f'{op:<24}{name:<16}max diff to the extension: '
+                      f'{max_diff:.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import argparse
+
+from myocr.myocr.datasets import IcdarDataset, pack_shards
+
+
+def parse_args(arg_list=None):
+    parser = argparse.ArgumentParser(
+        description='Pack the images and annotations of a text detection '
+        'dataset into shards for ShardedIcdarDataset.')
+    parser.add_argument('ann_file', help='The COCO style annotation file.')
+    parser.add_argument('img_prefix', help='The image directory.')
+    parser.add_argument('out_dir', help='The local output directory.')
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        default=256,
+        help='The approximate size of a shard in MB.')
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Whether to parse the annotation file incrementally.')
+    return parser.parse_args(arg_list)
+
+
+def run_pack_shards_cmd(args):
+    # test mode keeps all the images, they are filtered when loading shards
+    dataset = IcdarDataset(
+        args.ann_file,
+        pipeline=[],
+        img_prefix=args.img_prefix,
+        test_mode=True,
+        packed=True,
+        streaming=args.streaming)
+    pack_shards(dataset, args.out_dir, shard_size=args.shard_size << 20)
+
+
+def main():
+    args = parse_args()
+    run_pack_shards_cmd(args)
+
+
+if __name__ == '__main__':
+    main()
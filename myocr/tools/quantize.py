@@ -0,0 +1,127 @@
+import argparse
+import time
+
+import torch
+
+from mycv.utils import Config, DictAction
+from mycv.runner import load_checkpoint
+
+from myocr.myocr.apis.quantize import (QUANTIZABLE_MODULES, quantize_detector,
+                                       save_quantized_checkpoint)
+from myocr.myocr.core.evaluation.hmean import eval_hmean
+from myocr.myocr.datasets import build_dataset
+from myocr.myocr.models import build_detector
+
+
+def parse_args(arg_list=None):
+    parser = argparse.ArgumentParser(
+        description='Quantize a text detector to int8 for CPU inference.')
+    parser.add_argument('config', help='Test config file path.')
+    parser.add_argument('checkpoint', help='The float checkpoint file.')
+    parser.add_argument('out', help='The quantized checkpoint file to save.')
+    parser.add_argument(
+        '--num-images',
+        type=int,
+        default=16,
+        help='The number of test images used for calibration and evaluation.')
+    parser.add_argument(
+        '--backend',
+        default='x86',
+        choices=['x86', 'fbgemm', 'qnnpack'],
+        help='The quantized engine.')
+    parser.add_argument(
+        '--modules',
+        nargs='+',
+        default=list(QUANTIZABLE_MODULES),
+        choices=QUANTIZABLE_MODULES,
+        help='The parts of the detector to quantize.')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='Override some settings in the used config, the key-value pair '
+             'in xxx=yyy format will be merged into config file.')
+    return parser.parse_args(arg_list)
+
+
+def _unpack(value):
+    """Take the first test augmentation out of a data container."""
+    if isinstance(value, list):
+        value = value[0]
+    return getattr(value, 'data', value)
+
+
+def load_samples(dataset, num_images):
+    """Load the first images of a test dataset as single image batches."""
+    samples = []
+    for idx in range(min(num_images, len(dataset))):
+        data = dataset[idx]
+        img = _unpack(data['img'])
+        img_metas = _unpack(data['img_metas'])
+        samples.append((img.unsqueeze(0), [img_metas]))
+    return samples
+
+
+@torch.no_grad()
+def run_inference(model, samples):
+    """Return the results and the mean latency in seconds per image."""
+    results = []
+    model.simple_test(*samples[0], rescale=True)  # warm up
+    start = time.perf_counter()
+    for img, img_metas in samples:
+        results.extend(model.simple_test(img, img_metas, rescale=True))
+    return results, (time.perf_counter() - start) / len(samples)
+
+
+def evaluate(dataset, results):
+    """Compute hmean-iou on the first ``len(results)`` images."""
+    img_infos = []
+    ann_infos = []
+    for idx in range(len(results)):
+        img_infos.append({'filename': dataset.data_infos[idx]['file_name']})
+        ann_infos.append(dataset.get_ann_info(idx))
+    eval_results = eval_hmean(
+        results, img_infos, ann_infos, metrics={'hmean-iou'}, logger='silent')
+    return eval_results['hmean-iou:hmean']
+
+
+def run_quantize_cmd(args):
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    cfg.model.pretrained = None
+    torch.set_grad_enabled(False)
+
+    model = build_detector(cfg.model, test_cfg=cfg.get('test_cfg'))
+    load_checkpoint(model, args.checkpoint, map_location='cpu')
+    model.eval()
+
+    dataset = build_dataset(cfg.data.test, dict(test_mode=True))
+    # calibrate on the first IcdarDataset of a dataset wrapper
+    while hasattr(dataset, 'datasets'):
+        dataset = dataset.datasets[0]
+    samples = load_samples(dataset, args.num_images)
+
+    quantized = quantize_detector(
+        model, [img for img, _ in samples],
+        backend=args.backend,
+        modules=tuple(args.modules))
+
+    print(f'{"model":<8}{"hmean-iou":>12}{"latency (ms)":>16}')
+    for name, detector in (('float', model), ('int8', quantized)):
+        results, latency = run_inference(detector, samples)
+        hmean = evaluate(dataset, results)
+        print(f'{name:<8}{hmean:>12.4f}{latency * 1000:>16.1f}')
+
+    save_quantized_checkpoint(
+        quantized, args.out, meta=dict(config=cfg.pretty_text))
+    print(f'Saved the quantized checkpoint to {args.out}')
+
+
+def main():
+    args = parse_args()
+    run_quantize_cmd(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,7 +14,7 @@ from mycv.utils.logging import get_logger
 from myocr.myocr.utils import get_root_logger, collect_env
 from myocr.myocr.apis import init_random_seed
 from myocr.myocr.models import build_detector
-from myocr.myocr.datasets import build_dataset
+from myocr.myocr.datasets import build_dataloader, build_dataset
 
 def parse_args(arg_list=None):
     parser = argparse.ArgumentParser(description='Train a detectors.')
@@ -140,7 +140,29 @@ def run_train_cmd(args):
     model.init_weights()
 
     datasets = [build_dataset(cfg.data.train)]
-    print(type(datasets))
+
+    # the settings shared by all dataloaders, overridden by train_dataloader
+    loader_cfg = {
+        k: v
+        for k, v in cfg.data.items() if k not in [
+            'train', 'val', 'test', 'train_dataloader', 'val_dataloader',
+            'test_dataloader'
+        ]
+    }
+    train_loader_cfg = dict(
+        samples_per_gpu=2,
+        workers_per_gpu=2,
+        num_gpus=1,
+        dist=args.launcher != 'none',
+        seed=cfg.seed,
+        persistent_workers=False)
+    train_loader_cfg.update(loader_cfg)
+    train_loader_cfg.update(cfg.data.get('train_dataloader', {}))
+    data_loaders = [
+        build_dataloader(ds, **train_loader_cfg) for ds in datasets
+    ]
+    logger.info(f'Built {len(data_loaders)} train dataloaders of '
+                f'{[len(loader) for loader in data_loaders]} batches')
 
 
 def main():
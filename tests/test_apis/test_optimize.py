@@ -0,0 +1,32 @@
+import pytest
+import torch
+
+from myocr.myocr.apis.optimize import compare_detector_outputs
+
+
+class ToyDetector(torch.nn.Module):
+
+    def __init__(self, outs):
+        super().__init__()
+        self.outs = outs
+
+    def extract_feat(self, img):
+        return img
+
+    def bbox_head(self, feats):
+        return self.outs
+
+
+def test_compare_detector_outputs():
+    cls, reg = torch.ones(1, 4, 2, 2), torch.zeros(1, 22, 2, 2)
+    model = ToyDetector([None, [cls, reg], None])
+    optimized = ToyDetector([None, [cls + 0.5, reg - 3], None])
+    max_diff, max_ref = compare_detector_outputs(model, optimized, None)
+    assert max_diff == 3. and max_ref == 1.
+
+    with pytest.raises(AssertionError, match='level 0'):
+        compare_detector_outputs(
+            model, ToyDetector([[cls, reg], [cls, reg], None]), None)
+    with pytest.raises(AssertionError, match='levels'):
+        compare_detector_outputs(model, ToyDetector([None, [cls, reg]]),
+                                 None)
@@ -0,0 +1,71 @@
+import pytest
+import torch
+
+from myocr.myocr.apis import (load_quantized_detector, quantize_detector,
+                              save_quantized_checkpoint)
+from myocr.myocr.models import build_detector
+
+
+def _build_fcenet(test_out_levels=None):
+    return build_detector(
+        dict(
+            type='FCENet',
+            backbone=dict(
+                type='ResNet',
+                depth=18,
+                num_stages=4,
+                out_indices=(1, 2, 3),
+                norm_cfg=dict(type='BN', requires_grad=True),
+                norm_eval=True,
+                style='pytorch'),
+            neck=dict(
+                type='FPN',
+                in_channels=[128, 256, 512],
+                out_channels=16,
+                add_extra_convs='on_output',
+                num_outs=3,
+                relu_before_extra_convs=True,
+                act_cfg=None,
+                test_out_levels=test_out_levels),
+            bbox_head=dict(
+                type='FCEHead',
+                in_channels=16,
+                scales=(8, 16, 32),
+                fourier_degree=5)))
+
+
+@pytest.mark.parametrize('test_out_levels', [None, [0, 1]])
+def test_quantize_detector(tmp_path, test_out_levels):
+    torch.manual_seed(0)
+    model = _build_fcenet(test_out_levels)
+    model.init_weights()
+    calib_imgs = [torch.randn(2, 3, 64, 64) for _ in range(2)]
+    if test_out_levels is None:
+        quantized = quantize_detector(model, calib_imgs)
+    else:
+        with pytest.warns(UserWarning, match='neck.fpn_convs.2'):
+            quantized = quantize_detector(model, calib_imgs)
+    # the float detector is not modified
+    assert isinstance(model.bbox_head.out_conv_cls, torch.nn.Conv2d)
+
+    ckpt = str(tmp_path / 'quantized.pth')
+    save_quantized_checkpoint(quantized, ckpt)
+    loaded = load_quantized_detector(_build_fcenet(test_out_levels), ckpt)
+    assert loaded.quant_cfg == quantized.quant_cfg
+
+    img = torch.randn(1, 3, 64, 64)
+    with torch.no_grad():
+        ref = model.bbox_head(model.extract_feat(img))
+        outs = quantized.bbox_head(quantized.extract_feat(img))
+        loaded_outs = loaded.bbox_head(loaded.extract_feat(img))
+    for level, (ref_level, out_level, loaded_level) in enumerate(
+            zip(ref, outs, loaded_outs)):
+        if test_out_levels is not None and level not in test_out_levels:
+            assert ref_level is out_level is loaded_level is None
+            continue
+        for ref_pred, out_pred, loaded_pred in zip(ref_level, out_level,
+                                                   loaded_level):
+            assert out_pred.dtype == torch.float32
+            assert torch.equal(out_pred, loaded_pred)
+            torch.testing.assert_close(
+                out_pred, ref_pred, atol=0.1, rtol=0.1)
@@ -0,0 +1,55 @@
+import pytest
+import torch
+import torch.nn as nn
+
+from mycv.cnn import ConvModule, fuse_conv_bn
+
+
+def _randomize_bn(model):
+    for m in model.modules():
+        if isinstance(m, nn.BatchNorm2d):
+            m.running_mean.uniform_(-1, 1)
+            m.running_var.uniform_(0.5, 2)
+            m.weight.data.uniform_(0.5, 2)
+            m.bias.data.uniform_(-1, 1)
+    return model.eval()
+
+
+@pytest.mark.parametrize('order, fused', [(('conv', 'norm', 'act'), True),
+                                          (('norm', 'conv', 'act'), False),
+                                          (('conv', 'act', 'norm'), False)])
+def test_fuse_conv_module(order, fused):
+    model = _randomize_bn(
+        ConvModule(
+            3,
+            3,
+            3,
+            padding=1,
+            norm_cfg=dict(type='BN'),
+            act_cfg=None,
+            order=order))
+    inputs = torch.randn(2, 3, 8, 8)
+    with torch.no_grad():
+        ref = model(inputs)
+        fuse_conv_bn(model)
+        out = model(inputs)
+    assert isinstance(model.norm, nn.Identity) == fused
+    torch.testing.assert_close(out, ref, rtol=1e-4, atol=1e-5)
+
+
+def test_fuse_conv_bn_sequential():
+    model = _randomize_bn(
+        nn.Sequential(
+            nn.Conv2d(3, 4, 3), nn.BatchNorm2d(4), nn.ReLU(),
+            nn.Sequential(nn.Conv2d(4, 4, 1, bias=False), nn.BatchNorm2d(4)),
+            nn.BatchNorm2d(4)))
+    inputs = torch.randn(2, 3, 8, 8)
+    with torch.no_grad():
+        ref = model(inputs)
+        fuse_conv_bn(model)
+        out = model(inputs)
+    assert isinstance(model[1], nn.Identity)
+    assert isinstance(model[3][1], nn.Identity)
+    # not after a conv
+    assert isinstance(model[4], nn.BatchNorm2d)
+    torch.testing.assert_close(out, ref, rtol=1e-4, atol=1e-5)
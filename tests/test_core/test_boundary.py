@@ -0,0 +1,35 @@
+import numpy as np
+
+from myocr.myocr.core import BoundaryResult, FourierBoundaryResult
+from myocr.myocr.models.textdet.postprocess.utils import fourier2poly
+
+
+def _fourier_result(rng, num=6, k=5):
+    coeffs = (rng.normal(size=(num, 2 * k + 1)) + 1j * rng.normal(
+        size=(num, 2 * k + 1))).astype(np.complex64) * 5
+    coeffs[:, k] += rng.uniform(-10, 60, num) + 1j * rng.uniform(-10, 60, num)
+    return FourierBoundaryResult(coeffs, rng.random(num), num_points=20)
+
+
+def test_fourier_boundary_result_matches_legacy():
+    rng = np.random.default_rng(0)
+    result = _fourier_result(rng)
+    scale_factor = np.array([0.37, 1.7, 0.37, 1.7], np.float32)
+
+    # the legacy polygons are truncated, moved, then rescaled
+    polygons = fourier2poly(result.coeffs, 20)
+    legacy = np.concatenate([polygons, result.scores[:, None]], axis=1)
+    legacy[:, :-1] += np.tile([3, 5], 20)
+    legacy[:, :-1] *= np.tile(scale_factor[:2], 20)
+    ref = BoundaryResult.from_array(legacy)
+
+    moved = result.translate([3, 5]).rescale(scale_factor)
+    assert np.array_equal(moved.to_boundary_result().points, ref.points)
+    assert moved.to_list() == legacy.tolist()
+    assert moved.flat_points.shape == (len(result), 40)
+    assert moved.to_polygons(64).shape == (len(result), 64, 2)
+
+    # the offsets and the scale factor follow the selection
+    merged = FourierBoundaryResult.concatenate([moved, moved[[0, 2]]])
+    assert np.array_equal(merged[len(result):].to_polygons(),
+                          moved[[0, 2]].to_polygons())
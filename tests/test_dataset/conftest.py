@@ -0,0 +1,125 @@
+import contextlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+from myocr.myocr.datasets import IcdarDataset
+
+
+def _make_coco(rng, num_imgs=30, anns_first=False):
+    images, anns = [], []
+    for i in range(num_imgs):
+        w, h = rng.randint(20, 400, size=2).tolist()
+        # not sorted, and some images are smaller than min_size
+        images.append(
+            dict(id=1000 - 3 * i, file_name=f'img_{i}.jpg', width=w,
+                 height=h))
+        for _ in range(rng.randint(0, 5)):
+            x, y = float(rng.rand() * w), float(rng.rand() * h)
+            bw, bh = float(rng.rand() * 50), float(rng.rand() * 50)
+            ann = dict(
+                id=len(anns) + 1,
+                image_id=images[-1]['id'],
+                bbox=[x, y, bw, bh],
+                area=bw * bh * int(rng.rand() < 0.9),
+                category_id=int(rng.choice([1, 1, 1, 2])),
+                iscrowd=int(rng.rand() < 0.2),
+                segmentation=[
+                    rng.rand(2 * rng.randint(3, 8)).round(2).tolist()
+                    for _ in range(rng.randint(1, 3))
+                ])
+            if rng.rand() < 0.1:
+                ann['ignore'] = True
+            anns.append(ann)
+    rng.shuffle(anns)
+    categories = [dict(id=1, name='text'), dict(id=2, name='other')]
+    if anns_first:
+        return dict(
+            info=dict(note='"]}', values=[1, 2.5e3, None, True]),
+            annotations=anns,
+            images=images,
+            categories=categories)
+    return dict(images=images, annotations=anns, categories=categories)
+
+
+@pytest.fixture
+def write_ann_file(tmp_path):
+    """Write a random COCO style annotation file and return its path."""
+    ann_file = str(tmp_path / 'instances.json')
+
+    def write(seed=0, indent=None, **kwargs):
+        with open(ann_file, 'w') as f:
+            json.dump(
+                _make_coco(np.random.RandomState(seed), **kwargs),
+                f,
+                indent=indent)
+        return ann_file
+
+    return write
+
+
+@pytest.fixture
+def ann_file(write_ann_file):
+    return write_ann_file()
+
+
+def _build_dataset(ann_file, **kwargs):
+    # silence the COCO api
+    with contextlib.redirect_stdout(io.StringIO()):
+        return IcdarDataset(ann_file, [], **kwargs)
+
+
+@pytest.fixture
+def build_dataset():
+    """Build an IcdarDataset without pipeline."""
+    return _build_dataset
+
+
+def _assert_same(a, b):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for key in a:
+            _assert_same(a[key], b[key])
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_same(x, y)
+    elif isinstance(a, np.ndarray):
+        np.testing.assert_allclose(a, b, atol=1e-4)
+    elif isinstance(a, float):
+        # the packed coordinates are float32
+        assert a == pytest.approx(b, abs=1e-4)
+    else:
+        assert a == b
+
+
+def _assert_same_dataset(ref, dataset):
+    assert len(ref) == len(dataset)
+    assert list(ref.img_ids) == list(dataset.img_ids)
+    assert list(ref.cat_ids) == list(dataset.cat_ids)
+    np.testing.assert_array_equal(ref.flag, dataset.flag)
+    for idx in range(len(ref)):
+        img_info = dataset.data_infos[idx]
+        assert {key: ref.data_infos[idx][key] for key in img_info} == \
+            img_info
+        _assert_same(ref.get_ann_info(idx), dataset.get_ann_info(idx))
+        assert ref.get_cat_ids(idx) == dataset.get_cat_ids(idx)
+
+
+@pytest.fixture
+def assert_same_dataset():
+    """Check that two datasets have the same images and annotations."""
+    return _assert_same_dataset
+
+
+@pytest.fixture(params=[
+    dict(),
+    dict(test_mode=True),
+    dict(select_first_k=7),
+    dict(filter_empty_gt=False)
+])
+def load_cfg(request):
+    """The options of IcdarDataset which change the loaded annotations."""
+    return request.param
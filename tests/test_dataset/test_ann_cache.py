@@ -0,0 +1,97 @@
+import contextlib
+import os
+import os.path as osp
+import shutil
+
+import pytest
+
+from myocr.myocr.datasets import coco
+from myocr.myocr.datasets import icdar_dataset as icdar_module
+
+
+@contextlib.contextmanager
+def _no_parsing():
+    """Fail if the annotation file is parsed."""
+
+    def parse(*args, **kwargs):
+        raise AssertionError('The annotations are not loaded from the cache')
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(icdar_module, 'COCO', parse)
+        mp.setattr(coco, 'load_coco_stream', parse)
+        yield
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_ann_cache(write_ann_file, tmp_path, streaming, build_dataset,
+                   assert_same_dataset):
+    ann_file = write_ann_file()
+    cache_dir = str(tmp_path / 'cache')
+    ref = build_dataset(ann_file)
+    cold = build_dataset(
+        ann_file, ann_cache_dir=cache_dir, streaming=streaming)
+    assert len(os.listdir(cache_dir)) == 1
+    with _no_parsing():
+        warm = build_dataset(
+            ann_file, ann_cache_dir=cache_dir, streaming=streaming)
+    assert_same_dataset(ref, cold)
+    assert_same_dataset(ref, warm)
+
+    # the options used to load the annotations are part of the key
+    build_dataset(ann_file, ann_cache_dir=cache_dir, select_first_k=5)
+    assert len(os.listdir(cache_dir)) == 2
+
+    # a modified annotation file is loaded again
+    write_ann_file(seed=2, num_imgs=12)
+    dataset = build_dataset(ann_file, ann_cache_dir=cache_dir)
+    assert_same_dataset(build_dataset(ann_file), dataset)
+    assert len(os.listdir(cache_dir)) == 3
+
+
+class _RemoteClient:
+    """Copy the annotation file to a new temporary path on each read."""
+
+    def __init__(self, src, tmp_dir):
+        self.src = src
+        self.tmp_dir = tmp_dir
+        self.num_reads = 0
+
+    @contextlib.contextmanager
+    def get_local_path(self, filepath):
+        self.num_reads += 1
+        local_path = osp.join(self.tmp_dir, f'tmp_{self.num_reads}.json')
+        shutil.copy(self.src, local_path)
+        try:
+            yield local_path
+        finally:
+            os.remove(local_path)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_remote_ann_cache(ann_file, tmp_path, monkeypatch, streaming,
+                          build_dataset, assert_same_dataset):
+    client = _RemoteClient(ann_file, str(tmp_path))
+    file_client = icdar_module.mycv.FileClient
+    # only the annotation file is remote
+    monkeypatch.setattr(
+        icdar_module.mycv, 'FileClient', lambda backend='disk', **kwargs:
+        client if backend == 'http' else file_client(backend, **kwargs))
+    monkeypatch.setattr(icdar_module.mycv, '__version__', '1.4.0')
+    cache_dir = str(tmp_path / 'cache')
+
+    def build():
+        return build_dataset(
+            'http://example.com/instances.json',
+            ann_file_backend='http',
+            ann_cache_dir=cache_dir,
+            streaming=streaming)
+
+    cold = build()
+    with _no_parsing():
+        warm = build()
+    assert client.num_reads == 2
+    # keyed on the url and not on the temporary local paths
+    cache_files = os.listdir(cache_dir)
+    assert len(cache_files) == 1 and cache_files[0].startswith('instances_')
+    assert_same_dataset(build_dataset(ann_file), cold)
+    assert_same_dataset(build_dataset(ann_file), warm)
@@ -0,0 +1,69 @@
+import numpy as np
+import torch
+
+from myocr.myocr.datasets import build_dataloader, collate, pad_stack
+
+
+def test_pad_stack():
+    a, b = torch.rand(3, 37, 50), torch.rand(3, 64, 20)
+    out = pad_stack([a, b], size_divisor=32, pad_value=-1)
+    assert out.shape == (2, 3, 64, 64)
+    assert torch.equal(out[0, :, :37, :50], a)
+    assert torch.equal(out[1, :, :64, :20], b)
+    assert (out[0, :, 37:] == -1).all() and (out[1, :, :, 20:] == -1).all()
+
+    assert pad_stack([a, a]).shape == (2, 3, 37, 50)
+
+
+def test_collate():
+    batch = [
+        dict(
+            img=torch.rand(3, 20, 33),
+            aug_img=[torch.rand(3, 10, 10),
+                     torch.rand(3, 40, 8)],
+            label=torch.tensor(i),
+            gt_kernels=torch.rand(2, 5 + i, 5),
+            gt_text_mask=np.ones((4, 4)),
+            img_metas=dict(filename=f'{i}.jpg')) for i in range(2)
+    ]
+    out = collate(batch, pad_keys=('img', 'aug_img'), size_divisor=16)
+    assert out['img'].shape == (2, 3, 32, 48)
+    assert [img.shape for img in out['aug_img']] == [(2, 3, 16, 16),
+                                                     (2, 3, 48, 16)]
+    assert torch.equal(out['label'], torch.tensor([0, 1]))
+    # tensors of different shapes are not padded out of pad_keys
+    assert isinstance(out['gt_kernels'], list)
+    assert isinstance(out['gt_text_mask'], list)
+    assert out['img_metas'] == [dict(filename='0.jpg'),
+                                dict(filename='1.jpg')]
+
+
+class SizeDataset(torch.utils.data.Dataset):
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.flag = np.zeros(len(sizes), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def __getitem__(self, idx):
+        return dict(
+            img=torch.ones(3, *self.sizes[idx]), img_metas=dict(idx=idx))
+
+
+def test_build_dataloader_collate():
+    dataset = SizeDataset([(30, 40), (70, 20), (33, 33)])
+    loader = build_dataloader(
+        dataset,
+        samples_per_gpu=2,
+        workers_per_gpu=0,
+        dist=False,
+        shuffle=False,
+        collate_cfg=dict(size_divisor=32))
+    batches = list(loader)
+    assert [batch['img'].shape for batch in batches] == [(2, 3, 96, 64),
+                                                         (1, 3, 64, 64)]
+    assert batches[0]['img'][0, :, :30, :40].all()
+    assert not batches[0]['img'][0, :, 30:].any()
+    assert [meta['idx'] for meta in batches[0]['img_metas']] == [0, 1]
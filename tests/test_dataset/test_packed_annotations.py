@@ -0,0 +1,6 @@
+def test_packed_dataset(ann_file, load_cfg, build_dataset,
+                        assert_same_dataset):
+    ref = build_dataset(ann_file, **load_cfg)
+    dataset = build_dataset(ann_file, packed=True, **load_cfg)
+    assert dataset.coco is None
+    assert_same_dataset(ref, dataset)
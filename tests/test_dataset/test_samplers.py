@@ -0,0 +1,51 @@
+import numpy as np
+
+from myocr.myocr.datasets.samplers import (DistributedGroupSampler,
+                                           GroupSampler)
+
+
+class FlagDataset:
+
+    def __init__(self, flag):
+        self.flag = np.array(flag, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.flag)
+
+
+def _check_batches(indices, flag, samples_per_gpu):
+    assert len(indices) % samples_per_gpu == 0
+    for i in range(0, len(indices), samples_per_gpu):
+        assert len(set(flag[indices[i:i + samples_per_gpu]])) == 1
+
+
+def test_group_sampler():
+    dataset = FlagDataset([0, 1, 1, 0, 1, 0, 0])
+    sampler = GroupSampler(dataset, samples_per_gpu=3)
+    indices = list(sampler)
+    # each group is padded to a multiple of the batch size
+    assert len(sampler) == len(indices) == 9
+    assert set(indices) == set(range(7))
+    _check_batches(indices, dataset.flag, 3)
+
+
+def test_distributed_group_sampler():
+    dataset = FlagDataset([0, 1, 1, 0, 1, 0, 0, 1, 1])
+    samplers = [
+        DistributedGroupSampler(
+            dataset, samples_per_gpu=2, num_replicas=2, rank=rank, seed=3)
+        for rank in range(2)
+    ]
+    indices = [list(sampler) for sampler in samplers]
+    assert all(len(sampler) == 6 for sampler in samplers)
+    assert set(indices[0]) | set(indices[1]) == set(range(9))
+    for rank_indices in indices:
+        _check_batches(rank_indices, dataset.flag, 2)
+
+    # the ranks shuffle in the same way for each epoch
+    assert list(samplers[0]) == indices[0]
+    for sampler in samplers:
+        sampler.set_epoch(1)
+    new_indices = [list(sampler) for sampler in samplers]
+    assert new_indices != indices
+    assert set(new_indices[0]) | set(new_indices[1]) == set(range(9))
@@ -0,0 +1,112 @@
+import json
+import os
+import os.path as osp
+
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from myocr.myocr.datasets import (IcdarDataset, ShardedIcdarDataset,
+                                  build_dataloader, pack_shards)
+
+
+class ToResults:
+
+    def __call__(self, results):
+        return dict(
+            filename=results['img_info']['filename'],
+            img=torch.from_numpy(results['img']).permute(2, 0, 1),
+            num_gts=len(results.get('ann_info', {}).get('bboxes', [])))
+
+
+@pytest.fixture(scope='module')
+def shard_data(tmp_path_factory):
+    root = tmp_path_factory.mktemp('shards')
+    img_prefix = str(root / 'imgs')
+    os.makedirs(img_prefix)
+    rng = np.random.RandomState(0)
+    images, anns = [], []
+    for i in range(20):
+        h, w = rng.randint(40, 80, size=2).tolist()
+        images.append(
+            dict(id=100 - i, file_name=f'img_{i}.png', width=w, height=h))
+        cv2.imwrite(
+            osp.join(img_prefix, images[-1]['file_name']),
+            rng.randint(0, 256, (h, w, 3), dtype=np.uint8))
+        for _ in range(i % 3):
+            anns.append(
+                dict(
+                    id=len(anns) + 1,
+                    image_id=100 - i,
+                    bbox=[1., 2., 10., 10.],
+                    area=100.,
+                    category_id=1,
+                    iscrowd=0,
+                    segmentation=[[1., 2., 11., 2., 11., 12., 1., 12.]]))
+    ann_file = str(root / 'instances.json')
+    with open(ann_file, 'w') as f:
+        json.dump(
+            dict(
+                images=images,
+                annotations=anns,
+                categories=[dict(id=1, name='text')]), f)
+
+    shard_dir = str(root / 'out')
+    dataset = IcdarDataset(
+        ann_file, [], img_prefix=img_prefix, test_mode=True, packed=True)
+    # about 4 images per shard
+    pack_shards(dataset, shard_dir, shard_size=4 * 3 * 60 * 60)
+    return ann_file, img_prefix, shard_dir
+
+
+@pytest.mark.parametrize('test_mode', [False, True])
+def test_sharded_dataset(shard_data, test_mode):
+    ann_file, img_prefix, shard_dir = shard_data
+    ref = IcdarDataset(
+        ann_file, [], img_prefix=img_prefix, test_mode=test_mode)
+    dataset = ShardedIcdarDataset(
+        shard_dir, [ToResults()],
+        img_prefix=img_prefix,
+        test_mode=test_mode,
+        shuffle_buffer=4)
+    assert len(dataset.shards) > 2
+    assert len(dataset) == len(ref)
+    np.testing.assert_array_equal(dataset.flag, ref.flag)
+
+    filenames = [info['filename'] for info in ref.data_infos]
+    for idx, filename in enumerate(filenames):
+        results = dataset[idx]
+        assert results['filename'] == filename
+        img = cv2.imread(osp.join(img_prefix, filename))
+        assert np.array_equal(results['img'].permute(1, 2, 0).numpy(), img)
+        if not test_mode:
+            assert results['num_gts'] == len(ref.get_ann_info(idx)['bboxes'])
+
+    # each epoch reads every image once, in a new order
+    epochs = [[results['filename'] for results in dataset]
+              for _ in range(2)]
+    assert sorted(epochs[0]) == sorted(filenames)
+    assert sorted(epochs[1]) == sorted(filenames)
+    assert epochs[0] != epochs[1]
+
+
+def test_sharded_dataloader(shard_data):
+    _, img_prefix, shard_dir = shard_data
+    dataset = ShardedIcdarDataset(
+        shard_dir, [ToResults()], img_prefix=img_prefix, test_mode=True)
+    loader = build_dataloader(
+        dataset,
+        samples_per_gpu=3,
+        workers_per_gpu=2,
+        dist=False,
+        seed=0,
+        collate_cfg=dict(size_divisor=16))
+    filenames = []
+    for batch in loader:
+        assert batch['img'].shape[-2] % 16 == 0
+        assert batch['img'].shape[-1] % 16 == 0
+        filenames.extend(batch['filename'])
+    # the shards are split between the workers
+    assert sorted(filenames) == sorted(info['filename']
+                                       for info in dataset.data_infos)
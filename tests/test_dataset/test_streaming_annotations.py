@@ -0,0 +1,40 @@
+import io
+import json
+
+import pytest
+
+from myocr.myocr.datasets.api_wrappers import JsonStream
+
+
+def test_streaming_dataset(ann_file, load_cfg, build_dataset,
+                           assert_same_dataset):
+    ref = build_dataset(ann_file, **load_cfg)
+    dataset = build_dataset(ann_file, streaming=True, **load_cfg)
+    assert dataset.coco is None
+    assert_same_dataset(ref, dataset)
+
+
+def test_streaming_key_order(write_ann_file, load_cfg, build_dataset,
+                             assert_same_dataset):
+    # the annotations come before the images, with an unused field
+    ann_file = write_ann_file(seed=1, indent=1, anns_first=True)
+    assert_same_dataset(
+        build_dataset(ann_file, **load_cfg),
+        build_dataset(ann_file, streaming=True, **load_cfg))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64])
+def test_json_stream(chunk_size):
+    data = dict(
+        a=[1, -2.5e-3, 'x,]}"', None, [True, False], {}],
+        b={'c': 123456789, 'd': []},
+        e='')
+    text = json.dumps(data, indent=2)
+    stream = JsonStream(io.StringIO(text), chunk_size=chunk_size)
+    out = {}
+    for key in stream.items():
+        if key == 'a':
+            out[key] = list(stream.array())
+        else:
+            out[key] = stream.value()
+    assert out == data
@@ -0,0 +1,69 @@
+import pytest
+import torch
+
+from myocr.myocr.models.common.detectors.base import BaseDetector
+
+
+class ToyDetector(BaseDetector):
+
+    def __init__(self, train_cfg=None):
+        super().__init__()
+        self.train_cfg = train_cfg
+        self.weight = torch.nn.Parameter(torch.tensor([0.5, 2.0]))
+
+    def extract_feat(self, imgs):
+        return imgs
+
+    def forward_train(self, img, img_metas):
+        x = img.flatten(1).mean(1)
+        return dict(
+            loss_text=(x * self.weight[0]).abs(),
+            loss_reg=[x * self.weight[1], x.pow(2)],
+            acc=x.sum())
+
+    def simple_test(self, img, img_metas, **kwargs):
+        pass
+
+    def aug_test(self, imgs, img_metas, **kwargs):
+        pass
+
+
+@pytest.mark.parametrize('train_cfg', [None, dict(defer_log_vars=False)])
+def test_train_step_log_vars_are_floats(train_cfg):
+    data = dict(img=torch.rand(3, 3, 4, 4), img_metas=[{}] * 3)
+    outputs = ToyDetector(train_cfg).train_step(data, None)
+    assert outputs['num_samples'] == 3
+    assert list(outputs['log_vars']) == [
+        'loss_text', 'loss_reg', 'acc', 'loss'
+    ]
+    assert all(isinstance(v, float) for v in outputs['log_vars'].values())
+
+
+def test_train_step_deferred_log_vars():
+    torch.manual_seed(0)
+    batches = [
+        dict(img=torch.rand(n, 3, 4, 4), img_metas=[{}] * n)
+        for n in (3, 1, 2, 2, 4)
+    ]
+    model = ToyDetector()
+    deferred = ToyDetector(dict(defer_log_vars=True, log_interval=2))
+    outputs = [model.train_step(data, None) for data in batches]
+    deferred_outputs = [deferred.train_step(data, None) for data in batches]
+
+    # the logs are only read at the end of each interval
+    assert [len(out['log_vars']) for out in deferred_outputs] == [
+        0, 4, 0, 4, 0
+    ]
+    for end in (2, 4):
+        log_vars = deferred_outputs[end - 1]['log_vars']
+        window = outputs[end - 2:end]
+        assert list(log_vars) == list(window[0]['log_vars'])
+        num_samples = sum(out['num_samples'] for out in window)
+        for name, value in log_vars.items():
+            assert isinstance(value, float)
+            expected = sum(out['log_vars'][name] * out['num_samples']
+                           for out in window) / num_samples
+            assert value == pytest.approx(expected)
+    for out, deferred_out in zip(outputs, deferred_outputs):
+        assert out['num_samples'] == deferred_out['num_samples']
+        torch.testing.assert_close(deferred_out['loss'], out['loss'])
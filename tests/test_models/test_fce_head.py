@@ -0,0 +1,36 @@
+import copy
+import gc
+
+from myocr.myocr.models.textdet.heads import FCEHead
+
+
+def _build_head(**kwargs):
+    return FCEHead(
+        in_channels=8,
+        scales=(8, 16, 32),
+        loss=dict(type='FCELoss', num_sample=50),
+        postprocessor=dict(
+            type='FCEPostprocessor',
+            text_repr_type='poly',
+            num_reconstr_points=50,
+            alpha=1.0,
+            beta=2.0,
+            score_thr=0.3),
+        **kwargs)
+
+
+def test_fce_head_executor():
+    head = _build_head(postprocess_workers=2)
+    executor = head.executor
+    assert head.executor is executor
+    # the thread pool is not copied
+    assert copy.deepcopy(head)._executor is None
+
+    head.close()
+    assert executor._shutdown and head._executor is None
+    assert head.executor is not executor
+
+    executor = head.executor
+    del head
+    gc.collect()
+    assert executor._shutdown
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import torch
+
+from myocr.myocr.models.textdet.losses import FCELoss
+
+
+def _targets(rng, size, text_ratio, k=5):
+    maps = np.zeros((2, 4 * k + 5, size, size), dtype=np.float32)
+    maps[:, 0] = rng.random((2, size, size)) < text_ratio
+    maps[:, 1] = maps[:, 0] * (rng.random((2, size, size)) > 0.5)
+    maps[:, 2] = rng.random((2, size, size)) > 0.1
+    maps[:, 3:] = rng.normal(size=(2, 4 * k + 2, size, size)) * 10
+    return list(maps)
+
+
+@pytest.mark.parametrize('fuse_levels', [False, True])
+def test_fce_loss_sync_free(fuse_levels):
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    # the last level has no text pixel
+    gts = [
+        _targets(rng, 20, 0.3),
+        _targets(rng, 10, 0.01),
+        _targets(rng, 5, 0)
+    ]
+    preds = [[
+        torch.randn(2, 4, size, size, requires_grad=True),
+        torch.randn(2, 22, size, size, requires_grad=True)
+    ] for size in (20, 10, 5)]
+    params = [pred for level in preds for pred in level]
+
+    ref = FCELoss(5, 50)(preds, None, *gts)
+    losses = FCELoss(
+        5, 50, sync_free=True, fuse_levels=fuse_levels)(preds, None, *gts)
+    assert list(losses) == list(ref)
+    for name in ref:
+        torch.testing.assert_close(losses[name], ref[name])
+
+    ref_grads = torch.autograd.grad(
+        sum(ref.values()), params, allow_unused=True)
+    grads = torch.autograd.grad(sum(losses.values()), params)
+    for ref_grad, grad in zip(ref_grads, grads):
+        if ref_grad is None:
+            ref_grad = torch.zeros_like(grad)
+        torch.testing.assert_close(grad, ref_grad)
@@ -0,0 +1,18 @@
+import pytest
+
+from myocr.myocr.models.textdet.postprocess import FCEPostprocessor
+
+
+@pytest.mark.parametrize('result_format', ['list', 'array', 'fourier'])
+def test_fce_postprocessor_quad(result_format):
+    kwargs = dict(
+        fourier_degree=5,
+        num_reconstr_points=50,
+        text_repr_type='quad',
+        result_format=result_format)
+    if result_format == 'list':
+        FCEPostprocessor(**kwargs)
+    else:
+        # the compact result formats keep polygons only
+        with pytest.raises(AssertionError):
+            FCEPostprocessor(**kwargs)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+import torch
+
+from myocr.myocr.models import build_detector
+
+
+@pytest.fixture(scope='module')
+def fcenet():
+    torch.manual_seed(0)
+    model = build_detector(
+        dict(
+            type='FCENet',
+            backbone=dict(
+                type='ResNet',
+                depth=18,
+                num_stages=4,
+                out_indices=(1, 2, 3),
+                norm_cfg=dict(type='BN', requires_grad=True),
+                norm_eval=True,
+                style='pytorch'),
+            neck=dict(
+                type='FPN',
+                in_channels=[128, 256, 512],
+                out_channels=32,
+                add_extra_convs='on_output',
+                num_outs=3,
+                relu_before_extra_convs=True,
+                act_cfg=None),
+            bbox_head=dict(
+                type='FCEHead',
+                in_channels=32,
+                scales=(8, 16, 32),
+                fourier_degree=5,
+                loss=dict(type='FCELoss', num_sample=50),
+                postprocessor=dict(
+                    type='FCEPostprocessor',
+                    text_repr_type='poly',
+                    num_reconstr_points=50,
+                    alpha=1.0,
+                    beta=2.0,
+                    score_thr=0.3)),
+            test_cfg=dict(tile=dict(size=64, overlap=16, batch_size=3))))
+    model.init_weights()
+    # predict text everywhere to get many instances
+    model.bbox_head.out_conv_cls.bias.data[[1, 3]] = 3
+    return model.eval()
+
+
+def test_tiled_test_result_formats(fcenet):
+    img = torch.randn(1, 3, 150, 130)
+    img_metas = [dict(scale_factor=np.array([0.7, 0.6, 0.7, 0.6], np.float32))]
+    results = {}
+    with torch.no_grad():
+        for result_format in ['array', 'fourier']:
+            fcenet.bbox_head.postprocessor.result_format = result_format
+            results[result_format] = fcenet.simple_test(
+                img, img_metas, rescale=True)[0]['boundary_result']
+    fcenet.bbox_head.postprocessor.result_format = 'list'
+
+    assert len(results['array']) > 0
+    np.testing.assert_array_equal(
+        results['fourier'].to_boundary_result().to_array(),
+        results['array'].to_array())
+
+
+def test_tiled_test_onnx_export(fcenet):
+    assert fcenet.with_tiles
+    with mock.patch('torch.onnx.is_in_onnx_export', return_value=True):
+        assert not fcenet.with_tiles